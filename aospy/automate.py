@@ -1,20 +1,33 @@
 """Functionality for specifying and cycling through multiple calculations."""
 from __future__ import print_function
 
+from collections import OrderedDict
+import contextlib
 from distutils.version import LooseVersion
+import importlib
+import multiprocessing
 from multiprocessing import cpu_count
 
+import cloudpickle
 import dask
 import dask.bag as db
 import distributed
 import itertools
 import logging
+import pandas as pd
 import pprint
+import psutil
+import sys
+import threading
 import traceback
+import types
 
-from .calc import Calc, _TIME_DEFINED_REDUCTIONS
+from .calc import (Calc, _TIME_DEFINED_REDUCTIONS, _date_bounds,
+                   _data_loader_attrs, _input_vars, _input_file_sets)
+from .proj import Proj
 from .region import Region
 from .var import Var
+from .utils import io, profiling
 
 
 _OBJ_LIB_STR = 'library'
@@ -24,6 +37,10 @@ _RUNS_STR = 'runs'
 _REGIONS_STR = 'regions'
 _VARIABLES_STR = 'variables'
 _TAG_ATTR_MODIFIERS = dict(all='', default='default_')
+# Rough ratio of the peak memory used by a Calc to the bytes it reads from
+# disk, accounting for decoding, upcasting to float64, and intermediate
+# products of the computation.
+_MEMORY_PER_BYTE_READ = 4
 
 
 class AospyException(Exception):
@@ -52,16 +69,22 @@ def _get_attr_by_tag(obj, tag, attr_name):
     return getattr(obj, attr_name)
 
 
-def _permuted_dicts_of_specs(specs):
-    """Create {name: value} dict, one each for every permutation.
+def _iter_permuted_dicts_of_specs(specs):
+    """Iterate over {name: value} dicts, one for each permutation.
 
     Each permutation becomes a dictionary, with the keys being the attr names
     and the values being the corresponding value for that permutation.  These
     dicts can then be directly passed to the Calc constructor.
 
     """
-    permuter = itertools.product(*specs.values())
-    return [dict(zip(specs.keys(), perm)) for perm in permuter]
+    keys = list(specs.keys())
+    for perm in itertools.product(*specs.values()):
+        yield dict(zip(keys, perm))
+
+
+def _permuted_dicts_of_specs(specs):
+    """Create {name: value} dict, one each for every permutation."""
+    return list(_iter_permuted_dicts_of_specs(specs))
 
 
 def _merge_dicts(*dict_args):
@@ -115,6 +138,184 @@ def _get_all_objs_of_type(type_, parent):
                 if isinstance(obj, type_)])
 
 
+def _objs_by_name(type_, obj_lib, attr_name):
+    """Get the objects of the given type in an object library by name.
+
+    Objects are taken both from the library itself and from its attribute
+    ``attr_name`` (e.g. 'variables'), which may be a submodule or a sequence.
+    """
+    objs = _get_all_objs_of_type(type_, obj_lib)
+    collection = getattr(obj_lib, attr_name, None)
+    if isinstance(collection, types.ModuleType):
+        objs |= _get_all_objs_of_type(type_, collection)
+    elif isinstance(collection, (list, tuple, set)):
+        objs |= set(obj for obj in collection if isinstance(obj, type_))
+    return {obj.name: obj for obj in objs}
+
+
+# Index of the objects in each object library imported by this process,
+# keyed by the name of the library's module.  On a worker this means each
+# library, and the grid data of its Models, is only loaded once.
+_OBJ_LIB_INDEXES = {}
+
+
+def _get_obj_lib_index(obj_lib_name):
+    """Get the index of the object library with the given module name."""
+    try:
+        return _OBJ_LIB_INDEXES[obj_lib_name]
+    except KeyError:
+        obj_lib = importlib.import_module(obj_lib_name)
+        index = {_PROJECTS_STR: _objs_by_name(Proj, obj_lib, _PROJECTS_STR),
+                 _VARIABLES_STR: _objs_by_name(Var, obj_lib, _VARIABLES_STR),
+                 _REGIONS_STR: _objs_by_name(Region, obj_lib, _REGIONS_STR)}
+        _OBJ_LIB_INDEXES[obj_lib_name] = index
+        return index
+
+
+def _find_objs_by_name(obj_lib_name, names):
+    """Find a Calc's objects in the given object library by their names."""
+    index = _get_obj_lib_index(obj_lib_name)
+    proj = index[_PROJECTS_STR][names['proj']]
+    model = {model.name: model for model in proj.models}[names['model']]
+    run = {run.name: run for run in model.runs}[names['run']]
+    return dict(proj=proj, model=model, run=run,
+                var=index[_VARIABLES_STR][names['var']],
+                region=set(None if name is None
+                           else index[_REGIONS_STR][name]
+                           for name in names['region']))
+
+
+def _is_same_objs(objs, other):
+    """Whether two dicts of a Calc's objects refer to the same objects."""
+    for key, obj in objs.items():
+        if key == 'region':
+            if set(map(id, obj)) != set(map(id, other[key])):
+                return False
+        elif obj is not other[key]:
+            return False
+    return True
+
+
+class _CalcSpec(object):
+    """Lightweight description of a single Calc of a CalcSuite.
+
+    The Calc itself is only created once ``to_calc`` is called, i.e. when it
+    is executed.  If the object library is an importable module in which each
+    of the objects can be found by name, then the spec, and any Calc created
+    from it, is pickled compactly as the module name of the library, the names
+    of the objects, and the remaining specifications.  The receiving process
+    then looks up the objects in its own cached import of the library, rather
+    than unpickling the full object graph, including the grid data of each
+    Model.
+    """
+    _OBJ_NAMES = ('proj', 'model', 'run', 'var', 'region')
+
+    def __init__(self, obj_lib, spec):
+        self.kwargs = {key: value for key, value in spec.items()
+                       if key not in self._OBJ_NAMES}
+        self._objs = {key: spec[key] for key in self._OBJ_NAMES}
+        self.obj_lib_name = None
+        self.names = None
+
+        obj_lib_name = getattr(obj_lib, '__name__', None)
+        # Only libraries that other processes can import by name qualify,
+        # which also avoids a failing import attempt for every spec.
+        if (not isinstance(obj_lib, types.ModuleType) or
+                obj_lib_name == '__main__' or
+                sys.modules.get(obj_lib_name) is not obj_lib):
+            return
+        names = {key: obj.name for key, obj in self._objs.items()
+                 if key != 'region'}
+        names['region'] = [getattr(region, 'name', None)
+                           for region in self._objs['region']]
+        try:
+            objs = _find_objs_by_name(obj_lib_name, names)
+        except (KeyError, ImportError):
+            return
+        if _is_same_objs(objs, self._objs):
+            self.obj_lib_name = obj_lib_name
+            self.names = names
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.names is not None:
+            state['_objs'] = None
+        return state
+
+    @property
+    def objs(self):
+        """The Proj, Model, Run, Var, and Regions of the Calc."""
+        if self._objs is None:
+            self._objs = _find_objs_by_name(self.obj_lib_name, self.names)
+        return self._objs
+
+    @property
+    def attrs(self):
+        """Attributes of the Calc described by this spec.
+
+        Those by which Calcs are grouped, sized, and their input files found,
+        without creating the Calc: its objects, its other arguments except
+        date_range, its start_date and end_date, data_loader,
+        data_loader_attrs, and def_time.
+        """
+        attrs = dict(self.objs)
+        for name in ('intvl_in', 'intvl_out', 'dtype_in_time',
+                     'dtype_in_vert', 'dtype_out_vert', 'level',
+                     'time_offset'):
+            attrs[name] = self.kwargs.get(name)
+        dtype_out_time = self.kwargs.get('dtype_out_time')
+        if isinstance(dtype_out_time, (list, tuple)):
+            attrs['dtype_out_time'] = tuple(dtype_out_time)
+        else:
+            attrs['dtype_out_time'] = (dtype_out_time,)
+        run, var = attrs['run'], attrs['var']
+        attrs['start_date'], attrs['end_date'] = _date_bounds(
+            run, self.kwargs.get('date_range'))
+        attrs['data_loader'] = run.data_loader
+        attrs['data_loader_attrs'] = _data_loader_attrs(
+            var, attrs['intvl_in'], attrs['dtype_in_vert'],
+            attrs['dtype_in_time'], attrs['intvl_out'])
+        attrs['def_time'] = var.def_time
+        return attrs
+
+    def _input_vars(self):
+        """Get the model-native Vars that the Calc loads."""
+        attrs = self.attrs
+        return _input_vars(attrs['var'], attrs['dtype_in_vert'],
+                           attrs['dtype_out_vert'])
+
+    def _input_file_sets(self):
+        """Get the files on disk that the Calc reads from."""
+        attrs = self.attrs
+        return _input_file_sets(attrs['data_loader'], self._input_vars(),
+                                attrs['start_date'], attrs['end_date'],
+                                attrs['data_loader_attrs'])
+
+    def to_calc(self):
+        """Create the Calc described by this spec."""
+        calc = Calc(**_merge_dicts(self.kwargs, self.objs))
+        if self.names is not None:
+            calc._spec = self
+        return calc
+
+
+def _to_calc(calc):
+    """Get the Calc described by a _CalcSpec, or the given Calc itself."""
+    if isinstance(calc, _CalcSpec):
+        return calc.to_calc()
+    return calc
+
+
+def _calc_attrs(calc):
+    """The attributes of a Calc, or of that described by a _CalcSpec.
+
+    See ``_CalcSpec.attrs`` for those available for a spec.
+    """
+    if isinstance(calc, _CalcSpec):
+        return calc.attrs
+    return vars(calc)
+
+
 class CalcSuite(object):
     """Suite of Calc objects generated from provided specifications."""
 
@@ -228,20 +429,30 @@ class CalcSuite(object):
             specs[calc_name] = specs.pop(suite_name)
         return _permuted_dicts_of_specs(specs)
 
+    def _iter_core_aux_specs(self):
+        """Iterate over permutations of core and auxilliary Calc specs."""
+        aux_specs = self._permute_aux_specs()
+        for core_dict in self._permute_core_specs():
+            for aux_dict in aux_specs:
+                yield _merge_dicts(core_dict, aux_dict)
+
     def _combine_core_aux_specs(self):
         """Combine permutations over core and auxilliary Calc specs."""
-        all_specs = []
-        for core_dict in self._permute_core_specs():
-            for aux_dict in self._permute_aux_specs():
-                all_specs.append(_merge_dicts(core_dict, aux_dict))
-        return all_specs
+        return list(self._iter_core_aux_specs())
+
+    def _iter_calc_specs(self):
+        """Iterate over a _CalcSpec for each requested parameter combination.
+
+        Unlike ``create_calcs``, no Calc is created until its spec's
+        ``to_calc`` method is called.
+        """
+        for spec in self._iter_core_aux_specs():
+            spec['dtype_out_time'] = _prune_invalid_time_reductions(spec)
+            yield _CalcSpec(self._obj_lib, spec)
 
     def create_calcs(self):
         """Generate a Calc object for each requested parameter combination."""
-        specs = self._combine_core_aux_specs()
-        for spec in specs:
-            spec['dtype_out_time'] = _prune_invalid_time_reductions(spec)
-        return [Calc(**sp) for sp in specs]
+        return [spec.to_calc() for spec in self._iter_calc_specs()]
 
 
 def _prune_invalid_time_reductions(spec):
@@ -268,6 +479,7 @@ def _compute_or_skip_on_error(calc, compute_kwargs):
     Prevents one failed calculation from stopping a larger requested set
     of calculations.
     """
+    calc = _to_calc(calc)
     try:
         return calc.compute(**compute_kwargs)
     except Exception:
@@ -277,15 +489,333 @@ def _compute_or_skip_on_error(calc, compute_kwargs):
         return None
 
 
+def _input_files_key(calc):
+    """Key identifying the input files of a Calc or _CalcSpec.
+
+    Calcs of the same Run and input time interval load their data from the
+    same files, or, for different date ranges, from overlapping sets of
+    them.
+    """
+    attrs = _calc_attrs(calc)
+    return id(attrs['run']), attrs['intvl_in']
+
+
+def _date_range(calc):
+    """The start and end dates of a Calc or _CalcSpec."""
+    attrs = _calc_attrs(calc)
+    return attrs['start_date'], attrs['end_date']
+
+
+def _cluster_date_ranges(date_ranges, merge=True):
+    """Cluster the given date ranges into those that overlap.
+
+    Date ranges specified as strings, or otherwise not comparable to one
+    another, are only clustered with identical ones.
+
+    Parameters
+    ----------
+    date_ranges : list of (start date, end date) tuples
+    merge : bool, default True
+        Whether to cluster overlapping date ranges; if False, only identical
+        ones are clustered.
+
+    Returns
+    -------
+    list of (indices, date range) tuples
+        The indices of the date ranges in each cluster, and the date range
+        spanning all of them, ordered by the first index of each cluster.
+    """
+    identical = OrderedDict()
+    for i, date_range in enumerate(date_ranges):
+        identical.setdefault(repr(date_range), []).append(i)
+    clusters = [(indices, date_ranges[indices[0]])
+                for indices in identical.values()]
+    if not merge or any(isinstance(date, str) for date_range in date_ranges
+                        for date in date_range):
+        return clusters
+    try:
+        clusters.sort(key=lambda cluster: cluster[1][0])
+        merged = [clusters[0]]
+        for indices, (start, end) in clusters[1:]:
+            merged_indices, (merged_start, merged_end) = merged[-1]
+            if start <= merged_end:
+                merged[-1] = (merged_indices + indices,
+                              (merged_start, max(merged_end, end)))
+            else:
+                merged.append((indices, (start, end)))
+    except TypeError:
+        clusters.sort(key=lambda cluster: cluster[0][0])
+        return clusters
+    merged = [(sorted(indices), date_range) for indices, date_range in merged]
+    return sorted(merged, key=lambda cluster: cluster[0][0])
+
+
+def _group_by_input_files(calcs, merge_date_ranges=False):
+    """Indices of the given Calcs, grouped by their input files.
+
+    Calcs with the same input files but different date ranges are placed in
+    separate groups, unless merge_date_ranges is True and the date ranges
+    overlap.
+    """
+    by_files = OrderedDict()
+    for i, calc in enumerate(calcs):
+        by_files.setdefault(_input_files_key(calc), []).append(i)
+    groups = []
+    for indices in by_files.values():
+        clusters = _cluster_date_ranges(
+            [_date_range(calcs[i]) for i in indices], merge=merge_date_ranges)
+        groups.extend([indices[j] for j in cluster]
+                      for cluster, _ in clusters)
+    groups.sort(key=lambda group: group[0])
+    return OrderedDict((tuple(group), group) for group in groups)
+
+
+def _calc_key(calc, excluded=()):
+    """Key identifying Calcs with the same specifications.
+
+    Parameters
+    ----------
+    calc : Calc or _CalcSpec
+    excluded : sequence of str
+        Names of specifications, as in the arguments of ``Calc``, other than
+        'date_range', that are not included in the key
+    """
+    attrs = _calc_attrs(calc)
+    regions = attrs['region'] if attrs['region'] is not None else []
+    specs = OrderedDict([
+        ('proj', id(attrs['proj'])), ('model', id(attrs['model'])),
+        ('run', id(attrs['run'])), ('var', id(attrs['var'])),
+        ('region', frozenset(id(region) for region in regions)),
+        ('date_range', repr((attrs['start_date'], attrs['end_date']))),
+        ('intvl_in', attrs['intvl_in']), ('intvl_out', attrs['intvl_out']),
+        ('dtype_in_time', attrs['dtype_in_time']),
+        ('dtype_in_vert', attrs['dtype_in_vert']),
+        ('dtype_out_time', attrs['dtype_out_time']),
+        ('dtype_out_vert', attrs['dtype_out_vert']),
+        ('level', attrs['level']),
+        ('time_offset', repr(attrs['time_offset']))])
+    return tuple(value for name, value in specs.items()
+                 if name not in excluded)
+
+
+def _shared_data_key(calc):
+    """Key identifying Calcs that differ only in their output time interval
+    and date range.
+
+    Returns None for Calcs whose yearly timeseries cannot be derived from
+    monthly sums, i.e. those of input data not defined in time or already
+    averaged over the output interval.  A ``_CalcSpec`` is not turned into
+    a Calc to create the key.
+    """
+    attrs = _calc_attrs(calc)
+    if (not attrs['def_time'] or attrs['dtype_in_time'] is None or
+            'av' in attrs['dtype_in_time']):
+        return None
+    return _calc_key(calc, excluded=('intvl_out', 'date_range'))
+
+
+def _group_by_shared_data(calcs, merge_date_ranges=False):
+    """Group Calcs that can share a single load of their input data.
+
+    These are Calcs that differ only in their output time interval and, if
+    merge_date_ranges is True, in date ranges that overlap.
+
+    Returns
+    -------
+    list of (indices, date range) tuples
+        The indices of the Calcs in each group, and the date range spanning
+        all of theirs, ordered by the first index of each group.
+    """
+    by_key = OrderedDict()
+    for i, calc in enumerate(calcs):
+        key = _shared_data_key(calc)
+        if key is None:
+            key = ('calc', i)
+        by_key.setdefault(key, []).append(i)
+    groups = []
+    for indices in by_key.values():
+        clusters = _cluster_date_ranges(
+            [_date_range(calcs[i]) for i in indices], merge=merge_date_ranges)
+        groups.extend(([indices[j] for j in cluster], date_range)
+                      for cluster, date_range in clusters)
+    return sorted(groups, key=lambda group: group[0][0])
+
+
+def _compute_sharing_data(calcs, date_range, compute_kwargs):
+    """Execute Calcs that can share a single load of their input data.
+
+    The first Calc loads the input data over the given date range, for the
+    months of all of their output intervals, and sums the timeseries and
+    its weights within each month of each year.  Each Calc then derives its
+    yearly timeseries from these sums, rather than loading the input data
+    again.  If the first Calc fails, or a Calc's date range includes only
+    part of a month of the data, it is computed on its own.
+    """
+    if len(calcs) == 1:
+        return [_compute_or_skip_on_error(calcs[0], compute_kwargs)]
+    lead = calcs[0]
+    months = sorted({int(month) for calc in calcs for month in calc.months})
+    lead._shared_load = (months,) + tuple(date_range)
+    try:
+        results = [_compute_or_skip_on_error(lead, compute_kwargs)]
+        for calc in calcs[1:]:
+            calc._monthly_sums = lead._monthly_sums
+            try:
+                results.append(_compute_or_skip_on_error(calc,
+                                                         compute_kwargs))
+            finally:
+                calc._monthly_sums = None
+    finally:
+        lead._shared_load = None
+        lead._monthly_sums = None
+    return results
+
+
+def _group_by_ensemble(calcs):
+    """Indices of the given Calcs, grouped by all but their Run.
+
+    Calcs of the same Model differing only in their Run form an ensemble.
+    """
+    groups = OrderedDict()
+    for i, calc in enumerate(calcs):
+        groups.setdefault(_calc_key(calc, excluded=('run',)), []).append(i)
+    return groups
+
+
+def _compute_ensemble(calcs, compute_kwargs):
+    """Execute Calcs differing only in their Run as a single ensemble.
+
+    The input data of each Run are stacked along a 'run' dimension, and the
+    calculation and its reductions performed once on the stacked data.
+    Each Calc then saves the results for its own Run.  If this fails, e.g.
+    because the Runs' data do not share the same times, each Calc is
+    computed on its own.
+    """
+    names = [calc.run.name for calc in calcs]
+    if len(calcs) == 1 or len(set(names)) < len(names):
+        return [_compute_or_skip_on_error(calc, compute_kwargs)
+                for calc in calcs]
+    lead = calcs[0]
+    lead._ensemble = calcs
+    try:
+        lead.compute(**compute_kwargs)
+    except Exception:
+        msg = ("Computing aospy calculation `{0}` as an ensemble of runs {1} "
+               "failed, so computing each run on its own, due to the "
+               "following traceback: \n{2}")
+        logging.info(msg.format(lead, names, traceback.format_exc()))
+    else:
+        return calcs
+    finally:
+        lead._ensemble = None
+    return [_compute_or_skip_on_error(calc, compute_kwargs) for calc in calcs]
+
+
+def _sharing_opens_requests(calcs, groups):
+    """The loads of each DataLoader by the given groups of Calcs.
+
+    Only the first Calc of each group loads its data, over the group's date
+    range.  Calcs given as ``_CalcSpec`` objects are not created to find
+    what they load.
+
+    Returns
+    -------
+    OrderedDict
+        The (DataLoader, requests) of each DataLoader, keyed by its id, with
+        the requests as passed to ``DataLoader._sharing_opens``
+    """
+    requests = OrderedDict()
+    for indices, (start_date, end_date) in groups:
+        calc = calcs[indices[0]]
+        attrs = _calc_attrs(calc)
+        kwargs = dict(start_date=start_date, end_date=end_date,
+                      time_offset=attrs['time_offset'],
+                      grid_attrs=attrs['model'].grid_attrs,
+                      **attrs['data_loader_attrs'])
+        data_loader = attrs['data_loader']
+        loader_requests = requests.setdefault(id(data_loader),
+                                              (data_loader, []))[1]
+        loader_requests.extend((var, kwargs) for var in calc._input_vars())
+    return requests
+
+
+def _compute_sharing_opens(calcs, compute_kwargs, share_loads=False,
+                           merge_date_ranges=False):
+    """Execute Calcs, opening the input files they share only once.
+
+    Each Calc's inputs are opened up front, together with those of the
+    other Calcs from the same DataLoader, and each Calc then loads its data
+    from these openings.  If share_loads is True, Calcs differing only in
+    their output time interval, and, if merge_date_ranges is True, in
+    overlapping date ranges, also share a single load of their data (see
+    ``_compute_sharing_data``).  Calcs given as ``_CalcSpec`` objects are
+    each created once, one group at a time, as they are executed.
+    """
+    if share_loads:
+        groups = _group_by_shared_data(calcs, merge_date_ranges)
+    else:
+        groups = [([i], _date_range(calc)) for i, calc in enumerate(calcs)]
+    requests = _sharing_opens_requests(calcs, groups)
+    with contextlib.ExitStack() as stack:
+        for data_loader, loader_requests in requests.values():
+            stack.enter_context(data_loader._sharing_opens(loader_requests))
+        result = [None] * len(calcs)
+        for indices, date_range in groups:
+            group = [_to_calc(calcs[i]) for i in indices]
+            for i, res in zip(indices, _compute_sharing_data(
+                    group, date_range, compute_kwargs)):
+                result[i] = res
+        return result
+
+
+def _can_import(names):
+    """Whether all of the modules with the given names can be imported."""
+    try:
+        for name in names:
+            importlib.import_module(name)
+    except ImportError:
+        return False
+    return True
+
+
+def _importable_on_workers(client, names):
+    """Whether all workers of a distributed client can import the modules."""
+    try:
+        return all(client.run(_can_import, sorted(names)).values())
+    except Exception:
+        return False
+
+
 def _submit_calcs_on_client(calcs, client, func):
-    """Submit calculations via dask.bag and a distributed client"""
+    """Submit calculations via dask.bag and a distributed client
+
+    Calcs created by a CalcSuite, and the _CalcSpec objects describing them,
+    are sent to the workers as references to the objects of their object
+    library (see ``_CalcSpec``), unless any worker cannot import the library,
+    in which case they are sent with the objects themselves.
+    """
     logging.info('Connected to client: {}'.format(client))
+    specs = [calc if isinstance(calc, _CalcSpec) else calc._spec
+             for calc in calcs]
+    names = set(spec.obj_lib_name for spec in specs
+                if spec is not None and spec.names is not None)
+    if names and not _importable_on_workers(client, names):
+        logging.info('Not all workers can import the object libraries {}, '
+                     'so sending the Calcs with their objects'.format(
+                         sorted(names)))
+        for calc in calcs:
+            if isinstance(calc, _CalcSpec):
+                calc.names = None
+            else:
+                calc._spec = None
     if LooseVersion(dask.__version__) < '0.18':
         dask_option_setter = dask.set_options
     else:
         dask_option_setter = dask.config.set
     with dask_option_setter(get=client.get):
-        return db.from_sequence(calcs).map(func).compute()
+        # One partition per Calc, so that each is scheduled as its own task
+        # in the order submitted.
+        return db.from_sequence(calcs, partition_size=1).map(func).compute()
 
 
 def _n_workers_for_local_cluster(calcs):
@@ -299,17 +829,170 @@ def _n_workers_for_local_cluster(calcs):
     return min(cpu_count(), len(calcs))
 
 
-def _exec_calcs(calcs, parallelize=False, client=None, **compute_kwargs):
+def _calc_nbytes_in(calc):
+    """Estimate the number of bytes a Calc will read from disk.
+
+    Each file is counted once, even if multiple variables are loaded from it.
+    """
+    paths = set()
+    for file_set in calc._input_file_sets().values():
+        if file_set is not None:
+            paths.update(file_set)
+    return io.file_set_nbytes(sorted(paths))
+
+
+def _order_calcs_by_cost(calcs, costs, offline=None):
+    """Order Calcs from most to least expensive.
+
+    Starting the largest Calcs first keeps a few large ones from being left
+    to run on their own at the end of a parallel suite while the other
+    workers sit idle.
+
+    Parameters
+    ----------
+    calcs : Sequence of ``aospy.Calc`` objects
+    costs : Sequence of numbers
+        The estimated cost of each Calc, e.g. from ``_calc_nbytes_in``
+    offline : Sequence of bool, optional
+        Whether each Calc reads input files that are being recalled from
+        tape.  If given, the Calcs that do not are ordered first, so that
+        they are computed while the files of the others are recalled.
+
+    Returns
+    -------
+    list of int
+        The indices of ``calcs`` in the order they should be submitted
+    """
+    if offline is None:
+        offline = [False] * len(calcs)
+    return sorted(range(len(calcs)),
+                  key=lambda i: (bool(offline[i]), -costs[i]))
+
+
+def _local_cluster_kwargs(calcs, costs, total_memory=None):
+    """Size the workers of a LocalCluster for the given Calcs.
+
+    Each worker gets a single thread, so that it computes one Calc at a time,
+    and an equal share of the machine's memory as its memory limit.  The
+    number of workers is that of ``_n_workers_for_local_cluster``, reduced
+    if needed so that each worker's memory limit can accommodate the
+    estimated footprint of the largest Calc, i.e. ``_MEMORY_PER_BYTE_READ``
+    times the bytes it reads.  If even a single worker's cannot, one worker
+    with all of the memory is used, and a warning logged.
+
+    Parameters
+    ----------
+    calcs : Sequence of ``aospy.Calc`` objects
+    costs : Sequence of int
+        The estimated number of bytes each Calc reads from disk
+    total_memory : int, optional
+        The memory, in bytes, available to the cluster.  Defaults to the total
+        memory of this machine.
+
+    Returns
+    -------
+    dict
+        Keyword arguments for ``distributed.LocalCluster``
+    """
+    if total_memory is None:
+        total_memory = psutil.virtual_memory().total
+    n_workers = _n_workers_for_local_cluster(calcs)
+    max_footprint = _MEMORY_PER_BYTE_READ * max(costs, default=0)
+    if max_footprint > total_memory:
+        logging.warning('The largest calculation is estimated to need {0} '
+                        'bytes of memory, more than the {1} available, so '
+                        'using a single worker'.format(max_footprint,
+                                                       total_memory))
+        n_workers = 1
+    elif max_footprint:
+        n_workers = min(n_workers, total_memory // max_footprint)
+    return dict(n_workers=n_workers, threads_per_worker=1,
+                memory_limit=total_memory // n_workers)
+
+
+# State of each worker of a process pool, set by ``_init_pool_worker``.
+_POOL_WORKER_STATE = {}
+
+
+def _init_pool_worker(payload):
+    """Prepare a pool worker to compute any of the given Calcs.
+
+    The Calcs are sent to each worker once, rather than with every task.  A
+    worker process only loads the grid data of the Models of the Calcs it
+    computes, once it first needs them.  The payload is serialized with
+    cloudpickle, which, unlike the standard library pickle used by
+    multiprocessing, supports the lambdas DataLoaders may hold.
+    """
+    calcs, compute_kwargs = cloudpickle.loads(payload)
+    _POOL_WORKER_STATE['calcs'] = calcs
+    _POOL_WORKER_STATE['compute_kwargs'] = compute_kwargs
+
+
+def _compute_on_pool_worker(index):
+    """Compute the Calc with the given index on a pool worker."""
+    calc = _POOL_WORKER_STATE['calcs'][index]
+    result = _compute_or_skip_on_error(calc,
+                                       _POOL_WORKER_STATE['compute_kwargs'])
+    return cloudpickle.dumps(result)
+
+
+# Worker processes are spawned rather than forked; forking a process that
+# already holds library locks (e.g. those of HDF5 or a dask scheduler) can
+# deadlock the children.  There is no pool of threads: neither the netCDF4
+# and HDF5 libraries nor DataLoaders' caches of opened files support being
+# used from several threads at once.
+_POOL_TYPES = {'processes': multiprocessing.get_context('spawn').Pool}
+
+
+def _submit_calcs_on_pool(calcs, pool_type, n_workers, compute_kwargs):
+    """Submit calculations to a process pool.
+
+    Lighter-weight than starting a distributed.LocalCluster, which makes it
+    better suited to small suites.
+    """
+    payload = cloudpickle.dumps((calcs, compute_kwargs))
+    with pool_type(n_workers, _init_pool_worker, (payload,)) as pool:
+        result = pool.map(_compute_on_pool_worker, range(len(calcs)),
+                          chunksize=1)
+    return [cloudpickle.loads(r) for r in result]
+
+
+def _exec_calcs(calcs, parallelize=False, client=None,
+                executor='distributed', ensemble=False, share_loads=False,
+                merge_date_ranges=False, offline=None, **compute_kwargs):
     """Execute the given calculations.
 
     Parameters
     ----------
     calcs : Sequence of ``aospy.Calc`` objects
+        Or of ``_CalcSpec`` objects, in which case each Calc is only created
+        when it is executed.
     parallelize : bool, default False
         Whether to submit the calculations in parallel or not
     client : distributed.Client or None
-        The distributed Client used if parallelize is set to True; if None
-        a distributed LocalCluster is used.
+        The distributed Client used if parallelize is set to True and executor
+        is 'distributed'; if None a distributed LocalCluster is used.
+    executor : {'distributed', 'processes'}, default 'distributed'
+        How to execute the calculations if parallelize is set to True: on a
+        dask.distributed cluster, or on a local pool of processes.
+    ensemble : bool, default False
+        Whether to compute Calcs differing only in their Run together, with
+        their data stacked along a 'run' dimension.  Only used if parallelize
+        is False.
+    share_loads : bool, default False
+        Whether Calcs differing only in their output time interval and date
+        range load their input data only once, and derive their yearly
+        timeseries from its sums within each month.  Only used if
+        parallelize is False.
+    merge_date_ranges : bool, default False
+        Whether Calcs sharing loads whose date ranges overlap load their
+        input data once, over the date range spanning all of them.  Only
+        used if share_loads is True.
+    offline : Sequence of bool, optional
+        Whether each Calc reads input files that are being recalled from
+        tape (see ``_prefetch_input_files``).  If parallelize is True, those
+        that do not are submitted first; otherwise the Calcs are executed in
+        the order given.
     compute_kwargs : dict of keyword arguments passed to ``Calc.compute``
 
     Returns
@@ -324,19 +1007,100 @@ def _exec_calcs(calcs, parallelize=False, client=None, **compute_kwargs):
                 compute_kwargs['write_to_tar'] = False
             return _compute_or_skip_on_error(calc, compute_kwargs)
 
-        if client is None:
-            n_workers = _n_workers_for_local_cluster(calcs)
-            with distributed.LocalCluster(n_workers=n_workers) as cluster:
+        if executor != 'distributed' and executor not in _POOL_TYPES:
+            raise ValueError(
+                "Unrecognized executor {!r}; must be one of {}".format(
+                    executor, ['distributed'] + sorted(_POOL_TYPES)))
+        # Calcs given as _CalcSpec objects are only created by the workers
+        # computing them.
+        costs = [_calc_nbytes_in(calc) for calc in calcs]
+        order = _order_calcs_by_cost(calcs, costs, offline)
+        ordered = [calcs[i] for i in order]
+        if executor in _POOL_TYPES:
+            n_workers = _local_cluster_kwargs(calcs, costs)['n_workers']
+            pool_kwargs = dict(compute_kwargs)
+            if 'write_to_tar' in pool_kwargs:
+                pool_kwargs['write_to_tar'] = False
+            ordered_result = _submit_calcs_on_pool(
+                ordered, _POOL_TYPES[executor], n_workers, pool_kwargs)
+        elif client is None:
+            cluster_kwargs = _local_cluster_kwargs(calcs, costs)
+            with distributed.LocalCluster(**cluster_kwargs) as cluster:
                 with distributed.Client(cluster) as client:
-                    result = _submit_calcs_on_client(calcs, client, func)
+                    ordered_result = _submit_calcs_on_client(ordered, client,
+                                                             func)
         else:
-            result = _submit_calcs_on_client(calcs, client, func)
+            ordered_result = _submit_calcs_on_client(ordered, client, func)
+        # Return results in the order the Calcs were given.
+        result = [None] * len(calcs)
+        for i, res in zip(order, ordered_result):
+            result[i] = res
         if compute_kwargs['write_to_tar']:
-            _serial_write_to_tar(calcs)
+            _serial_write_to_tar([calc for calc in result if calc is not None])
         return result
     else:
-        return [_compute_or_skip_on_error(calc, compute_kwargs)
-                for calc in calcs]
+        result = [None] * len(calcs)
+        remaining = list(range(len(calcs)))
+        if ensemble:
+            calcs = [_to_calc(calc) for calc in calcs]
+            remaining = []
+            for indices in _group_by_ensemble(calcs).values():
+                if len(indices) == 1:
+                    remaining.extend(indices)
+                    continue
+                group = [calcs[i] for i in indices]
+                for i, res in zip(indices,
+                                  _compute_ensemble(group, compute_kwargs)):
+                    result[i] = res
+            remaining.sort()
+        # Calcs sharing input files are computed together, so that those
+        # files are opened only once for all of them.
+        merge_date_ranges = share_loads and merge_date_ranges
+        rest = [calcs[i] for i in remaining]
+        for indices in _group_by_input_files(rest, merge_date_ranges).values():
+            group = [rest[i] for i in indices]
+            for i, res in zip(indices, _compute_sharing_opens(
+                    group, compute_kwargs, share_loads=share_loads,
+                    merge_date_ranges=merge_date_ranges)):
+                result[remaining[i]] = res
+        return result
+
+
+def _prefetch_input_files(calcs, cmd=None):
+    """Start recalling the input files of Calcs from tape in the background.
+
+    The files of all of the Calcs are recalled together, via
+    ``aospy.utils.io.recall_files``, in a background thread.
+
+    Parameters
+    ----------
+    calcs : sequence of aospy.Calc or _CalcSpec
+    cmd : str or sequence of str, optional
+        The recall command; see ``aospy.utils.io.recall_files``.
+
+    Returns
+    -------
+    offline : list of bool
+        Whether each Calc reads any input files that are not yet online
+    thread : threading.Thread
+        The thread running the recall
+    """
+    paths_by_calc = []
+    for calc in calcs:
+        paths = set()
+        for file_set in calc._input_file_sets().values():
+            if file_set is not None:
+                paths.update(file_set)
+        paths_by_calc.append(paths)
+    paths = sorted(set().union(*paths_by_calc))
+    offline = set(path for path in paths if not io.file_is_online(path))
+    logging.info('Recalling {0} input files, of which {1} are '
+                 'offline'.format(len(paths), len(offline)))
+    thread = threading.Thread(target=io.recall_files, args=(paths, cmd),
+                              name='aospy-prefetch')
+    thread.daemon = True
+    thread.start()
+    return [bool(paths & offline) for paths in paths_by_calc], thread
 
 
 def _serial_write_to_tar(calcs):
@@ -346,6 +1110,122 @@ def _serial_write_to_tar(calcs):
                 calc._write_to_tar(dtype_out_time)
 
 
+def _plan_calc(calc, var_nbytes_by_path):
+    """Summarize the input data of a Calc without loading it.
+
+    Parameters
+    ----------
+    calc : aospy.Calc
+    var_nbytes_by_path : dict
+        The in-memory sizes of the variables in each file already inspected,
+        keyed by path.  Updated in place, so that each file's metadata is only
+        read once across Calcs.
+
+    Returns
+    -------
+    row : OrderedDict
+        One row of the plan of a suite; see ``_plan_calcs``.
+    paths, missing : set of str
+        The paths to be read, and those of them that do not exist.
+    """
+    paths = set()
+    missing = set()
+    unlocated = []
+    nbytes_memory = 0
+    file_sets = calc._input_file_sets()
+    for var in calc._input_vars():
+        file_set = file_sets[var.name]
+        if file_set is None:
+            unlocated.append(var.name)
+            continue
+        for path in file_set:
+            if not io.file_exists(path):
+                missing.add(path)
+                continue
+            paths.add(path)
+            if path not in var_nbytes_by_path:
+                var_nbytes_by_path[path] = io.file_var_nbytes(path)
+            var_nbytes = var_nbytes_by_path[path]
+            nbytes_memory += next((var_nbytes[name] for name in var.names
+                                   if name in var_nbytes), 0)
+    row = OrderedDict([
+        ('var', calc.name), ('proj', calc.proj.name),
+        ('model', calc.model.name), ('run', calc.run.name),
+        ('intvl_out', calc.intvl_out), ('n_files', len(paths)),
+        ('n_missing', len(missing)), ('unlocated', ', '.join(unlocated)),
+        ('nbytes_disk', io.file_set_nbytes(sorted(paths))),
+        ('nbytes_memory', nbytes_memory),
+    ])
+    return row, paths, missing
+
+
+def _plan_calcs(calcs):
+    """Plan the execution of the given Calcs, without loading any data.
+
+    Returns
+    -------
+    plan : pandas.DataFrame
+        One row per Calc, with the number of files it reads from
+        ('n_files'), the number of those that are missing ('n_missing'), any
+        native variables the DataLoader could not locate files for
+        ('unlocated'), the bytes it reads from disk ('nbytes_disk'), and an
+        estimate of the size of that data in memory once decoded
+        ('nbytes_memory').
+    summary : str
+        Totals over the suite, counting each file only once.
+    """
+    var_nbytes_by_path = {}
+    rows = []
+    all_paths = set()
+    all_missing = set()
+    for calc in calcs:
+        row, paths, missing = _plan_calc(calc, var_nbytes_by_path)
+        rows.append(row)
+        all_paths.update(paths)
+        all_missing.update(missing)
+    for path in sorted(all_missing):
+        logging.warning('Input file not found: {}'.format(path))
+    plan = pd.DataFrame(rows, columns=list(rows[0]) if rows else None)
+    summary = ('{0} Calcs reading {1} unique files ({2} bytes on disk); '
+               '{3} files missing'.format(
+                   len(rows), len(all_paths),
+                   io.file_set_nbytes(sorted(all_paths)), len(all_missing)))
+    return plan, summary
+
+
+def _profile_records(results):
+    """Gather the stage records of each computed Calc, labeled by Calc."""
+    records = []
+    for calc in results:
+        if calc is not None:
+            records.extend(_merge_dicts(record, {'calc': str(calc)})
+                           for record in calc.profile_records)
+    return records
+
+
+def _report_profile(results, trace_path=None):
+    """Print a profiling report of the given Calcs, and optionally a trace.
+
+    Parameters
+    ----------
+    results : list
+        The values returned by each ``Calc.compute`` call; None for failed
+        calculations, which are left out.
+    trace_path : str or None
+        If given, where to write the stage records in the Chrome trace event
+        format.
+    """
+    records = _profile_records(results)
+    if not records:
+        logging.warning('No profile records found; no calculations were '
+                        'completed.')
+        return
+    print(profiling.report(records))
+    if trace_path is not None:
+        profiling.write_chrome_trace(records, trace_path)
+        logging.info('Wrote profile trace to {}'.format(trace_path))
+
+
 def _print_suite_summary(calc_suite_specs):
     """Print summary of requested calculations."""
     return ('\nRequested aospy calculations:\n' +
@@ -463,9 +1343,69 @@ def submit_mult_calcs(calc_suite_specs, exec_options=None):
               submitting for execution.
         - parallelize : (default False) If True, submit calculations in
               parallel.
+        - executor : {'distributed', 'processes'} (default
+              'distributed') How to execute calculations if parallelize is
+              True.  'distributed' uses a dask.distributed cluster, while
+              'processes' uses a local pool of processes, which avoids the
+              startup cost of a cluster for small suites.
         - client : distributed.Client or None (default None) The
               dask.distributed Client used to schedule computations.  If None
-              and parallelize is True, a LocalCluster will be started.
+              and parallelize is True, a LocalCluster will be started.  Only
+              used if executor is 'distributed'.  If the object library is
+              an importable module, and all of the workers can import it,
+              each calculation is sent to the workers as references to the
+              objects of the library, which the workers look up in their own
+              imports of it.  Otherwise the objects themselves are sent.
+        - dry_run : (default False) If True, do not execute the
+              calculations.  Instead, determine the files each would read,
+              without loading their data, and print and return a table of
+              the number of files, missing files, bytes on disk, and
+              estimated bytes in memory of each calculation.
+        - profile : (default False) If True, once the calculations are
+              complete, print a report of the time spent in each stage of
+              them across the suite, the slowest calculations and files,
+              and cache hit rates.  If a path, additionally write the
+              timing of each stage to it in the Chrome trace event format,
+              viewable with e.g. chrome://tracing.
+        - prefetch : (default False) If True, before executing the
+              calculations, start recalling all of their input files from
+              tape storage in the background with a single batched 'dmget'
+              command, and execute first those calculations whose input
+              files are already online.  If a command (a string, or a list
+              of the command and any arguments), use it, with all of the
+              input paths appended, in place of 'dmget'.  Each calculation
+              still waits for its own files to be online before reading
+              them.
+        - ensemble : (default False) If True, compute calculations that
+              differ only in their :py:class:`aospy.Run` (all of the same
+              :py:class:`aospy.Model`) together: their input data are
+              stacked along a 'run' dimension, and the calculation and its
+              time, vertical, and regional reductions are performed once,
+              vectorized across the runs, before the results of each run
+              are saved as usual.  The data of the runs must share the same
+              times; if they do not, each run is computed on its own.  Only
+              used if parallelize is False.
+        - share_loads : (default False) If True, calculations that differ
+              only in their output time interval (e.g. the annual,
+              seasonal, and monthly means of a variable) load their input
+              data and perform the calculation only once.  The timeseries
+              and its weights are summed within each month of each year,
+              and the yearly timeseries of each output interval derived
+              from these sums.  The results agree with those computed
+              separately up to floating point round-off, and the monthly
+              sums of each group are held in memory until all of its
+              calculations are complete.  Only used if parallelize is
+              False.
+        - merge_date_ranges : (default False) If True, calculations
+              sharing loads (see ``share_loads``) whose date ranges overlap,
+              e.g. rolling climatologies, load their input data only once,
+              over the date range spanning all of them, and derive the
+              results for each date range from the sums within each month.
+              A date range that includes only some of the data within a
+              month is computed on its own.  Peak memory then grows with
+              the span of all of the merged date ranges, rather than with
+              the longest of them, since the input data over the whole span
+              is loaded at once.  Only used if share_loads is True.
         - write_to_tar : (default True) If True, write results of calculations
               to .tar files, one for each :py:class:`aospy.Run` object.
               These tar files have an identical directory structures the
@@ -485,6 +1425,9 @@ def submit_mult_calcs(calc_suite_specs, exec_options=None):
 
     If any error occurred during a calculation, the return value is None.
 
+    If the ``dry_run`` option is set to True, a pandas.DataFrame summarizing
+    the input data of each calculation is returned instead.
+
     Raises
     ------
     AospyException
@@ -494,15 +1437,40 @@ def submit_mult_calcs(calc_suite_specs, exec_options=None):
     """
     if exec_options is None:
         exec_options = dict()
+    dry_run = exec_options.pop('dry_run', False)
+    profile = exec_options.pop('profile', False)
+    prefetch = exec_options.pop('prefetch', False)
     if exec_options.pop('prompt_verify', False):
         print(_print_suite_summary(calc_suite_specs))
         _user_verify()
     calc_suite = CalcSuite(calc_suite_specs)
-    calcs = calc_suite.create_calcs()
+    calcs = list(calc_suite._iter_calc_specs())
     if not calcs:
         raise AospyException(
             "The specified combination of parameters yielded zero "
             "calculations.  Most likely, one of the parameters is "
             "inadvertently empty."
         )
-    return _exec_calcs(calcs, **exec_options)
+    if dry_run:
+        plan, summary = _plan_calcs([_to_calc(calc) for calc in calcs])
+        print(plan.to_string())
+        print(summary)
+        return plan
+    if prefetch:
+        offline, thread = _prefetch_input_files(
+            calcs, None if prefetch is True else prefetch)
+        # Execute the Calcs whose input files are all online first, while
+        # the others' files are recalled.
+        order = sorted(range(len(calcs)), key=lambda i: offline[i])
+        ordered_results = _exec_calcs(
+            [calcs[i] for i in order], offline=[offline[i] for i in order],
+            **exec_options)
+        thread.join()
+        results = [None] * len(calcs)
+        for i, res in zip(order, ordered_results):
+            results[i] = res
+    else:
+        results = _exec_calcs(calcs, **exec_options)
+    if profile:
+        _report_profile(results, None if profile is True else profile)
+    return results
@@ -1,5 +1,7 @@
 """Functionality for performing user-specified calculations on aospy data."""
 from collections import OrderedDict
+import hashlib
+import json
 import logging
 import os
 import shutil
@@ -8,6 +10,7 @@ import tarfile
 from time import ctime
 
 import numpy as np
+import pandas as pd
 import xarray as xr
 
 from ._constants import GRAV_EARTH
@@ -42,6 +45,70 @@ def _replace_pressure(arguments, dtype_in_vert):
     return arguments_out
 
 
+def _date_bounds(run, date_range):
+    """The start and end dates of a Calc of the given Run and date range."""
+    if date_range == 'default':
+        return (utils.times.ensure_datetime(run.default_start_date),
+                utils.times.ensure_datetime(run.default_end_date))
+    return (utils.times.ensure_datetime(date_range[0]),
+            utils.times.ensure_datetime(date_range[-1]))
+
+
+def _data_loader_attrs(var, intvl_in, dtype_in_vert, dtype_in_time,
+                       intvl_out):
+    """The attributes passed to the DataLoader by a Calc of the given Var."""
+    return dict(domain=var.domain, intvl_in=intvl_in,
+                dtype_in_vert=dtype_in_vert, dtype_in_time=dtype_in_time,
+                intvl_out=intvl_out)
+
+
+def _input_vars(var, dtype_in_vert, dtype_out_vert):
+    """Get the model-native Vars that computing a Calc of the Var loads."""
+    if getattr(var, 'variables', False):
+        to_visit = _replace_pressure(var.variables, dtype_in_vert)
+    else:
+        to_visit = _replace_pressure((var,), dtype_in_vert)
+    if (dtype_out_vert in ('vert_int', 'vert_av') and var.def_vert and
+            dtype_in_vert in _DP_VARS):
+        to_visit.append(_DP_VARS[dtype_in_vert])
+        if dtype_out_vert == 'vert_av':
+            to_visit.append(utils.vertcoord.ps)
+    native = OrderedDict()
+    while to_visit:
+        var = to_visit.pop(0)
+        if not isinstance(var, Var):
+            continue
+        if var.variables is None:
+            native.setdefault(var.name, var)
+        else:
+            to_visit.extend(var.variables)
+    return list(native.values())
+
+
+def _input_file_sets(data_loader, input_vars, start_date, end_date,
+                     data_loader_attrs):
+    """Get the files on disk from which the given Vars are loaded.
+
+    Returns
+    -------
+    OrderedDict
+        Maps the name of each model-native Var to be loaded to the list of
+        paths of its files, or to None if the DataLoader cannot locate any
+        (e.g. for grid attributes taken from the Model instead).
+    """
+    file_sets = OrderedDict()
+    for var in input_vars:
+        try:
+            file_set = data_loader._generate_file_set(
+                var=var, start_date=start_date, end_date=end_date,
+                **data_loader_attrs)
+        except (KeyError, IOError, NotImplementedError):
+            file_sets[var.name] = None
+        else:
+            file_sets[var.name] = utils.io.expand_file_set(file_set)
+    return file_sets
+
+
 class Calc(object):
     """Class for executing, saving, and loading a single computation."""
 
@@ -64,6 +131,18 @@ class Calc(object):
 
     __repr__ = __str__
 
+    def __reduce_ex__(self, protocol):
+        """Pickle as a compact spec if created by a CalcSuite.
+
+        The Calc is rebuilt from the spec on unpickling; only its output data
+        and profile records are pickled along with it.
+        """
+        if self._spec is None:
+            return super(Calc, self).__reduce_ex__(protocol)
+        state = {'data_out': self.data_out,
+                 'profile_records': self.profile_records}
+        return self._spec.to_calc, (), state
+
     def _dir_out(self):
         """Create string of the data directory to save individual .nc files."""
         return os.path.join(self.proj.direc_out, self.proj.name,
@@ -225,22 +304,12 @@ class Calc(object):
         self.region = region
 
         self.months = utils.times.month_indices(intvl_out)
-        if date_range == 'default':
-            self.start_date = utils.times.ensure_datetime(
-                self.run.default_start_date)
-            self.end_date = utils.times.ensure_datetime(
-                self.run.default_end_date)
-        else:
-            self.start_date = utils.times.ensure_datetime(date_range[0])
-            self.end_date = utils.times.ensure_datetime(date_range[-1])
+        self.start_date, self.end_date = _date_bounds(self.run, date_range)
 
         self.time_offset = time_offset
-        self.data_loader_attrs = dict(
-            domain=self.domain, intvl_in=self.intvl_in,
-            dtype_in_vert=self.dtype_in_vert,
-            dtype_in_time=self.dtype_in_time, intvl_out=self.intvl_out)
-
-        self.model.set_grid_data()
+        self.data_loader_attrs = _data_loader_attrs(
+            self.var, self.intvl_in, self.dtype_in_vert, self.dtype_in_time,
+            self.intvl_out)
 
         self.dir_out = self._dir_out()
         self.dir_tar_out = self._dir_tar_out()
@@ -250,6 +319,18 @@ class Calc(object):
         self.path_tar_out = self._path_tar_out()
 
         self.data_out = {}
+        self.profile_records = []
+        # Set by CalcSuite to a spec from which this Calc can be recreated.
+        self._spec = None
+        # Set to share the input data of Calcs differing only in intvl_out
+        # and date_range: the months of the year and date range to load for
+        # all of them, and the monthly sums of the resulting timeseries (see
+        # ``_compute_monthly_sums``).
+        self._shared_load = None
+        self._monthly_sums = None
+        # Set to the Calcs of an ensemble of Runs to compute them together,
+        # stacked along a 'run' dimension (see ``_get_ensemble_input_data``).
+        self._ensemble = None
 
     def _to_desired_dates(self, arr):
         """Restrict the xarray DataArray or Dataset to the desired months."""
@@ -258,8 +339,52 @@ class Calc(object):
         )
         return arr.sel(time=times)
 
+    def _compare_grid_attr(self, arr, name_int, model_attr):
+        """Compare a grid attribute of the Run's data to that of the Model.
+
+        The most recent result for each Run and attribute is cached on the
+        Model, along with the Model's grid attribute and a fingerprint of the
+        data's values it was made for, so that the comparison, and any
+        message about it, is made only once per Run rather than for each
+        variable loaded.
+
+        Returns
+        -------
+        {'equal', 'close', 'different'}
+        """
+        values = arr.values
+        fingerprint = (values.shape, values.dtype.str,
+                       hashlib.sha1(values.tobytes()).hexdigest())
+        key = (self.run.name, name_int)
+        comparisons = self.model._grid_attr_comparisons
+        cached = comparisons.get(key)
+        if (cached is not None and cached[0] is model_attr and
+                cached[1] == fingerprint):
+            return cached[2]
+        if np.array_equal(values, model_attr):
+            comparison = 'equal'
+        elif np.allclose(values, model_attr):
+            comparison = 'close'
+            msg = ("Values for '{0}' are nearly (but not exactly) "
+                   "the same in the Run {1} and the Model {2}.  "
+                   "Therefore replacing Run's values with the "
+                   "model's.".format(name_int, self.run, self.model))
+            logging.info(msg)
+        else:
+            comparison = 'different'
+            msg = ("Model coordinates for '{0}' do not match those"
+                   " in Run: {1} vs. {2}"
+                   "".format(name_int, arr, model_attr))
+            logging.info(msg)
+        comparisons[key] = (model_attr, fingerprint, comparison)
+        return comparison
+
     def _add_grid_attributes(self, ds):
-        """Add model grid attributes to a dataset"""
+        """Add model grid attributes to a dataset.
+
+        Only the grid attributes themselves are loaded into memory, and not
+        the dataset's data variables.
+        """
         for name_int, names_ext in self._grid_attrs.items():
             ds_coord_name = set(names_ext).intersection(set(ds.coords) |
                                                         set(ds.data_vars))
@@ -268,35 +393,49 @@ class Calc(object):
                 # Force coords to have desired name.
                 ds = ds.rename({list(ds_coord_name)[0]: name_int})
                 ds = ds.set_coords(name_int)
-                if not np.array_equal(ds[name_int], model_attr):
-                    if np.allclose(ds[name_int], model_attr):
-                        msg = ("Values for '{0}' are nearly (but not exactly) "
-                               "the same in the Run {1} and the Model {2}.  "
-                               "Therefore replacing Run's values with the "
-                               "model's.".format(name_int, self.run,
-                                                 self.model))
-                        logging.info(msg)
-                        ds[name_int].values = model_attr.values
-                    else:
-                        msg = ("Model coordinates for '{0}' do not match those"
-                               " in Run: {1} vs. {2}"
-                               "".format(name_int, ds[name_int], model_attr))
-                        logging.info(msg)
-
-            else:
+                comparison = self._compare_grid_attr(ds[name_int], name_int,
+                                                     model_attr)
+                if comparison == 'close':
+                    ds = ds.assign_coords(**{name_int: ds[name_int].copy(
+                        data=model_attr.values)})
+            elif model_attr is not None:
                 # Bring in coord from model object if it exists.
-                ds = ds.load()
-                if model_attr is not None:
-                    ds[name_int] = model_attr
-                    ds = ds.set_coords(name_int)
+                ds[name_int] = model_attr
+                ds = ds.set_coords(name_int)
             if (self.dtype_in_vert == 'pressure' and
                     internal_names.PLEVEL_STR in ds.coords):
                 self.pressure = ds.level
         return ds
 
+    def _get_ensemble_input_data(self, var, start_date, end_date):
+        """Get the data for a single variable from each Run of the ensemble.
+
+        The data of the Runs are stacked along a new 'run' dimension, and
+        must share the same time and space coordinates.
+        """
+        ensemble, self._ensemble = self._ensemble, None
+        try:
+            arrs = [calc._get_input_data(var, start_date, end_date)
+                    for calc in ensemble]
+        finally:
+            self._ensemble = ensemble
+        if isinstance(var, (float, int)):
+            return arrs[0]
+        runs = pd.Index([calc.run.name for calc in ensemble],
+                        name=internal_names.RUN_STR)
+        with utils.profiling.stage('stack', var=var.name):
+            return xr.concat(arrs, dim=runs, coords='different',
+                             compat='equals', join='exact')
+
     def _get_input_data(self, var, start_date, end_date):
         """Get the data for a single variable over the desired date range."""
+        if self._ensemble is not None:
+            return self._get_ensemble_input_data(var, start_date, end_date)
         logging.info(self._print_verbose("Getting input data:", var))
+        # Grid data is only loaded once input data is first needed.
+        with utils.profiling.stage('grid_data', model=self.model.name,
+                                   cache_hit=self.model._grid_data_is_set):
+            self.model.set_grid_data()
 
         if isinstance(var, (float, int)):
             return var
@@ -308,7 +447,9 @@ class Calc(object):
                 var, start_date, end_date, self.time_offset, self.model,
                 **self.data_loader_attrs)
             name = data.name
-            data = self._add_grid_attributes(data.to_dataset(name=data.name))
+            with utils.profiling.stage('grid_attrs', var=var.name):
+                data = self._add_grid_attributes(
+                    data.to_dataset(name=data.name))
             data = data[name]
             if cond_pfull:
                 try:
@@ -334,9 +475,23 @@ class Calc(object):
                 for var in _replace_pressure(self.variables,
                                              self.dtype_in_vert)]
 
+    def _input_vars(self):
+        """Get the model-native Vars that computing this Calc loads."""
+        return _input_vars(self.var, self.dtype_in_vert, self.dtype_out_vert)
+
+    def _input_file_sets(self):
+        """Get the files on disk that computing this Calc reads from.
+
+        See ``_input_file_sets`` for the returned mapping.
+        """
+        return _input_file_sets(self.data_loader, self._input_vars(),
+                                self.start_date, self.end_date,
+                                self.data_loader_attrs)
+
     def _local_ts(self, *data):
         """Perform the computation at each gridpoint and time index."""
-        return self.function(*data).rename(self.name)
+        with utils.profiling.stage('derive', var=self.name):
+            return self.function(*data).rename(self.name)
 
     def _compute(self, data):
         """Perform the calculation."""
@@ -355,18 +510,63 @@ class Calc(object):
         if self.dtype_out_vert in vert_types and self.var.def_vert:
             dp = self._get_input_data(_DP_VARS[self.dtype_in_vert],
                                       self.start_date, self.end_date)
-            full_ts = utils.vertcoord.int_dp_g(full_ts, dp)
+            with utils.profiling.stage('vert_reduce'):
+                full_ts = utils.vertcoord.int_dp_g(full_ts, dp)
             if self.dtype_out_vert == 'vert_av':
                 ps = self._get_input_data(utils.vertcoord.ps,
                                           self.start_date, self.end_date)
-                full_ts *= (GRAV_EARTH / ps)
+                with utils.profiling.stage('vert_reduce'):
+                    full_ts *= (GRAV_EARTH / ps)
         return full_ts, dt
 
+    def _compute_monthly_sums(self, months, start_date, end_date):
+        """Compute the monthly sums of the timeseries over the given months.
+
+        The input data are loaded, and the calculation performed, for all of
+        the given months of the year within the given date range, so that
+        the yearly timeseries of any output interval and date range within
+        them can be derived from the result, which is stored in
+        ``_monthly_sums`` along with the times summed over.
+        """
+        own = self.months, self.start_date, self.end_date
+        self.months, self.start_date, self.end_date = (months, start_date,
+                                                       end_date)
+        try:
+            data = self._get_all_data(self.start_date, self.end_date)
+            full, full_dt = self._compute_full_ts(data)
+        finally:
+            self.months, self.start_date, self.end_date = own
+        with utils.profiling.stage('monthly_sums'):
+            sums, weights = utils.times.monthly_sums(full, full_dt)
+            self._monthly_sums = (sums.load(), weights.load(),
+                                  full[internal_names.TIME_STR].load())
+
+    def _yearly_ts_from_monthly_sums(self):
+        """Derive the yearly timeseries from the shared monthly sums.
+
+        Returns None if this Calc's date range includes only part of a month
+        of the data summed over, in which case it must be computed directly.
+        """
+        sums, weights, time = self._monthly_sums
+        year_months = utils.times.year_months_within(time, self.start_date,
+                                                     self.end_date)
+        if year_months is None:
+            return None
+        arr = utils.times.yearly_average_from_monthly_sums(
+            sums, weights, self.months, year_months=year_months)
+        # The sums are of data subset to the shared date range.
+        subset_dates = {internal_names.SUBSET_START_DATE_STR: self.start_date,
+                        internal_names.SUBSET_END_DATE_STR: self.end_date}
+        return arr.assign_coords(**{
+            name: xr.DataArray(date) for name, date in subset_dates.items()
+            if name in arr.coords})
+
     def _full_to_yearly_ts(self, arr, dt):
         """Average the full timeseries within each year."""
         time_defined = self.def_time and not ('av' in self.dtype_in_time)
         if time_defined:
-            arr = utils.times.yearly_average(arr, dt)
+            with utils.profiling.stage('yearly_average'):
+                arr = utils.times.yearly_average(arr, dt)
         return arr
 
     def _time_reduce(self, arr, reduction):
@@ -426,20 +626,56 @@ class Calc(object):
         reduced = {}
         for reduc, specs in zip(self.dtype_out_time, reduc_specs):
             func = specs[-1]
-            if 'reg' in specs:
-                reduced.update({reduc: self.region_calcs(data, func)})
-            else:
-                reduced.update({reduc: self._time_reduce(data, func)})
+            with utils.profiling.stage('reduce', reduction=reduc):
+                if 'reg' in specs:
+                    reduced.update({reduc: self.region_calcs(data, func)})
+                else:
+                    reduced.update({reduc: self._time_reduce(data, func)})
         return OrderedDict(sorted(reduced.items(), key=lambda t: t[0]))
 
     def compute(self, write_to_tar=True):
-        """Perform all desired calculations on the data and save externally."""
-        data = self._get_all_data(self.start_date, self.end_date)
+        """Perform all desired calculations on the data and save externally.
+
+        The wall time, bytes read, and memory use of each stage of the
+        calculation are recorded in the ``profile_records`` attribute (see
+        :py:class:`aospy.utils.profiling.Recorder`) and logged as JSON.
+        """
+        recorder = utils.profiling.Recorder()
+        with utils.profiling.recording(recorder):
+            with utils.profiling.stage('compute'):
+                self._compute_and_save(write_to_tar)
+        self.profile_records = recorder.records
+        logging.info('Profile: {}'.format(json.dumps(
+            dict(calc=str(self), stages=self.profile_records))))
+        return self
+
+    def _compute_and_save(self, write_to_tar):
+        """Perform all desired calculations on the data and save them."""
         logging.info('Computing timeseries for {0} -- '
                      '{1}.'.format(self.start_date, self.end_date))
-        full, full_dt = self._compute_full_ts(data)
-        full_out = self._full_to_yearly_ts(full, full_dt)
+        if self._shared_load is not None:
+            self._compute_monthly_sums(*self._shared_load)
+        full_out = None
+        if self._monthly_sums is not None:
+            with utils.profiling.stage('yearly_average'):
+                full_out = self._yearly_ts_from_monthly_sums()
+        if full_out is None:
+            data = self._get_all_data(self.start_date, self.end_date)
+            full, full_dt = self._compute_full_ts(data)
+            full_out = self._full_to_yearly_ts(full, full_dt)
         reduced = self._apply_all_time_reductions(full_out)
+        if self._ensemble is None:
+            self._save_reduced(reduced, write_to_tar)
+            return
+        # Each Calc of the ensemble saves the results for its own Run.
+        for calc in self._ensemble:
+            calc._save_reduced(OrderedDict(
+                (dtype_time, data.sel(
+                    drop=True, **{internal_names.RUN_STR: calc.run.name}))
+                for dtype_time, data in reduced.items()), write_to_tar)
+
+    def _save_reduced(self, reduced, write_to_tar):
+        """Save the results of each time-reduction."""
         logging.info("Writing desired gridded outputs to disk.")
         for dtype_time, data in reduced.items():
             data = _add_metadata_as_attrs(data, self.var.units,
@@ -447,7 +683,6 @@ class Calc(object):
                                           self.dtype_out_vert)
             self.save(data, dtype_time, dtype_out_vert=self.dtype_out_vert,
                       save_files=True, write_to_tar=write_to_tar)
-        return self
 
     def _save_files(self, data, dtype_out_time):
         """Save the data to netcdf files in direc_out."""
@@ -456,7 +691,10 @@ class Calc(object):
             os.makedirs(self.dir_out)
         if 'reg' in dtype_out_time:
             try:
-                reg_data = xr.open_dataset(path)
+                # Read the file fully and close it, so that it can be
+                # replaced below.
+                with xr.open_dataset(path) as ds:
+                    reg_data = ds.load()
             except (EOFError, RuntimeError, IOError):
                 reg_data = xr.Dataset()
             reg_data.update(data)
@@ -465,7 +703,21 @@ class Calc(object):
             data_out = data
         if isinstance(data_out, xr.DataArray):
             data_out = xr.Dataset({self.name: data_out})
-        data_out.to_netcdf(path, engine='netcdf4', format='NETCDF3_64BIT')
+        # Replace any existing file with a new one, rather than overwrite it
+        # in place, since data loaded from it earlier with ``mmap=True`` may
+        # still be memory-mapped views onto it.  Those held by this Calc are
+        # copied into memory first, since a mapped file cannot be replaced on
+        # Windows.
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        try:
+            data_out.to_netcdf(tmp_path, engine='netcdf4',
+                               format='NETCDF3_64BIT')
+            if dtype_out_time in self.data_out:
+                utils.io.release_memory_maps(self.data_out[dtype_out_time])
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
     def _write_to_tar(self, dtype_out_time):
         """Add the data to the tar file in tar_out_direc."""
@@ -525,17 +777,35 @@ class Calc(object):
         """Save aospy data to data_out attr and to an external file."""
         self._update_data_out(data, dtype_out_time)
         if save_files:
-            self._save_files(data, dtype_out_time)
+            with utils.profiling.stage('write', reduction=dtype_out_time):
+                self._save_files(data, dtype_out_time)
         if write_to_tar and self.proj.tar_direc_out:
-            self._write_to_tar(dtype_out_time)
+            with utils.profiling.stage('write_tar', reduction=dtype_out_time):
+                self._write_to_tar(dtype_out_time)
         logging.info('\t{}'.format(self.path_out[dtype_out_time]))
 
     def _load_from_disk(self, dtype_out_time, dtype_out_vert=False,
-                        region=False):
-        """Load aospy data saved as netcdf files on the file system."""
-        ds = xr.open_dataset(self.path_out[dtype_out_time])
+                        region=False, mmap=False):
+        """Load aospy data saved as netcdf files on the file system.
+
+        If mmap is True, the files are memory-mapped, so that their data are
+        only read as they are used, and are shared by all processes loading
+        them.  Otherwise only the requested variable is read into memory,
+        and the files are closed.
+        """
+        path = self.path_out[dtype_out_time]
+        name = region.name if region else self.name
+        arr = None
+        if mmap:
+            try:
+                arr = utils.io.open_dataset_mmap(path)[name]
+            except TypeError:
+                # Not of the classic netCDF format saved by aospy.
+                pass
+        if arr is None:
+            with xr.open_dataset(path) as ds:
+                arr = ds[name].load()
         if region:
-            arr = ds[region.name]
             # Use region-specific pressure values if available.
             if (self.dtype_in_vert == internal_names.ETA_STR
                     and not dtype_out_vert):
@@ -551,8 +821,7 @@ class Calc(object):
                     return arr.rename({reg_pfull_str:
                                        internal_names.PFULL_STR})
                 return arr
-            return arr
-        return ds[self.name]
+        return arr
 
     def _load_from_tar(self, dtype_out_time, dtype_out_vert=False):
         """Load data save in tarball form on the file system."""
@@ -565,8 +834,14 @@ class Calc(object):
             return ds[self.name]
 
     def load(self, dtype_out_time, dtype_out_vert=False, region=False,
-             plot_units=False, mask_unphysical=False):
-        """Load the data from the object if possible or from disk."""
+             plot_units=False, mask_unphysical=False, mmap=False):
+        """Load the data from the object if possible or from disk.
+
+        If mmap is True, data loaded from files on disk are read-only,
+        big-endian views onto the memory-mapped files (see
+        ``aospy.utils.io.open_dataset_mmap``), rather than copies of them in
+        memory.
+        """
         msg = ("Loading data from disk for object={0}, dtype_out_time={1}, "
                "dtype_out_vert={2}, and region="
                "{3}".format(self, dtype_out_time, dtype_out_vert, region))
@@ -578,7 +853,7 @@ class Calc(object):
             # Otherwise get from disk.  Try scratch first, then archive.
             try:
                 data = self._load_from_disk(dtype_out_time, dtype_out_vert,
-                                            region=region)
+                                            region=region, mmap=mmap)
             except IOError:
                 data = self._load_from_tar(dtype_out_time, dtype_out_vert)
         # Copy the array to self.data_out for ease of future access.
@@ -1,7 +1,10 @@
 """aospy DataLoader objects"""
+from collections import OrderedDict
+import contextlib
 import logging
 import os
 import pprint
+import threading
 import warnings
 
 import numpy as np
@@ -10,13 +13,128 @@ import xarray as xr
 from .internal_names import (
     ETA_STR,
     GRID_ATTRS,
+    RAW_END_DATE_STR,
+    RAW_START_DATE_STR,
     TIME_STR,
     TIME_BOUNDS_STR,
+    TIME_WEIGHTS_STR,
 )
-from .utils import times, io
+from .utils import times, io, profiling
 
 
-def _preprocess_and_rename_grid_attrs(func, grid_attrs=None, **kwargs):
+def _no_preprocess(ds, **kwargs):
+    """Default preprocess function of DataLoaders, which does nothing."""
+    return ds
+
+
+def _unneeded_var_names(ds, var_names, grid_attrs=None):
+    """Names of all data variables other than those named and grid attributes.
+
+    Grid attributes are recognized by any of their possible names, internal
+    or not, so this can be applied before renaming them.  Any variable
+    referred to by the 'bounds' attribute of a kept variable is also kept.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+    var_names : sequence of str
+        Names of the variables to keep
+    grid_attrs : dict (optional)
+        Overriding dictionary of grid attributes mapping aospy internal
+        names to names of grid attributes used in a particular model.
+
+    Returns
+    -------
+    list of str
+    """
+    keep = set(var_names).union(GRID_ATTRS)
+    for names in GRID_ATTRS.values():
+        keep.update(names)
+    if grid_attrs is not None:
+        keep.update(grid_attrs.values())
+    kept = keep.intersection(ds.variables)
+    keep.update(ds[name].attrs['bounds'] for name in kept
+                if 'bounds' in ds[name].attrs)
+    return [name for name in ds.data_vars if name not in keep]
+
+
+def _drop_unneeded_vars(ds, var_names, grid_attrs=None):
+    """Drop all data variables other than those named and grid attributes.
+
+    See ``_unneeded_var_names`` for a description of the parameters.
+    """
+    return ds.drop(_unneeded_var_names(ds, var_names, grid_attrs))
+
+
+def _signature(ds):
+    """The names of the variables and dimensions of a Dataset."""
+    return frozenset(ds.variables), frozenset(ds.dims)
+
+
+class _PreprocessPlan(object):
+    """How to prepare each file of a file set for aospy.
+
+    The plan is inferred from the first file prepared, after any custom
+    preprocessing: which data variables to drop, a single mapping with which
+    to rename grid attributes to their aospy names, and which variables to
+    then set as coordinates.  Each subsequent file with the same variables
+    and dimensions is prepared by applying the plan, which is faster than
+    inferring it again for each file; any other file is prepared from
+    scratch, as by ``_drop_unneeded_vars`` and ``grid_attrs_to_aospy_names``.
+
+    Parameters
+    ----------
+    grid_attrs : dict (optional)
+        Overriding dictionary of grid attributes mapping aospy internal
+        names to names of grid attributes used in a particular model.
+    var_names : sequence of str (optional)
+        Names of the variables to be loaded.  If given, all other data
+        variables, except for grid attributes, are dropped.
+    """
+    def __init__(self, grid_attrs=None, var_names=None):
+        self.grid_attrs = grid_attrs
+        self.var_names = var_names
+        # Names of variables not to decode from each file at all, if known.
+        self.drop_variables = None
+        self._signature = None
+        self._drop = None
+        self._rename = None
+        self._coords = None
+
+    def _prepare(self, ds):
+        """Prepare a Dataset without the plan."""
+        if self.var_names is not None:
+            ds = _drop_unneeded_vars(ds, self.var_names, self.grid_attrs)
+        return grid_attrs_to_aospy_names(ds, self.grid_attrs)
+
+    def _infer(self, ds):
+        """Infer the plan from a Dataset."""
+        drop = []
+        if self.var_names is not None:
+            drop = _unneeded_var_names(ds, self.var_names, self.grid_attrs)
+        names = set(ds.variables).union(ds.dims).difference(drop)
+        rename = _grid_attrs_renaming(names, self.grid_attrs)
+        renamed = {rename.get(name, name) for name in names}
+        self._coords = set(GRID_ATTRS).intersection(renamed)
+        self._drop = drop
+        self._rename = rename
+        self._signature = _signature(ds)
+
+    def __call__(self, ds):
+        """Prepare a Dataset opened from one of the files."""
+        if self._signature is None:
+            self._infer(ds)
+        elif _signature(ds) != self._signature:
+            return self._prepare(ds)
+        if self._drop:
+            ds = ds.drop(self._drop)
+        if self._rename:
+            ds = ds.rename(self._rename)
+        return ds.set_coords(self._coords.intersection(ds.data_vars))
+
+
+def _preprocess_and_rename_grid_attrs(func, grid_attrs=None, var_names=None,
+                                      plan=None, **kwargs):
     """Call a custom preprocessing method first then rename grid attrs.
 
     This wrapper is needed to generate a single function to pass to the
@@ -35,6 +153,14 @@ def _preprocess_and_rename_grid_attrs(func, grid_attrs=None, **kwargs):
     grid_attrs : dict (optional)
         Overriding dictionary of grid attributes mapping aospy internal
         names to names of grid attributes used in a particular model.
+    var_names : sequence of str (optional)
+        Names of the variables to be loaded.  If given, all other data
+        variables, except for grid attributes, are dropped after calling
+        ``func``, so that they are not concatenated across files.
+    plan : _PreprocessPlan (optional)
+        The plan with which to prepare each file after calling ``func``,
+        e.g. one already inferred from an earlier opening of the files.  By
+        default, a new plan is inferred from the first file.
 
     Returns
     -------
@@ -44,11 +170,54 @@ def _preprocess_and_rename_grid_attrs(func, grid_attrs=None, **kwargs):
         passed as a ``preprocess`` argument to ``xr.open_mfdataset``.
     """
 
+    if plan is None:
+        plan = _PreprocessPlan(grid_attrs, var_names)
+
     def func_wrapper(ds):
-        return grid_attrs_to_aospy_names(func(ds, **kwargs), grid_attrs)
+        return plan(func(ds, **kwargs))
     return func_wrapper
 
 
+def _grid_attrs_renaming(names, grid_attrs=None):
+    """Mapping with which to rename grid attributes to their aospy names.
+
+    Parameters
+    ----------
+    names : set of str
+        Names of the variables and dimensions of a Dataset
+    grid_attrs : dict (default None)
+        Overriding dictionary of grid attributes mapping aospy internal
+        names to names of grid attributes used in a particular model.
+
+    Returns
+    -------
+    dict
+        Maps the names of grid attributes among ``names`` to their internal
+        names, if different
+    """
+    if grid_attrs is None:
+        grid_attrs = {}
+
+    # Override GRID_ATTRS with entries in grid_attrs
+    attrs = GRID_ATTRS.copy()
+    for k, v in grid_attrs.items():
+        if k not in attrs:
+            raise ValueError(
+                'Unrecognized internal name, {!r}, specified for a custom '
+                'grid attribute name.  See the full list of valid internal '
+                'names below:\n\n{}'.format(k, list(GRID_ATTRS.keys())))
+        attrs[k] = (v, )
+
+    rename = {}
+    for name_int, names_ext in attrs.items():
+        data_coord_name = set(names_ext).intersection(names)
+        if data_coord_name:
+            name_ext = data_coord_name.pop()
+            if name_ext != name_int:
+                rename[name_ext] = name_int
+    return rename
+
+
 def grid_attrs_to_aospy_names(data, grid_attrs=None):
     """Rename grid attributes to be consistent with aospy conventions.
 
@@ -75,24 +244,10 @@ def grid_attrs_to_aospy_names(data, grid_attrs=None):
         Data returned with coordinates consistent with aospy
         conventions
     """
-    if grid_attrs is None:
-        grid_attrs = {}
-
-    # Override GRID_ATTRS with entries in grid_attrs
-    attrs = GRID_ATTRS.copy()
-    for k, v in grid_attrs.items():
-        if k not in attrs:
-            raise ValueError(
-                'Unrecognized internal name, {!r}, specified for a custom '
-                'grid attribute name.  See the full list of valid internal '
-                'names below:\n\n{}'.format(k, list(GRID_ATTRS.keys())))
-        attrs[k] = (v, )
-
     dims_and_vars = set(data.variables).union(set(data.dims))
-    for name_int, names_ext in attrs.items():
-        data_coord_name = set(names_ext).intersection(dims_and_vars)
-        if data_coord_name:
-            data = data.rename({data_coord_name.pop(): name_int})
+    rename = _grid_attrs_renaming(dims_and_vars, grid_attrs)
+    if rename:
+        data = data.rename(rename)
     return set_grid_attrs_as_coords(data)
 
 
@@ -113,10 +268,10 @@ def set_grid_attrs_as_coords(ds):
     Dataset
         Dataset with grid attributes set as coordinates
     """
-    grid_attrs_in_ds = set(GRID_ATTRS.keys()).intersection(
-        set(ds.coords) | set(ds.data_vars))
-    ds = ds.set_coords(grid_attrs_in_ds)
-    return ds
+    grid_attrs_in_ds = set(GRID_ATTRS.keys()).intersection(ds.data_vars)
+    if not grid_attrs_in_ds:
+        return ds
+    return ds.set_coords(grid_attrs_in_ds)
 
 
 def _maybe_cast_to_float64(da):
@@ -136,7 +291,9 @@ def _maybe_cast_to_float64(da):
                         'For accurate reduction operations using bottleneck, '
                         'datapoints are being cast to the np.float64 datatype.'
                         ' For more information see: https://github.com/pydata/'
-                        'xarray/issues/1346')
+                        'xarray/issues/1346.  To keep them as np.float32, '
+                        'halving their memory use, set upcast_float32=False '
+                        'on the DataLoader.')
         return da.astype(np.float64)
     else:
         return da
@@ -216,9 +373,56 @@ def _prep_time_data(ds):
     return ds
 
 
-def _load_data_from_disk(file_set, preprocess_func=lambda ds: ds,
+# Variables describing time, which _prep_time_data decodes or adds.
+_TIME_VAR_NAMES = (TIME_STR, TIME_BOUNDS_STR, TIME_WEIGHTS_STR,
+                   RAW_START_DATE_STR, RAW_END_DATE_STR)
+
+# Maximum number of file sets whose decoded times each DataLoader caches.
+_DECODED_TIMES_CACHE_SIZE = 16
+_DECODED_TIMES_LOCK = threading.Lock()
+
+
+def _decoded_times(ds):
+    """The time variables of a Dataset prepared by _prep_time_data.
+
+    Returns
+    -------
+    variables : OrderedDict
+        Each of the time variables in the Dataset, keyed by name and loaded
+        into memory
+    coord_names : set
+        The names of those of them that are coordinates
+    """
+    variables = OrderedDict(
+        (name, ds[name].variable.load()) for name in _TIME_VAR_NAMES
+        if name in ds)
+    return variables, set(variables).intersection(ds.coords)
+
+
+def _prep_time_data_from_decoded(ds, variables, coord_names):
+    """Prepare time information in a Dataset, reusing decoded times.
+
+    Gives the same result as _prep_time_data, given the output of
+    ``_decoded_times`` for a Dataset with the same raw times, but without
+    decoding its times again.
+    """
+    ds = times.ensure_time_as_index(ds)
+    ds = ds.drop([name for name in variables
+                  if name in ds and name != TIME_STR])
+    ds = ds.assign_coords(**{TIME_STR: variables[TIME_STR]})
+    for name, variable in variables.items():
+        if name != TIME_STR:
+            ds[name] = variable
+    ds = ds.set_coords([name for name in coord_names if name != TIME_STR])
+    # Only variables other than times remain to be decoded.
+    return xr.decode_cf(ds, decode_times=True, decode_coords=False,
+                        mask_and_scale=True)
+
+
+def _load_data_from_disk(file_set, preprocess_func=_no_preprocess,
                          data_vars='minimal', coords='minimal',
-                         grid_attrs=None, **kwargs):
+                         grid_attrs=None, var_names=None, plan=None,
+                         **kwargs):
     """Load a Dataset from a list or glob-string of files.
 
     Datasets from files are concatenated along time,
@@ -239,18 +443,39 @@ def _load_data_from_disk(file_set, preprocess_func=lambda ds: ds,
     grid_attrs : dict
         Overriding dictionary of grid attributes mapping aospy internal
         names to names of grid attributes used in a particular model.
+    var_names : sequence of str (optional)
+        Names of the variables to be loaded.  If given, all other data
+        variables, except for grid attributes, are dropped from each file
+        before they are concatenated.  Unless there is a custom
+        ``preprocess_func``, which might use them, those found in the first
+        file are not even decoded.
+    plan : _PreprocessPlan (optional)
+        The plan with which to prepare each file, e.g. one already inferred
+        from an earlier opening of files like these, whose ``grid_attrs``
+        and ``var_names`` must match those given.  By default, a new plan is
+        inferred from the first file.
 
     Returns
     -------
     Dataset
     """
     apply_preload_user_commands(file_set)
+    if plan is None:
+        plan = _PreprocessPlan(grid_attrs, var_names)
+    drop_variables = None
+    if var_names is not None and preprocess_func is _no_preprocess:
+        if plan.drop_variables is None:
+            first_file = io.expand_file_set(file_set)[0]
+            with xr.open_dataset(first_file, decode_cf=False) as ds:
+                plan.drop_variables = _unneeded_var_names(ds, var_names,
+                                                          grid_attrs)
+        drop_variables = plan.drop_variables
     func = _preprocess_and_rename_grid_attrs(preprocess_func, grid_attrs,
-                                             **kwargs)
+                                             var_names, plan=plan, **kwargs)
     return xr.open_mfdataset(file_set, preprocess=func, concat_dim=TIME_STR,
                              decode_times=False, decode_coords=False,
                              mask_and_scale=True, data_vars=data_vars,
-                             coords=coords)
+                             coords=coords, drop_variables=drop_variables)
 
 
 def apply_preload_user_commands(file_set, cmd=io.dmget):
@@ -264,6 +489,17 @@ def apply_preload_user_commands(file_set, cmd=io.dmget):
         cmd(file_set)
 
 
+def _load_key(start_date=None, end_date=None, time_offset=None,
+              grid_attrs=None, **DataAttrs):
+    """A hashable key of the arguments with which a variable is loaded."""
+    if time_offset is not None:
+        time_offset = tuple(sorted(time_offset.items()))
+    # No grid attributes and an empty dict of them are equivalent.
+    grid_attrs = tuple(sorted((grid_attrs or {}).items()))
+    return (start_date, end_date, time_offset, grid_attrs,
+            tuple(sorted(DataAttrs.items())))
+
+
 def _setattr_default(obj, attr, value, default):
     """Set an attribute of an object to a value or default value."""
     if value is None:
@@ -302,26 +538,249 @@ class DataLoader(object):
         da : DataArray
              DataArray for the specified variable, date range, and interval in
         """
-        file_set = self._generate_file_set(var=var, start_date=start_date,
-                                           end_date=end_date, **DataAttrs)
-        ds = _load_data_from_disk(
-            file_set, self.preprocess_func, data_vars=self.data_vars,
-            coords=self.coords, start_date=start_date, end_date=end_date,
-            time_offset=time_offset, grid_attrs=grid_attrs, **DataAttrs
-        )
-        if var.def_time:
-            ds = _prep_time_data(ds)
-            start_date = times.maybe_convert_to_index_date_type(
-                ds.indexes[TIME_STR], start_date)
-            end_date = times.maybe_convert_to_index_date_type(
-                ds.indexes[TIME_STR], end_date)
-        ds = set_grid_attrs_as_coords(ds)
-        da = _sel_var(ds, var, self.upcast_float32)
-        if var.def_time:
-            da = self._maybe_apply_time_shift(da, time_offset, **DataAttrs)
-            return times.sel_time(da, start_date, end_date).load()
+        return self.load_variables(
+            [var], start_date=start_date, end_date=end_date,
+            time_offset=time_offset, grid_attrs=grid_attrs, **DataAttrs)[0]
+
+    def load_variables(self, variables, start_date=None, end_date=None,
+                       time_offset=None, grid_attrs=None, **DataAttrs):
+        """Load a DataArray for each of several variables and a time range.
+
+        Variables whose data are stored in the same files are loaded from a
+        single opening of those files, rather than one opening per variable.
+
+        Parameters
+        ----------
+        variables : sequence of Var
+            aospy Var objects
+        start_date, end_date, time_offset, grid_attrs, **DataAttrs
+            As in ``load_variable``
+
+        Returns
+        -------
+        list of DataArray
+            DataArray for each of the specified variables, in the order given
+        """
+        key = _load_key(start_date=start_date, end_date=end_date,
+                        time_offset=time_offset, grid_attrs=grid_attrs,
+                        **DataAttrs)
+        shared = getattr(self, '_shared_opened', {})
+        opened = {}
+        to_open = []
+        for var in variables:
+            if (var.name, key) in shared:
+                with profiling.stage('open', var=var.name, cache_hit=True):
+                    opened[var.name] = shared[(var.name, key)]
+            else:
+                to_open.append(var)
+        pending = getattr(self, '_pending_opens', {}).pop(key, None)
+        if to_open and pending:
+            # Open the data of the other variables to be loaded later with
+            # the same arguments along with that of these ones.
+            names = set(var.name for var in to_open)
+            others = [var for name, var in pending.items()
+                      if name not in names]
+            try:
+                for name, value in self._open_variables(
+                        to_open + others, start_date=start_date,
+                        end_date=end_date, time_offset=time_offset,
+                        grid_attrs=grid_attrs, errors='ignore',
+                        **DataAttrs).items():
+                    shared[(name, key)] = value
+                    if name in names:
+                        opened[name] = value
+            except Exception as e:
+                logging.debug('Not sharing the opening of {0}: {1!r}'.format(
+                    [var.name for var in to_open + others], e))
+            to_open = [var for var in to_open if var.name not in opened]
+        if to_open:
+            opened.update(self._open_variables(
+                to_open, start_date=start_date, end_date=end_date,
+                time_offset=time_offset, grid_attrs=grid_attrs, **DataAttrs))
+        result = []
+        for var in variables:
+            da, files = opened[var.name]
+            with profiling.stage('read', var=var.name, files=files):
+                result.append(da.compute())
+        return result
+
+    def _open_variables(self, variables, start_date=None, end_date=None,
+                        time_offset=None, grid_attrs=None,
+                        errors='raise', **DataAttrs):
+        """Lazily open the data of each of several variables.
+
+        The variables are grouped by the files their data are in, and the
+        files of each group are opened once for all of its variables.
+
+        Parameters
+        ----------
+        variables : sequence of Var
+        start_date, end_date, time_offset, grid_attrs, **DataAttrs
+            As in ``load_variable``
+        errors : {'raise', 'ignore'}
+            If 'ignore', variables whose data cannot be found or opened are
+            left out of the result, rather than raising an error.
+
+        Returns
+        -------
+        OrderedDict
+            For each variable opened, keyed by name, its unloaded DataArray
+            and the files it is read from
+        """
+        groups = OrderedDict()
+        for var in variables:
+            try:
+                with profiling.stage('file_set', var=var.name):
+                    file_set = self._generate_file_set(
+                        var=var, start_date=start_date, end_date=end_date,
+                        **DataAttrs)
+            except (LookupError, IOError):
+                if errors == 'raise':
+                    raise
+                continue
+            files = file_set if isinstance(file_set, str) else list(file_set)
+            group_key = (file_set if isinstance(file_set, str)
+                         else tuple(file_set), var.def_time)
+            groups.setdefault(group_key, (file_set, files, []))[2].append(var)
+
+        opened = OrderedDict()
+        for group_key, (file_set, files, group) in groups.items():
+            def_time = group_key[1]
+            names = ', '.join(var.name for var in group)
+            var_names = [name for var in group for name in var.names]
+            plan = self._preprocess_plan(
+                files, var_names, start_date=start_date, end_date=end_date,
+                time_offset=time_offset, grid_attrs=grid_attrs, **DataAttrs)
+            try:
+                with profiling.stage('open', var=names, files=files,
+                                     cache_hit=False):
+                    ds = _load_data_from_disk(
+                        file_set, self.preprocess_func,
+                        data_vars=self.data_vars, coords=self.coords,
+                        start_date=start_date, end_date=end_date,
+                        time_offset=time_offset, grid_attrs=grid_attrs,
+                        var_names=var_names, plan=plan, **DataAttrs
+                    )
+            except (LookupError, IOError):
+                if errors == 'raise':
+                    raise
+                continue
+            start, end = start_date, end_date
+            if def_time:
+                # A custom preprocess_func may depend on any of the arguments.
+                if self.preprocess_func is _no_preprocess:
+                    time_key = group_key[0], _load_key(grid_attrs=grid_attrs)
+                else:
+                    time_key = group_key[0], _load_key(
+                        start_date, end_date, time_offset, grid_attrs,
+                        **DataAttrs)
+                ds = self._prep_time_data(ds, time_key, names)
+                start = times.maybe_convert_to_index_date_type(
+                    ds.indexes[TIME_STR], start_date)
+                end = times.maybe_convert_to_index_date_type(
+                    ds.indexes[TIME_STR], end_date)
+            ds = set_grid_attrs_as_coords(ds)
+            for var in group:
+                try:
+                    da = _sel_var(ds, var, self.upcast_float32)
+                except LookupError:
+                    if errors == 'raise':
+                        raise
+                    continue
+                if def_time:
+                    da = self._maybe_apply_time_shift(da, time_offset,
+                                                      **DataAttrs)
+                    da = times.sel_time(da, start, end)
+                opened[var.name] = (da, files)
+        return opened
+
+    def _preprocess_plan(self, files, var_names, start_date=None,
+                         end_date=None, time_offset=None, grid_attrs=None,
+                         **DataAttrs):
+        """The plan with which to prepare each of the given files.
+
+        Plans are shared by all openings of files in the same directory for
+        the same variables, e.g. by Calcs of different date ranges, so that
+        each is inferred only once.  Files a plan does not fit are prepared
+        from scratch, so sharing it is always safe.
+        """
+        first = files if isinstance(files, str) else files[0]
+        # A custom preprocess_func may depend on any of the arguments.
+        if self.preprocess_func is _no_preprocess:
+            load_key = _load_key(grid_attrs=grid_attrs)
         else:
-            return da.load()
+            load_key = _load_key(start_date, end_date, time_offset,
+                                 grid_attrs, **DataAttrs)
+        key = os.path.dirname(first), tuple(sorted(var_names)), load_key
+        plans = self.__dict__.setdefault('_preprocess_plans', {})
+        if key not in plans:
+            plans[key] = _PreprocessPlan(grid_attrs, var_names)
+        return plans[key]
+
+    def _prep_time_data(self, ds, key, names):
+        """Prepare the times of a Dataset, reusing those decoded before.
+
+        The decoded times of the most recently opened file sets are cached,
+        keyed on the given key identifying the file set, and reused for
+        later openings of it, as long as its raw times are unchanged.
+        Decoding times of non-standard calendars in particular is slow.
+        """
+        raw_time = ds[TIME_STR].variable
+        cache = self.__dict__.setdefault('_decoded_times_cache',
+                                         OrderedDict())
+        with _DECODED_TIMES_LOCK:
+            cached = cache.get(key)
+        if cached is not None and cached[0].identical(raw_time):
+            with profiling.stage('decode', var=names, cache_hit=True):
+                return _prep_time_data_from_decoded(ds, *cached[1:])
+        with profiling.stage('decode', var=names, cache_hit=False):
+            ds = _prep_time_data(ds)
+            variables, coord_names = _decoded_times(ds)
+        with _DECODED_TIMES_LOCK:
+            cache[key] = (raw_time, variables, coord_names)
+            cache.move_to_end(key)
+            while len(cache) > _DECODED_TIMES_CACHE_SIZE:
+                cache.popitem(last=False)
+        return ds
+
+    def __getstate__(self):
+        # Cached decoded times and preprocessing plans and shared openings
+        # are not worth sending to other processes.
+        state = self.__dict__.copy()
+        for name in ('_decoded_times_cache', '_preprocess_plans',
+                     '_pending_opens', '_shared_opened'):
+            state.pop(name, None)
+        return state
+
+    @contextlib.contextmanager
+    def _sharing_opens(self, requests):
+        """Share the opening of files among several upcoming loads.
+
+        Within this context, the first load of any of the requested variables
+        opens the data of all those requested with the same arguments (other
+        than the variable), and later loads of them take their data from that
+        opening, rather than opening their files again.  Variables that
+        cannot be opened this way are loaded as usual, so that any error is
+        raised where they are loaded.
+
+        Parameters
+        ----------
+        requests : sequence of (Var, dict) pairs
+            Each variable and the keyword arguments of ``load_variable`` (i.e.
+            start_date, end_date, time_offset, grid_attrs, and any
+            DataAttrs) it will be loaded with
+        """
+        pending = OrderedDict()
+        for var, kwargs in requests:
+            pending.setdefault(_load_key(**kwargs),
+                               OrderedDict()).setdefault(var.name, var)
+        self._pending_opens = pending
+        self._shared_opened = {}
+        try:
+            yield
+        finally:
+            self._pending_opens = {}
+            self._shared_opened = {}
 
     def _load_or_get_from_model(self, var, start_date=None, end_date=None,
                                 time_offset=None, model=None, **DataAttrs):
@@ -386,7 +845,8 @@ class DataLoader(object):
             data = [self.recursively_compute_variable(
                 v, start_date, end_date, time_offset, model, **DataAttrs)
                     for v in var.variables]
-            return var.func(*data).rename(var.name)
+            with profiling.stage('derive', var=var.name):
+                return var.func(*data).rename(var.name)
 
     @staticmethod
     def _maybe_apply_time_shift(da, time_offset=None, **DataAttrs):
@@ -419,7 +879,9 @@ class DictDataLoader(DataLoader):
         A dict mapping an input interval to a list of files
     upcast_float32 : bool (default True)
         Whether to cast loaded DataArrays with the float32 datatype to float64
-        before doing calculations
+        before doing calculations.  If False, such data is kept in float32,
+        halving its memory use; aospy's time, regional, and vertical
+        reductions accumulate their sums in float64 regardless.
     data_vars : str (default 'minimal')
         Mode for concatenating data variables in call to ``xr.open_mfdataset``
     coords : str (default 'minimal')
@@ -452,7 +914,7 @@ class DictDataLoader(DataLoader):
     >>> data_loader = DictDataLoader(file_map, preprocess)
     """
     def __init__(self, file_map=None, upcast_float32=True, data_vars='minimal',
-                 coords='minimal', preprocess_func=lambda ds, **kwargs: ds):
+                 coords='minimal', preprocess_func=_no_preprocess):
         """Create a new DictDataLoader."""
         self.file_map = file_map
         self.upcast_float32 = upcast_float32
@@ -489,7 +951,9 @@ class NestedDictDataLoader(DataLoader):
         objects to lists of files
     upcast_float32 : bool (default True)
         Whether to cast loaded DataArrays with the float32 datatype to float64
-        before doing calculations
+        before doing calculations.  If False, such data is kept in float32,
+        halving its memory use; aospy's time, regional, and vertical
+        reductions accumulate their sums in float64 regardless.
     data_vars : str (default 'minimal')
         Mode for concatenating data variables in call to ``xr.open_mfdataset``
     coords : str (default 'minimal')
@@ -512,7 +976,7 @@ class NestedDictDataLoader(DataLoader):
     possible function to pass as a ``preprocess_func``.
     """
     def __init__(self, file_map=None, upcast_float32=True, data_vars='minimal',
-                 coords='minimal', preprocess_func=lambda ds, **kwargs: ds):
+                 coords='minimal', preprocess_func=_no_preprocess):
         """Create a new NestedDictDataLoader"""
         self.file_map = file_map
         self.upcast_float32 = upcast_float32
@@ -555,7 +1019,9 @@ class GFDLDataLoader(DataLoader):
         End date of data files
     upcast_float32 : bool (default True)
         Whether to cast loaded DataArrays with the float32 datatype to float64
-        before doing calculations
+        before doing calculations.  If False, such data is kept in float32,
+        halving its memory use; aospy's time, regional, and vertical
+        reductions accumulate their sums in float64 regardless.
     data_vars : str (default 'minimal')
         Mode for concatenating data variables in call to ``xr.open_mfdataset``
     coords : str (default 'minimal')
@@ -611,7 +1077,8 @@ class GFDLDataLoader(DataLoader):
             _setattr_default(self, 'data_vars', data_vars, 'minimal')
             _setattr_default(self, 'coords', coords, 'minimal')
             _setattr_default(self, 'preprocess_func', preprocess_func,
-                             lambda ds, **kwargs: ds)
+                             _no_preprocess)
+        self._input_data_paths_cache = {}
 
     @staticmethod
     def _maybe_apply_time_shift(da, time_offset=None, **DataAttrs):
@@ -644,7 +1111,7 @@ class GFDLDataLoader(DataLoader):
                 name, start_date, end_date, domain, intvl_in, dtype_in_vert,
                 dtype_in_time, intvl_out)
             attempted_file_sets.append(file_set)
-            if all([os.path.isfile(filename) for filename in file_set]):
+            if all(io.file_exists(filename) for filename in file_set):
                 return file_set
         raise IOError('Files for the var {0} cannot be located '
                       'using GFDL post-processing conventions. '
@@ -654,6 +1121,32 @@ class GFDLDataLoader(DataLoader):
     def _input_data_paths_gfdl(self, name, start_date, end_date, domain,
                                intvl_in, dtype_in_vert, dtype_in_time,
                                intvl_out):
+        """Paths of the files of a variable following GFDL conventions.
+
+        Paths are only generated once for each set of arguments (and data
+        directory, duration, and start date) and then cached.
+        """
+        key = (name, start_date, end_date, domain, intvl_in, dtype_in_vert,
+               dtype_in_time, intvl_out, self.data_direc, self.data_dur,
+               self.data_start_date)
+        cache = self.__dict__.setdefault('_input_data_paths_cache', {})
+        try:
+            return list(cache[key])
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable arguments are not cached.
+            key = None
+        files = self._generate_input_data_paths_gfdl(
+            name, start_date, end_date, domain, intvl_in, dtype_in_vert,
+            dtype_in_time, intvl_out)
+        if key is not None:
+            cache[key] = tuple(files)
+        return files
+
+    def _generate_input_data_paths_gfdl(self, name, start_date, end_date,
+                                        domain, intvl_in, dtype_in_vert,
+                                        dtype_in_time, intvl_out):
         dtype_lbl = dtype_in_time
         if intvl_in == 'daily':
             domain += '_daily'
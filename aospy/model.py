@@ -209,6 +209,9 @@ class Model(object):
         self.grid_attrs = grid_attrs
 
         self._grid_data_is_set = False
+        # Results of comparing Runs' grid attributes to those of this Model;
+        # see ``Calc._compare_grid_attr``.
+        self._grid_attr_comparisons = {}
         if load_grid_data:
             self.set_grid_data()
             self._grid_data_is_set = True
@@ -271,6 +274,8 @@ class Model(object):
         """Populate the attrs that hold grid data."""
         if self._grid_data_is_set:
             return
+        # Comparisons to the grid data loaded before no longer apply.
+        self._grid_attr_comparisons = {}
         self._set_mult_grid_attr()
         if not np.any(getattr(self, 'sfc_area', None)):
             try:
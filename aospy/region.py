@@ -3,6 +3,7 @@ from collections import namedtuple
 import logging
 
 import numpy as np
+import xarray as xr
 
 from .internal_names import (
     LAND_MASK_STR,
@@ -11,7 +12,7 @@ from .internal_names import (
     SFC_AREA_STR,
     YEAR_STR
 )
-from .utils.longitude import _maybe_cast_to_lon
+from .utils.longitude import LongitudeArray, _maybe_cast_to_lon
 
 
 def _get_land_mask(data, do_land_mask, land_mask_str=LAND_MASK_STR):
@@ -219,11 +220,12 @@ class Region(object):
     def _make_mask(self, data, lon_str=LON_STR, lat_str=LAT_STR):
         """Construct the mask that defines a region on a given data's grid."""
         mask = False
+        lon = LongitudeArray(data[lon_str])
         for west, east, south, north in self.mask_bounds:
             if west < east:
-                mask_lon = (data[lon_str] > west) & (data[lon_str] < east)
+                mask_lon = (lon > west) & (lon < east)
             else:
-                mask_lon = (data[lon_str] < west) | (data[lon_str] > east)
+                mask_lon = (lon < west) | (lon > east)
             mask_lat = (data[lat_str] > south) & (data[lat_str] < north)
             mask |= mask_lon & mask_lat
         return mask
@@ -293,13 +295,28 @@ class Region(object):
                                         lon_str=lon_str, lat_str=lat_str)
         land_mask = _get_land_mask(data, self.do_land_mask,
                                    land_mask_str=land_mask_str)
+        # Keep float32 data in float32, rather than promoting it to the dtype
+        # of the weights; the sums are accumulated in float64 regardless.
+        if data.dtype == np.float32:
+            sfc_area_masked = sfc_area_masked.astype(np.float32)
+            if not np.isscalar(land_mask):
+                land_mask = land_mask.astype(np.float32)
         weights = sfc_area_masked * land_mask
         # Mask weights where data values are initially invalid in addition
-        # to applying the region mask.
-        weights = weights.where(np.isfinite(data))
-        weights_reg_sum = weights.sum(lon_str).sum(lat_str)
-        data_reg_sum = (data_masked * sfc_area_masked *
-                        land_mask).sum(lat_str).sum(lon_str)
+        # to applying the region mask.  Where there are none, which a single
+        # sum reveals without any temporary arrays, the weights need not be
+        # broadcast against the data.  Otherwise, rather than masking the
+        # broadcast weights, their sum is a dot product with where the data
+        # are valid.
+        if np.isfinite(np.sum(data.values, dtype=np.float64)):
+            weights_reg_sum = weights.sum(lon_str, dtype=np.float64).sum(
+                lat_str)
+        else:
+            weights_reg_sum = xr.dot(np.isfinite(data),
+                                     weights.fillna(0).astype(np.float64),
+                                     dims=[lat_str, lon_str])
+        data_reg_sum = (data_masked * sfc_area_masked * land_mask).sum(
+            lat_str, dtype=np.float64).sum(lon_str)
         return data_reg_sum / weights_reg_sum
 
     def av(self, data, lon_str=LON_STR, lat_str=LAT_STR,
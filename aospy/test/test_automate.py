@@ -1,13 +1,23 @@
+import glob
+import json
 from multiprocessing import cpu_count
+import os
 from os.path import isfile
+import pickle
 import shutil
 import sys
 import itertools
+import weakref
 
+import cloudpickle
+from cftime import DatetimeNoLeap
 import distributed
 import pytest
+import xarray as xr
 
-from aospy import Var, Proj
+from aospy import Model, Proj, Region, Run, Var, automate
+from aospy.calc import Calc
+from aospy.data_loader import DictDataLoader
 from aospy.automate import (_get_attr_by_tag, _permuted_dicts_of_specs,
                             _get_all_objs_of_type, _merge_dicts,
                             _input_func_py2_py3, AospyException,
@@ -15,8 +25,16 @@ from aospy.automate import (_get_attr_by_tag, _permuted_dicts_of_specs,
                             _VARIABLES_STR, _REGIONS_STR,
                             _compute_or_skip_on_error, submit_mult_calcs,
                             _n_workers_for_local_cluster,
-                            _prune_invalid_time_reductions)
+                            _prune_invalid_time_reductions, _calc_nbytes_in,
+                            _order_calcs_by_cost, _local_cluster_kwargs,
+                            _CalcSpec, _plan_calcs, _exec_calcs,
+                            _group_by_input_files,
+                            _group_by_shared_data, _cluster_date_ranges,
+                            _date_range, _group_by_ensemble,
+                            _init_pool_worker, _POOL_WORKER_STATE,
+                            _importable_on_workers)
 from .data.objects import examples as lib
+from .data.synthetic import write_file_map
 from .data.objects.examples import (
     example_proj, example_model, example_run, var_not_time_defined,
     condensation_rain, convection_rain, precip, ps, sphum, globe, sahel, bk,
@@ -259,6 +277,8 @@ def test_submit_mult_calcs_external_client(calcsuite_init_specs_single_calc,
      dict(parallelize=True, write_to_tar=False),
      dict(parallelize=False, write_to_tar=True),
      dict(parallelize=True, write_to_tar=True),
+     dict(parallelize=True, executor='processes', write_to_tar=False),
+     dict(parallelize=True, executor='processes', write_to_tar=True),
      None])
 def test_submit_mult_calcs(calcsuite_init_specs_single_calc, exec_options):
     calcs = submit_mult_calcs(calcsuite_init_specs_single_calc, exec_options)
@@ -302,6 +322,7 @@ def test_submit_two_calcs_external_client(calcsuite_init_specs_two_calcs,
      dict(parallelize=True, write_to_tar=False),
      dict(parallelize=False, write_to_tar=True),
      dict(parallelize=True, write_to_tar=True),
+     dict(parallelize=True, executor='processes', write_to_tar=True),
      None])
 def test_submit_two_calcs(calcsuite_init_specs_two_calcs, exec_options):
     calcs = submit_mult_calcs(calcsuite_init_specs_two_calcs, exec_options)
@@ -314,6 +335,286 @@ def test_submit_two_calcs(calcsuite_init_specs_two_calcs, exec_options):
         calcsuite_init_specs_two_calcs['output_time_regional_reductions'])
 
 
+def test_importable_on_workers(external_client):
+    assert _importable_on_workers(external_client, [lib.__name__])
+    assert not _importable_on_workers(external_client,
+                                      [lib.__name__, 'not_an_aospy_library'])
+
+
+def test_submit_calcs_on_client_by_value(calcsuite_init_specs_two_calcs,
+                                         external_client, monkeypatch):
+    monkeypatch.setattr(automate, '_importable_on_workers',
+                        lambda client, names: False)
+    specs = list(CalcSuite(calcsuite_init_specs_two_calcs)._iter_calc_specs())
+    calcs = _exec_calcs(specs, parallelize=True, client=external_client,
+                        write_to_tar=False)
+    assert all(calc is not None and calc._spec is None for calc in calcs)
+
+
+def test_submit_mult_calcs_profile(calcsuite_init_specs_two_calcs, tmpdir,
+                                   capsys):
+    trace_path = str(tmpdir.join('trace.json'))
+    exec_options = dict(parallelize=False, write_to_tar=False,
+                        profile=trace_path)
+    calcs = submit_mult_calcs(calcsuite_init_specs_two_calcs, exec_options)
+    assert 'Time per stage' in capsys.readouterr().out
+    with open(trace_path) as f:
+        events = json.load(f)['traceEvents']
+    calc_names = set(event['args']['calc'] for event in events)
+    assert calc_names == set(str(calc) for calc in calcs)
+
+
+def test_exec_calcs_shares_opens(calcsuite_init_specs_two_calcs):
+    specs = list(CalcSuite(calcsuite_init_specs_two_calcs)._iter_calc_specs())
+    assert list(_group_by_input_files(specs).values()) == [[0, 1]]
+    calcs = _exec_calcs(specs, write_to_tar=False)
+    opens = [[record for record in calc.profile_records
+              if record['stage'] == 'open'] for calc in calcs]
+    assert len(opens[0]) == 1
+    assert set(opens[0][0]['var'].split(', ')) == {'condensation_rain',
+                                                   'convection_rain'}
+    assert [record['cache_hit'] for record in opens[1]] == [True]
+
+
+@pytest.mark.parametrize('share_loads', [False, True])
+def test_exec_calcs_creates_calcs_lazily(calcsuite_init_specs_two_calcs,
+                                         monkeypatch, share_loads):
+    created = weakref.WeakSet()
+    n_created = []
+    uncomputed = []
+    to_calc = _CalcSpec.to_calc
+    compute = Calc.compute
+
+    def tracked_to_calc(spec):
+        calc = to_calc(spec)
+        created.add(calc)
+        n_created.append(1)
+        return calc
+
+    def tracked_compute(calc, *args, **kwargs):
+        uncomputed.append(len([other for other in created
+                               if not other.profile_records]))
+        return compute(calc, *args, **kwargs)
+
+    monkeypatch.setattr(_CalcSpec, 'to_calc', tracked_to_calc)
+    monkeypatch.setattr(Calc, 'compute', tracked_compute)
+    specs = list(CalcSuite(calcsuite_init_specs_two_calcs)._iter_calc_specs())
+    calcs = _exec_calcs(specs, write_to_tar=False, share_loads=share_loads)
+    assert all(calc is not None for calc in calcs)
+    assert uncomputed == [1, 1]
+    # Each Calc is created only once.
+    assert len(n_created) == len(specs)
+
+
+def test_exec_calcs_shares_intervals(calcsuite_init_specs_single_calc):
+    specs = calcsuite_init_specs_single_calc.copy()
+    specs['output_time_intervals'] = ['ann', 'djf', 3]
+    specs['output_time_regional_reductions'] = ['av', 'ts']
+    calc_specs = list(CalcSuite(specs)._iter_calc_specs())
+    calcs = [spec.to_calc() for spec in calc_specs]
+    assert [indices for indices, _ in _group_by_shared_data(calcs)] == [
+        [0, 1, 2]]
+    result = _exec_calcs(calc_specs, write_to_tar=False, share_loads=True)
+    derives = [[record for record in calc.profile_records
+                if record['stage'] == 'derive'] for calc in result]
+    assert [len(records) for records in derives] == [1, 0, 0]
+    for calc, expected in zip(result, calcs):
+        expected.compute(write_to_tar=False)
+        for reduction in ['av', 'ts']:
+            xr.testing.assert_allclose(calc.data_out[reduction],
+                                       expected.data_out[reduction])
+
+
+def test_exec_calcs_shares_date_ranges(calcsuite_init_specs_single_calc):
+    specs = calcsuite_init_specs_single_calc.copy()
+    specs['date_ranges'] = [
+        (DatetimeNoLeap(4, 1, 1), DatetimeNoLeap(5, 12, 31)),
+        (DatetimeNoLeap(5, 1, 1), DatetimeNoLeap(6, 12, 31)),
+        (DatetimeNoLeap(4, 7, 1), DatetimeNoLeap(6, 6, 30))]
+    specs['output_time_intervals'] = ['ann', 'jja']
+    specs['output_time_regional_reductions'] = ['ts']
+    calc_specs = list(CalcSuite(specs)._iter_calc_specs())
+    calcs = [spec.to_calc() for spec in calc_specs]
+    groups = _group_by_shared_data(calcs)
+    assert len(groups) == 3
+    assert all(groups[0][1] == _date_range(calcs[i]) for i in groups[0][0])
+    groups = _group_by_shared_data(calcs, merge_date_ranges=True)
+    assert [indices for indices, _ in groups] == [list(range(6))]
+    assert groups[0][1] == (DatetimeNoLeap(4, 1, 1),
+                            DatetimeNoLeap(6, 12, 31))
+    result = _exec_calcs(calc_specs, write_to_tar=False, share_loads=True,
+                         merge_date_ranges=True)
+    derives = [[record for record in calc.profile_records
+                if record['stage'] == 'derive'] for calc in result]
+    assert [len(records) for records in derives] == [1, 0, 0, 0, 0, 0]
+    for calc, expected in zip(result, calcs):
+        expected.compute(write_to_tar=False)
+        xr.testing.assert_allclose(calc.data_out['ts'],
+                                   expected.data_out['ts'])
+        assert (calc.data_out['ts']['subset_start_date'] ==
+                expected.start_date)
+
+
+def test_exec_calcs_share_loads(calcsuite_init_specs_single_calc):
+    specs = calcsuite_init_specs_single_calc.copy()
+    specs['output_time_intervals'] = ['ann', 'djf', 3]
+    specs['output_time_regional_reductions'] = ['av', 'ts']
+    calc_specs = list(CalcSuite(specs)._iter_calc_specs())
+    unshared = _exec_calcs(calc_specs, write_to_tar=False)
+    derives = [[record for record in calc.profile_records
+                if record['stage'] == 'derive'] for calc in unshared]
+    assert [len(records) for records in derives] == [1, 1, 1]
+    unshared_out = [calc.data_out.copy() for calc in unshared]
+    shared = _exec_calcs(calc_specs, write_to_tar=False, share_loads=True)
+    for calc, expected in zip(shared, unshared_out):
+        for reduction in ['av', 'ts']:
+            xr.testing.assert_allclose(calc.data_out[reduction],
+                                       expected[reduction], rtol=1e-12)
+
+
+@pytest.mark.parametrize(
+    ('date_ranges', 'expected'),
+    [([(1, 10), (5, 15), (20, 30), (15, 20)],
+      [([0, 1, 2, 3], (1, 30))]),
+     ([(20, 30), (1, 10), (5, 15)],
+      [([0], (20, 30)), ([1, 2], (1, 15))]),
+     ([('0001', '0010'), ('0005', '0015'), ('0001', '0010')],
+      [([0, 2], ('0001', '0010')), ([1], ('0005', '0015'))])])
+def test_cluster_date_ranges(date_ranges, expected):
+    assert _cluster_date_ranges(date_ranges) == expected
+
+
+def test_cluster_date_ranges_no_merge():
+    date_ranges = [(1, 10), (5, 15), (1, 10)]
+    assert _cluster_date_ranges(date_ranges, merge=False) == [
+        ([0, 2], (1, 10)), ([1], (5, 15))]
+
+
+def _double_precip(ds, **kwargs):
+    return ds.assign(precip=2 * ds['precip'])
+
+
+def _ensemble_calcs(direc, intvl_in_b='monthly'):
+    """Create Calcs of the same Var for two Runs of a synthetic Model."""
+    file_map = write_file_map(os.path.join(direc, 'monthly'), n_years=2,
+                              n_lat=4, n_lon=8)
+    file_map_b = write_file_map(os.path.join(direc, intvl_in_b),
+                                intvl_in=intvl_in_b, n_years=2, n_lat=4,
+                                n_lon=8)
+    runs = [Run(name='run_a', data_loader=DictDataLoader(file_map)),
+            Run(name='run_b', data_loader=DictDataLoader(
+                {'monthly': file_map_b[intvl_in_b]},
+                preprocess_func=_double_precip))]
+    model = Model(name='model', grid_file_paths=file_map['monthly'][:1],
+                  runs=runs)
+    proj = Proj('proj', direc_out=os.path.join(direc, 'out'),
+                models=[model])
+    var = Var(name='precip', def_time=True)
+    region = Region(name='region', west_bound=90, east_bound=270,
+                    south_bound=-45, north_bound=45, do_land_mask=False)
+    return [Calc(proj=proj, model=model, run=run, var=var,
+                 date_range=(DatetimeNoLeap(1, 1, 1),
+                             DatetimeNoLeap(2, 12, 31)),
+                 region=[region], intvl_in='monthly', intvl_out='jja',
+                 dtype_in_time='ts', dtype_in_vert=None,
+                 dtype_out_time=['av', 'std', 'ts', 'reg.av', 'reg.ts'],
+                 dtype_out_vert=None)
+            for run in runs]
+
+
+def test_init_pool_worker_defers_grid_data(tmpdir):
+    calcs = _ensemble_calcs(str(tmpdir))
+    _init_pool_worker(cloudpickle.dumps((calcs, {})))
+    try:
+        models = [calc.model for calc in _POOL_WORKER_STATE['calcs']]
+        assert not any(model._grid_data_is_set for model in models)
+    finally:
+        _POOL_WORKER_STATE.clear()
+
+
+@pytest.mark.parametrize(('intvl_in_b', 'n_stacks'),
+                         [('monthly', 1), ('daily', 0)])
+def test_exec_calcs_ensemble(tmpdir, intvl_in_b, n_stacks):
+    calcs = _ensemble_calcs(str(tmpdir), intvl_in_b)
+    assert list(_group_by_ensemble(calcs).values()) == [[0, 1]]
+    result = _exec_calcs(calcs, ensemble=True, write_to_tar=False)
+    assert result == calcs
+    stacks = [record for record in calcs[0].profile_records
+              if record['stage'] == 'stack']
+    assert len(stacks) == n_stacks
+    # The inputs of the expected Calcs are written to their own directory,
+    # so as not to overwrite those of the Calcs under test.
+    expected_calcs = _ensemble_calcs(str(tmpdir.mkdir('expected')),
+                                     intvl_in_b)
+    for calc, expected in zip(calcs, expected_calcs):
+        expected.compute(write_to_tar=False)
+        for reduction in expected.dtype_out_time:
+            xr.testing.assert_allclose(calc.data_out[reduction],
+                                       expected.data_out[reduction])
+            assert (xr.open_dataset(calc.path_out[reduction]).identical(
+                xr.open_dataset(expected.path_out[reduction])))
+    if intvl_in_b == 'monthly':
+        xr.testing.assert_allclose(calcs[1].data_out['av'],
+                                   2 * calcs[0].data_out['av'])
+
+
+def test_submit_mult_calcs_prefetch(calcsuite_init_specs_two_calcs, tmpdir):
+    log = str(tmpdir.join('recalled.txt'))
+    cmd = [sys.executable, '-c',
+           'import sys; open(sys.argv[1], "w").write("\\n".join('
+           'sys.argv[2:]))', log]
+    exec_options = dict(parallelize=False, write_to_tar=False, prefetch=cmd)
+    calcs = submit_mult_calcs(calcsuite_init_specs_two_calcs, exec_options)
+    assert all(calc is not None for calc in calcs)
+    expected = set()
+    for calc in calcs:
+        for file_set in calc._input_file_sets().values():
+            expected.update(file_set or [])
+    with open(log) as f:
+        assert set(f.read().splitlines()) == expected
+
+
+def test_submit_mult_calcs_prefetch_parallel(calcsuite_init_specs_two_calcs,
+                                             monkeypatch):
+    # The most expensive Calc reads files that are being recalled, so it is
+    # submitted after the other, rather than first.
+    prefetch_input_files = automate._prefetch_input_files
+
+    def prefetch(calcs, cmd=None):
+        _, thread = prefetch_input_files(calcs, cmd)
+        return [calc.attrs['var'].name == 'condensation_rain'
+                for calc in calcs], thread
+
+    submitted = []
+    submit_calcs_on_pool = automate._submit_calcs_on_pool
+
+    def submit(calcs, *args):
+        # The Calcs are only created by the workers computing them.
+        assert all(isinstance(calc, _CalcSpec) for calc in calcs)
+        submitted.extend(calc.attrs['var'].name for calc in calcs)
+        return submit_calcs_on_pool(calcs, *args)
+
+    monkeypatch.setattr(automate, '_prefetch_input_files', prefetch)
+    monkeypatch.setattr(automate, '_submit_calcs_on_pool', submit)
+    monkeypatch.setattr(automate, '_calc_nbytes_in', lambda calc: (
+        100 if calc.attrs['var'].name == 'condensation_rain' else 1))
+    exec_options = dict(parallelize=True, executor='processes',
+                        write_to_tar=False,
+                        prefetch=[sys.executable, '-c', 'pass'])
+    calcs = submit_mult_calcs(calcsuite_init_specs_two_calcs, exec_options)
+    assert all(calc is not None for calc in calcs)
+    assert submitted == ['convection_rain', 'condensation_rain']
+
+
+@pytest.mark.parametrize('executor', ['invalid', 'threads'])
+def test_submit_mult_calcs_invalid_executor(calcsuite_init_specs_single_calc,
+                                            executor):
+    exec_options = dict(parallelize=True, executor=executor,
+                        write_to_tar=False)
+    with pytest.raises(ValueError):
+        submit_mult_calcs(calcsuite_init_specs_single_calc, exec_options)
+
+
 def test_n_workers_for_local_cluster(calcsuite_init_specs_two_calcs):
     calcs = CalcSuite(calcsuite_init_specs_two_calcs).create_calcs()
     expected = min(cpu_count(), len(calcs))
@@ -321,6 +622,118 @@ def test_n_workers_for_local_cluster(calcsuite_init_specs_two_calcs):
     assert result == expected
 
 
+def test_calc_pickles_as_spec(calc):
+    assert calc._spec is not None
+    calc.data_out = {'av': 'dummy'}
+    result = pickle.loads(pickle.dumps(calc))
+    assert str(result) == str(calc)
+    assert result.model is calc.model
+    assert result.region == calc.region
+    assert result.data_out == calc.data_out
+    assert result._spec is not None
+
+
+def test_calc_spec_invalid_lib(calcsuite_init_specs_single_calc):
+    calcs_specs = calcsuite_init_specs_single_calc.copy()
+    calcs_specs['library'] = object()
+    calc = CalcSuite(calcs_specs).create_calcs()[0]
+    assert calc._spec is None
+
+
+def test_calc_spec_obj_not_in_lib():
+    var = Var(name='not_in_lib', def_time=True)
+    spec = dict(proj=example_proj, model=example_model, run=example_run,
+                var=var, region={None})
+    calc_spec = _CalcSpec(lib, spec)
+    assert calc_spec.names is None
+    result = cloudpickle.loads(cloudpickle.dumps(calc_spec))
+    assert result.objs['var'].name == var.name
+
+
+def test_calc_spec_pickles_by_name(calcsuite_init_specs_single_calc):
+    calc_spec = next(CalcSuite(calcsuite_init_specs_single_calc)
+                     ._iter_calc_specs())
+    assert calc_spec.names['var'] == condensation_rain.name
+    result = pickle.loads(pickle.dumps(calc_spec))
+    assert result._objs is None
+    assert result.objs['model'] is example_model
+    assert str(result.to_calc()) == str(calc_spec.to_calc())
+
+
+def test_iter_calc_specs(calcsuite_init_specs_two_calcs):
+    calc_suite = CalcSuite(calcsuite_init_specs_two_calcs)
+    calc_specs = calc_suite._iter_calc_specs()
+    assert not isinstance(calc_specs, list)
+    expected = [str(calc) for calc in calc_suite.create_calcs()]
+    assert [str(spec.to_calc()) for spec in calc_specs] == expected
+
+
+def test_plan_calcs(calc):
+    calc.data_loader = DictDataLoader(
+        {'monthly': [lib.precip_files, os.path.join(example_proj.direc_out,
+                                                    'missing.nc')]})
+    plan, summary = _plan_calcs([calc])
+    paths = glob.glob(lib.precip_files)
+    row = plan.iloc[0]
+    assert row['var'] == calc.name
+    assert row['n_files'] == len(paths)
+    assert row['n_missing'] == 1
+    assert row['nbytes_disk'] == sum(os.path.getsize(p) for p in paths)
+    assert row['nbytes_memory'] > 0
+    assert '1 files missing' in summary
+
+
+def test_submit_mult_calcs_dry_run(calcsuite_init_specs_single_calc):
+    result = submit_mult_calcs(calcsuite_init_specs_single_calc,
+                               dict(dry_run=True))
+    assert len(result) == 1
+    assert result.iloc[0]['n_missing'] == 0
+    assert not os.path.exists(example_proj.direc_out)
+
+
+def test_calc_nbytes_in(calc):
+    expected = sum(os.path.getsize(path) for path in
+                   glob.glob(lib.precip_files))
+    assert _calc_nbytes_in(calc) == expected
+
+
+def test_order_calcs_by_cost():
+    calcs = ['small', 'large', 'medium']
+    assert _order_calcs_by_cost(calcs, [1, 100, 10]) == [1, 2, 0]
+    assert _order_calcs_by_cost(calcs, [1, 100, 10],
+                                offline=[False, True, False]) == [2, 0, 1]
+
+
+@pytest.mark.parametrize(
+    ('costs', 'total_memory', 'expected_n_workers'),
+    [([1, 1], 1000, 2),
+     ([1, 100], 1000, 2),
+     ([100, 200], 1000, 1),
+     ([0, 0], 1000, 2),
+     ([50, 1, 1, 1], 1000, 4),
+     ([63, 1, 1, 1], 1000, 3)])
+def test_local_cluster_kwargs(monkeypatch, costs, total_memory,
+                              expected_n_workers):
+    # As many workers as Calcs, before accounting for their memory.
+    monkeypatch.setattr(automate, '_n_workers_for_local_cluster', len)
+    calcs = ['calc'] * len(costs)
+    result = _local_cluster_kwargs(calcs, costs, total_memory)
+    assert result['n_workers'] == expected_n_workers
+    assert result['threads_per_worker'] == 1
+    assert result['memory_limit'] == total_memory // expected_n_workers
+    # The largest Calc fits within each worker's memory limit.
+    assert (result['memory_limit'] >=
+            automate._MEMORY_PER_BYTE_READ * max(costs))
+
+
+def test_local_cluster_kwargs_largest_calc_too_large(monkeypatch, caplog):
+    monkeypatch.setattr(automate, '_n_workers_for_local_cluster', len)
+    result = _local_cluster_kwargs(['calc'] * 2, [1, 300], 1000)
+    assert result['n_workers'] == 1
+    assert result['memory_limit'] == 1000
+    assert 'using a single worker' in caplog.text
+
+
 @pytest.fixture
 def calc_suite(calcsuite_init_specs):
     return CalcSuite(calcsuite_init_specs)
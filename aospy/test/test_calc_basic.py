@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 """Basic test of the Calc module on 2D data."""
 import datetime
+import os
 from os.path import isfile
 import shutil
 import unittest
@@ -8,10 +9,11 @@ import pytest
 import itertools
 
 import cftime
+import dask.array as da
 import numpy as np
 import xarray as xr
 
-from aospy import Var
+from aospy import Model, Run, Var
 from aospy.calc import Calc, _add_metadata_as_attrs, _replace_pressure
 from aospy.internal_names import ETA_STR
 from aospy.utils.vertcoord import p_eta, dp_eta, p_level, dp_level
@@ -114,6 +116,67 @@ def test_annual_mean(test_params):
     _test_files_and_attrs(calc, 'av')
 
 
+def test_add_grid_attributes(caplog):
+    calc = Calc(proj=example_proj, model=example_model, run=example_run,
+                var=condensation_rain, date_range=_2D_DATE_RANGES['cftime'],
+                intvl_in='monthly', dtype_in_time='ts', intvl_out='ann',
+                dtype_out_time='av')
+    lat = example_model.lat + 1e-10
+    shape = (lat.size, example_model.lon.size)
+    ds = xr.Dataset({'precip': (('lat', 'lon'),
+                                da.zeros(shape, chunks=shape))},
+                    coords={'lat': lat.values,
+                            'lon': example_model.lon.values})
+    caplog.set_level('INFO')
+    for _ in range(2):
+        result = calc._add_grid_attributes(ds)
+        # Data variables are left unloaded.
+        assert isinstance(result['precip'].data, da.Array)
+        np.testing.assert_array_equal(result['lat'], example_model.lat)
+        np.testing.assert_array_equal(result['sfc_area'],
+                                      example_model.sfc_area)
+    # The grid attributes are only compared once.
+    messages = [record.getMessage() for record in caplog.records
+                if 'nearly (but not exactly)' in record.getMessage()]
+    assert len(messages) == 1
+    comparisons = {key[1]: cached[-1] for key, cached
+                   in example_model._grid_attr_comparisons.items()
+                   if key[0] == example_run.name}
+    assert comparisons['lat'] == 'close'
+    assert comparisons['lon'] == 'equal'
+
+    # Only the most recent comparison of each attribute is kept.
+    n_cached = len(example_model._grid_attr_comparisons)
+    shifted = ds.assign_coords(lat=ds['lat'] + 1.)
+    calc._add_grid_attributes(shifted)
+    calc._add_grid_attributes(ds)
+    assert len(example_model._grid_attr_comparisons) == n_cached
+
+    # Reloading the grid data discards the comparisons to it.
+    example_model._grid_data_is_set = False
+    example_model.set_grid_data()
+    assert not example_model._grid_attr_comparisons
+
+
+@pytest.mark.filterwarnings('ignore:The enable_cftimeindex')
+def test_compute_profile_records():
+    calc = Calc(proj=example_proj, model=example_model, run=example_run,
+                var=condensation_rain, date_range=_2D_DATE_RANGES['datetime'],
+                intvl_in='monthly', dtype_in_time='ts', intvl_out='ann',
+                dtype_out_time=['av', 'reg.av'], region=[globe])
+    calc.compute()
+    _clean_test_direcs()
+    stages = [record['stage'] for record in calc.profile_records]
+    for stage in ['file_set', 'open', 'decode', 'read', 'grid_attrs',
+                  'yearly_average', 'reduce', 'write', 'write_tar']:
+        assert stage in stages
+    assert stages[-1] == 'compute'
+    assert calc.profile_records[-1]['depth'] == 0
+    reductions = [record['reduction'] for record in calc.profile_records
+                  if record['stage'] == 'reduce']
+    assert reductions == ['av', 'reg.av']
+
+
 @pytest.mark.filterwarnings('ignore:The enable_cftimeindex')
 def test_annual_ts(test_params):
     calc = Calc(intvl_out='ann', dtype_out_time='ts', **test_params)
@@ -121,6 +184,85 @@ def test_annual_ts(test_params):
     _test_files_and_attrs(calc, 'ts')
 
 
+def test_load_memory_maps_results():
+    calc = Calc(proj=example_proj, model=example_model, run=example_run,
+                var=condensation_rain, date_range=_2D_DATE_RANGES['cftime'],
+                intvl_in='monthly', dtype_in_time='ts', intvl_out='ann',
+                dtype_out_time='ts')
+    try:
+        calc.compute(write_to_tar=False)
+        computed = calc.data_out.pop('ts')
+        loaded = calc.load('ts', mmap=True)
+        # The data are a read-only view onto the file, not a copy of it.
+        assert not loaded.values.flags.writeable
+        xr.testing.assert_allclose(loaded, computed)
+        with xr.open_dataset(calc.path_out['ts']) as ds:
+            xr.testing.assert_identical(loaded, ds[calc.name])
+
+        # Saving the results again leaves those loaded before intact.
+        calc.save(computed * 2, 'ts')
+        xr.testing.assert_allclose(loaded, computed)
+    finally:
+        _clean_test_direcs()
+
+
+def test_load_reads_only_requested_variable(monkeypatch):
+    calc = Calc(proj=example_proj, model=example_model, run=example_run,
+                var=condensation_rain, date_range=_2D_DATE_RANGES['cftime'],
+                intvl_in='monthly', dtype_in_time='ts', intvl_out='ann',
+                dtype_out_time='ts')
+    try:
+        calc.compute(write_to_tar=False)
+        computed = calc.data_out.pop('ts')
+        path = calc.path_out['ts']
+        with xr.open_dataset(path) as ds:
+            ds = ds.load()
+        ds['other'] = 2 * ds[calc.name]
+        ds.to_netcdf(path)
+
+        loaded_vars = []
+        load_dataset = xr.Dataset.load
+
+        def tracked_load_dataset(ds, **kwargs):
+            loaded_vars.extend(ds.data_vars)
+            return load_dataset(ds, **kwargs)
+
+        monkeypatch.setattr(xr.Dataset, 'load', tracked_load_dataset)
+        xr.testing.assert_allclose(calc.load('ts'), computed)
+        assert 'other' not in loaded_vars
+    finally:
+        _clean_test_direcs()
+
+
+def test_load_resave_memory_mapped_results():
+    calc = Calc(proj=example_proj, model=example_model, run=example_run,
+                var=condensation_rain, date_range=_2D_DATE_RANGES['cftime'],
+                intvl_in='monthly', dtype_in_time='ts', intvl_out='ann',
+                dtype_out_time='ts')
+    try:
+        calc.compute(write_to_tar=False)
+        computed = calc.data_out.pop('ts')
+        # By default the data are loaded into memory, and can be modified.
+        loaded = calc.load('ts')
+        assert loaded.values.flags.writeable
+        loaded += 1
+        xr.testing.assert_allclose(loaded, computed + 1)
+
+        # Data memory-mapped from the file can be saved back onto it, after
+        # which the Calc no longer holds a view onto the file.
+        calc.data_out.pop('ts')
+        mapped = calc.load('ts', mmap=True)
+        calc.save(mapped, 'ts')
+        assert calc.data_out['ts'].values.flags.writeable
+        xr.testing.assert_allclose(calc.data_out['ts'], computed)
+        calc.data_out.pop('ts')
+        xr.testing.assert_allclose(calc.load('ts', mmap=True), computed)
+        assert not any(name.endswith('.tmp')
+                       for name in os.listdir(calc.dir_out))
+    finally:
+        _clean_test_direcs()
+
+
 @pytest.mark.filterwarnings('ignore:The enable_cftimeindex')
 def test_seasonal_mean(test_params):
     calc = Calc(intvl_out='djf', dtype_out_time='av', **test_params)
@@ -215,6 +357,22 @@ def test_calc_object_time_options():
                     Calc(**test_params_not_time_defined)
 
 
+def test_calc_object_defers_grid_data():
+    run = Run(name='lazy_run', data_loader=example_run.data_loader,
+              default_start_date=example_run.default_start_date,
+              default_end_date=example_run.default_end_date)
+    model = Model(name='lazy_model',
+                  grid_file_paths=example_model.grid_file_paths,
+                  runs=[run], grid_attrs=example_model.grid_attrs)
+    calc = Calc(proj=example_proj, model=model, run=run,
+                var=condensation_rain, date_range='default',
+                intvl_in='monthly', dtype_in_time='ts', intvl_out='ann',
+                dtype_out_time='av', dtype_in_vert=False)
+    assert not model._grid_data_is_set
+    calc._get_input_data(condensation_rain, calc.start_date, calc.end_date)
+    assert model._grid_data_is_set
+
+
 @pytest.mark.parametrize(
     ('units', 'description', 'dtype_out_vert', 'expected_units',
      'expected_description'),
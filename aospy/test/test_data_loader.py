@@ -2,6 +2,7 @@
 """Test suite for aospy.data_loader module."""
 import datetime
 import os
+import pickle
 import unittest
 import warnings
 
@@ -15,15 +16,18 @@ from aospy import Var
 from aospy.data_loader import (DataLoader, DictDataLoader, GFDLDataLoader,
                                NestedDictDataLoader, grid_attrs_to_aospy_names,
                                set_grid_attrs_as_coords, _sel_var,
-                               _prep_time_data,
+                               _prep_time_data, _drop_unneeded_vars,
+                               _load_data_from_disk, _decoded_times,
+                               _prep_time_data_from_decoded,
                                _preprocess_and_rename_grid_attrs,
-                               _maybe_cast_to_float64)
+                               _maybe_cast_to_float64, _PreprocessPlan)
 from aospy.internal_names import (LAT_STR, LON_STR, TIME_STR, TIME_BOUNDS_STR,
                                   BOUNDS_STR, SFC_AREA_STR, ETA_STR, PHALF_STR,
                                   TIME_WEIGHTS_STR, GRID_ATTRS, ZSURF_STR)
-from aospy.utils import io
+from aospy.utils import io, profiling
 from .data.objects.examples import (condensation_rain, convection_rain, precip,
                                     file_map, ROOT_PATH, example_model, bk)
+from .data.synthetic import synthetic_dataset, write_file_map
 
 
 def _open_ds_catch_warnings(path):
@@ -315,6 +319,74 @@ def test_preprocess_and_rename_grid_attrs(ds, alt_lat_str):
     xr.testing.assert_identical(result, expected)
 
 
+def test_preprocess_and_rename_grid_attrs_var_names(ds, alt_lat_str,
+                                                    var_name):
+    ds['b'] = ds[var_name].copy()
+    expected = ds.drop('b').rename({alt_lat_str: LAT_STR})
+    expected = expected.set_coords(TIME_BOUNDS_STR)
+    result = _preprocess_and_rename_grid_attrs(
+        lambda ds, **kwargs: ds, var_names=[var_name])(ds)
+    xr.testing.assert_identical(result, expected)
+
+
+def test_preprocess_plan(ds, alt_lat_str, var_name):
+    ds['b'] = ds[var_name].copy()
+    plan = _PreprocessPlan(var_names=[var_name])
+    expected = grid_attrs_to_aospy_names(
+        _drop_unneeded_vars(ds, [var_name]))
+    xr.testing.assert_identical(plan(ds), expected)
+    # Files like the first are prepared by the plan inferred from it...
+    xr.testing.assert_identical(plan(ds.copy()), expected)
+    # ...and others from scratch.
+    other = ds.rename({'b': 'c'})
+    xr.testing.assert_identical(plan(other), expected)
+
+
+def test_drop_unneeded_vars(ds, alt_lat_str, var_name):
+    ds['b'] = ds[var_name].copy()
+    ds['custom_bnds'] = ds[TIME_BOUNDS_STR].copy()
+    ds['custom_zsurf'] = ds[var_name].isel(**{TIME_STR: 0}, drop=True)
+    ds[var_name].attrs['bounds'] = 'custom_bnds'
+
+    result = _drop_unneeded_vars(ds, [var_name],
+                                 grid_attrs={ZSURF_STR: 'custom_zsurf'})
+    assert set(result.data_vars) == {var_name, TIME_BOUNDS_STR,
+                                     'custom_bnds', 'custom_zsurf'}
+    assert alt_lat_str in result.coords
+
+    result = _drop_unneeded_vars(ds, ['b'])
+    assert set(result.data_vars) == {'b', TIME_BOUNDS_STR}
+
+
+def test_load_data_from_disk_var_names():
+    file_set = file_map['monthly'][condensation_rain.name]
+    result = _load_data_from_disk(file_set,
+                                  var_names=condensation_rain.names)
+    assert condensation_rain.name in result
+    assert convection_rain.name not in result
+    assert TIME_BOUNDS_STR in result
+
+    result = _load_data_from_disk(file_set)
+    assert convection_rain.name in result
+
+
+def test_load_data_from_disk_var_names_preprocess():
+    # Variables that are not loaded are still available to preprocess.
+    def preprocess(ds, **kwargs):
+        ds[condensation_rain.name] = (ds[condensation_rain.name] +
+                                      ds[convection_rain.name])
+        return ds
+
+    file_set = file_map['monthly'][condensation_rain.name]
+    result = _load_data_from_disk(file_set, preprocess,
+                                  var_names=condensation_rain.names)
+    assert convection_rain.name not in result
+    expected = _load_data_from_disk(file_set)
+    xr.testing.assert_allclose(
+        result[condensation_rain.name],
+        expected[condensation_rain.name] + expected[convection_rain.name])
+
+
 def test_generate_file_set(data_loader, generate_file_set_args):
     if type(data_loader) is DataLoader:
         with pytest.raises(NotImplementedError):
@@ -448,6 +520,20 @@ def test_input_data_paths_gfdl(gfdl_data_loader, start_date, end_date):
     assert result == expected
 
 
+def test_input_data_paths_gfdl_cached(gfdl_data_loader):
+    args = ('temp', '2010', '2010', 'atmos', 'monthly', 'pressure', 'ts',
+            None)
+    result = gfdl_data_loader._input_data_paths_gfdl(*args)
+    result.append('modified')
+    assert gfdl_data_loader._input_data_paths_gfdl(*args) == [os.path.join(
+        '.', 'test', 'atmos', 'ts', 'monthly', '6yr',
+        'atmos.200601-201112.temp.nc')]
+
+    gfdl_data_loader.data_direc = os.path.join('.', 'other')
+    result = gfdl_data_loader._input_data_paths_gfdl(*args)
+    assert result[0].startswith(os.path.join('.', 'other'))
+
+
 # TODO: Parametrize these tests
 def test_data_name_gfdl_annual():
     for data_type in ['ts', 'inst']:
@@ -843,5 +929,120 @@ def test_recursively_compute_grid_attr_error(load_variable_data_loader):
             intvl_in='monthly')
 
 
+@pytest.fixture()
+def multi_var_data_loader(tmpdir):
+    file_map = write_file_map(str(tmpdir), ['precip', 'evap', 'temp'],
+                              intvl_in='monthly', n_years=2, n_lat=2,
+                              n_lon=4)
+    return DictDataLoader(file_map)
+
+
+def _stages(recorder, name):
+    return [record for record in recorder.records if record['stage'] == name]
+
+
+def test_load_variables(multi_var_data_loader):
+    variables = [Var(name=name, def_time=True) for name in ['evap', 'precip']]
+    kwargs = dict(start_date=DatetimeNoLeap(1, 1, 1),
+                  end_date=DatetimeNoLeap(2, 12, 31), intvl_in='monthly')
+    recorder = profiling.Recorder()
+    with profiling.recording(recorder):
+        result = multi_var_data_loader.load_variables(variables, **kwargs)
+    assert len(_stages(recorder, 'open')) == 1
+    assert len(_stages(recorder, 'read')) == 2
+    assert [da.name for da in result] == ['evap', 'precip']
+    for var, da in zip(variables, result):
+        expected = multi_var_data_loader.load_variable(var, **kwargs)
+        xr.testing.assert_identical(da, expected)
+
+
+def test_sharing_opens(multi_var_data_loader):
+    evap = Var(name='evap', def_time=True)
+    temp = Var(name='temp', def_time=True)
+    missing = Var(name='missing', def_time=True)
+    kwargs = dict(start_date=DatetimeNoLeap(1, 1, 1),
+                  end_date=DatetimeNoLeap(2, 12, 31), intvl_in='monthly')
+    expected = multi_var_data_loader.load_variable(evap, **kwargs)
+    requests = [(evap, kwargs), (temp, kwargs), (missing, kwargs)]
+
+    recorder = profiling.Recorder()
+    with profiling.recording(recorder):
+        with multi_var_data_loader._sharing_opens(requests):
+            result = multi_var_data_loader.load_variable(evap, **kwargs)
+            multi_var_data_loader.load_variable(temp, **kwargs)
+            # Loads with other arguments open their files as usual.
+            multi_var_data_loader.load_variable(
+                evap, start_date=DatetimeNoLeap(2, 1, 1),
+                end_date=DatetimeNoLeap(2, 12, 31), intvl_in='monthly')
+            with pytest.raises(LookupError):
+                multi_var_data_loader.load_variable(missing, **kwargs)
+    xr.testing.assert_identical(result, expected)
+    opens = _stages(recorder, 'open')
+    assert [record['cache_hit'] for record in opens] == [
+        False, True, False, False]
+    assert opens[0]['var'] == 'evap, temp, missing'
+    assert not multi_var_data_loader._shared_opened
+
+
+@pytest.mark.parametrize('calendar', ['noleap', 'julian'])
+def test_prep_time_data_from_decoded(calendar):
+    ds = grid_attrs_to_aospy_names(synthetic_dataset(
+        ['precip', 'evap'], n_lat=2, n_lon=4, intvl_in='daily',
+        calendar=calendar, n_years=2))
+    expected = _prep_time_data(ds.copy())
+    result = _prep_time_data_from_decoded(ds.copy(),
+                                          *_decoded_times(expected))
+    xr.testing.assert_identical(result, expected)
+    assert result[TIME_STR].encoding == expected[TIME_STR].encoding
+
+
+def test_load_variable_reuses_decoded_times(multi_var_data_loader):
+    kwargs = dict(start_date=DatetimeNoLeap(1, 1, 1),
+                  end_date=DatetimeNoLeap(2, 12, 31), intvl_in='monthly')
+    recorder = profiling.Recorder()
+    with profiling.recording(recorder):
+        expected = multi_var_data_loader.load_variable(
+            Var(name='evap', def_time=True), **kwargs)
+        result = multi_var_data_loader.load_variable(
+            Var(name='evap', def_time=True), **kwargs)
+        multi_var_data_loader.load_variable(
+            Var(name='precip', def_time=True), **kwargs)
+        multi_var_data_loader.load_variable(
+            Var(name='precip', def_time=True), grid_attrs={LAT_STR: 'y'},
+            **kwargs)
+    xr.testing.assert_identical(result, expected)
+    decodes = _stages(recorder, 'decode')
+    assert [record['cache_hit'] for record in decodes] == [
+        False, True, True, False]
+
+    # The cache is not pickled along with the DataLoader.
+    assert multi_var_data_loader._decoded_times_cache
+    unpickled = pickle.loads(pickle.dumps(multi_var_data_loader))
+    assert not hasattr(unpickled, '_decoded_times_cache')
+
+
+def test_load_variable_reuses_preprocess_plan(multi_var_data_loader):
+    evap = Var(name='evap', def_time=True)
+    expected = multi_var_data_loader.load_variable(
+        evap, DatetimeNoLeap(2, 1, 1), DatetimeNoLeap(2, 12, 31),
+        intvl_in='monthly')
+    plans = multi_var_data_loader._preprocess_plans
+    assert len(plans) == 1
+    plan, = plans.values()
+    assert set(plan.drop_variables) == {'precip', 'temp'}
+
+    # Loads of other date ranges from the same files share the plan.
+    result = multi_var_data_loader.load_variable(
+        evap, DatetimeNoLeap(1, 1, 1), DatetimeNoLeap(2, 12, 31),
+        intvl_in='monthly')
+    assert list(multi_var_data_loader._preprocess_plans.values()) == [plan]
+    np.testing.assert_array_equal(
+        result.sel(**{TIME_STR: expected[TIME_STR]}), expected)
+
+    # The plans are not pickled along with the DataLoader.
+    unpickled = pickle.loads(pickle.dumps(multi_var_data_loader))
+    assert not hasattr(unpickled, '_preprocess_plans')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -213,6 +213,31 @@ def test_ts_land_mask(data_for_reg_calcs):
     xr.testing.assert_identical(result, expected)
 
 
+@pytest.mark.parametrize('region', [region_no_land_mask, region_land_mask])
+def test_ts_float32(data_for_reg_calcs, region):
+    result = region.ts(data_for_reg_calcs.astype(np.float32))
+    expected = region.ts(data_for_reg_calcs)
+    assert result.dtype == np.float64
+    xr.testing.assert_allclose(result, expected)
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_ts_with_invalid_values(data_for_reg_calcs, dtype):
+    data = xr.concat([data_for_reg_calcs, data_for_reg_calcs], dim='time')
+    data[1, 3, 0] = np.nan
+    data = data.astype(dtype)
+    result = region_no_land_mask.ts(data)
+
+    values = data_for_reg_calcs.values
+    sfc_area = data_for_reg_calcs.sfc_area.values
+    expected = [(values[2, 0] * sfc_area[2, 0] +
+                 values[3, 0] * sfc_area[3, 0]) /
+                (sfc_area[2, 0] + sfc_area[3, 0]),
+                values[2, 0]]
+    np.testing.assert_allclose(result.values, expected)
+    assert result.dims == ('time',)
+
+
 _map_to_alt_names = {'lon_str': _alt_names[LON_STR],
                      'lat_str': _alt_names[LAT_STR],
                      'land_mask_str': _alt_names[LAND_MASK_STR],
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""Test suite for the synthetic model output generator."""
+import os
+
+import cftime
+import numpy as np
+import pytest
+
+from aospy import Var
+from aospy.data_loader import DictDataLoader
+from aospy.internal_names import BK_STR, PFULL_STR, PK_STR, PLEVEL_STR
+from .data.synthetic import (synthetic_dataset, write_file_map,
+                             write_gfdl_tree)
+
+
+@pytest.mark.parametrize(
+    ('intvl_in', 'calendar', 'n_time', 'days'),
+    [('annual', 'noleap', 2, 730),
+     ('monthly', 'noleap', 24, 730),
+     ('monthly', '360_day', 24, 720),
+     ('daily', 'all_leap', 732, 732),
+     ('6hr', 'noleap', 2920, 730),
+     ('3hr', 'julian', 5848, 731)])
+def test_synthetic_dataset_times(intvl_in, calendar, n_time, days):
+    ds = synthetic_dataset(n_lat=2, n_lon=4, intvl_in=intvl_in,
+                           calendar=calendar, start_year=3, n_years=2)
+    assert ds['time'].size == n_time
+    assert ds['average_DT'].sum() == days
+    assert ds['time'].attrs['calendar'] == calendar
+    np.testing.assert_array_equal(ds['time_bounds'][1:, 0],
+                                  ds['time_bounds'][:-1, 1])
+
+
+@pytest.mark.parametrize('kwargs', [dict(intvl_in='weekly'),
+                                    dict(calendar='lunar'),
+                                    dict(dtype_in_vert='height')])
+def test_synthetic_dataset_invalid(kwargs):
+    with pytest.raises(ValueError):
+        synthetic_dataset(n_lat=2, n_lon=4, **kwargs)
+
+
+def test_synthetic_dataset_vertical():
+    ds = synthetic_dataset(['temp', 'ps'], n_lat=2, n_lon=4,
+                           dtype_in_vert='pressure')
+    assert ds['temp'].dims == ('time', PLEVEL_STR, 'lat', 'lon')
+    assert ds['ps'].dims == ('time', 'lat', 'lon')
+
+    ds = synthetic_dataset(['temp', 'ps'], n_lat=2, n_lon=4,
+                           dtype_in_vert='sigma', n_levels=5)
+    assert ds['temp'].dims == ('time', PFULL_STR, 'lat', 'lon')
+    assert ds[PFULL_STR].size == 5
+    p = ds[PK_STR] + ds[BK_STR] * ds['ps']
+    assert (p.diff('phalf') > 0).all()
+
+
+def test_write_gfdl_tree(tmpdir):
+    data_direc = str(tmpdir)
+    data_loader = write_gfdl_tree(data_direc, ['temp'], data_dur=2,
+                                  start_year=2, n_years=3,
+                                  dtype_in_vert='sigma', n_lat=2, n_lon=4,
+                                  n_levels=5)
+    expected = [
+        os.path.join('atmos', 'ts', 'monthly', '2yr', name)
+        for name in ['atmos.000201-000312.ps.nc',
+                     'atmos.000401-000512.ps.nc']
+    ] + [
+        os.path.join('atmos_level', 'ts', 'monthly', '2yr', name)
+        for name in ['atmos_level.000201-000312.temp.nc',
+                     'atmos_level.000401-000512.temp.nc']
+    ]
+    for path in expected:
+        assert os.path.isfile(os.path.join(data_direc, path))
+
+    result = data_loader.load_variable(
+        Var(name='temp', def_time=True), cftime.DatetimeNoLeap(2, 1, 1),
+        cftime.DatetimeNoLeap(4, 12, 31), domain='atmos', intvl_in='monthly',
+        dtype_in_vert='sigma', dtype_in_time='ts', intvl_out='ann')
+    assert result.sizes['time'] == 36
+    assert result.sizes[PFULL_STR] == 5
+
+
+def test_write_gfdl_tree_invalid_dtype_in_time(tmpdir):
+    with pytest.raises(ValueError):
+        write_gfdl_tree(str(tmpdir), dtype_in_time='av')
+
+
+def test_write_file_map(tmpdir):
+    file_map = write_file_map(str(tmpdir), ['precip', 'evap'],
+                              intvl_in='daily', years_per_file=2,
+                              n_years=3, n_lat=2, n_lon=4)
+    assert list(file_map) == ['daily']
+    assert [os.path.basename(path) for path in file_map['daily']] == [
+        '00010101.daily.nc', '00030101.daily.nc']
+
+    result = DictDataLoader(file_map).load_variable(
+        Var(name='evap', def_time=True), cftime.DatetimeNoLeap(1, 1, 1),
+        cftime.DatetimeNoLeap(3, 12, 31, 23), intvl_in='daily')
+    assert result.sizes['time'] == 3 * 365
@@ -1,8 +1,15 @@
 #!/usr/bin/env python
 """Test suite for aospy.io module."""
+import os
+import shutil
 import sys
+import tempfile
 import unittest
 
+import numpy as np
+import pandas as pd
+import xarray as xr
+
 import aospy.utils.io as io
 
 
@@ -25,5 +32,162 @@ class TestIO(AospyIOTestCase):
                  '00010101.atmos_month.nc')
 
 
+class TestFileSets(AospyIOTestCase):
+    def setUp(self):
+        self.direc = tempfile.mkdtemp()
+        self.paths = [os.path.join(self.direc, '000{}0101.nc'.format(i))
+                      for i in (4, 5, 6)]
+        for nbytes, path in enumerate(self.paths, start=1):
+            with open(path, 'wb') as f:
+                f.write(b'0' * nbytes)
+
+    def tearDown(self):
+        shutil.rmtree(self.direc)
+
+    def test_expand_file_set_glob(self):
+        glob_str = os.path.join(self.direc, '000[4-6]0101.nc')
+        self.assertEqual(io.expand_file_set(glob_str), self.paths)
+
+    def test_expand_file_set_list(self):
+        paths = self.paths[::-1]
+        self.assertEqual(io.expand_file_set(paths), paths)
+
+    def test_expand_file_set_no_match(self):
+        glob_str = os.path.join(self.direc, '*.missing')
+        self.assertEqual(io.expand_file_set(glob_str), [glob_str])
+
+    def test_file_set_nbytes(self):
+        missing = os.path.join(self.direc, 'missing.nc')
+        self.assertEqual(io.file_set_nbytes(self.paths + [missing]), 6)
+
+    def test_file_var_nbytes(self):
+        path = os.path.join(os.path.dirname(__file__), 'data', 'netcdf',
+                            'im.landmask.nc')
+        with xr.open_dataset(path, decode_times=False) as ds:
+            expected = {name: var.values.nbytes
+                        for name, var in ds.variables.items()}
+        self.assertEqual(io.file_var_nbytes(path), expected)
+
+    def test_file_is_online(self):
+        self.assertTrue(io.file_is_online(self.paths[0]))
+        self.assertTrue(io.file_is_online(os.path.join(self.direc, 'a.nc')))
+        # A sparse file, like the stub of a file migrated to tape.
+        stub = os.path.join(self.direc, 'stub.nc')
+        with open(stub, 'wb') as f:
+            f.truncate(2 ** 20)
+        if getattr(os.stat(stub), 'st_blocks', None) == 0:
+            self.assertFalse(io.file_is_online(stub))
+
+    def test_recall_files(self):
+        log = os.path.join(self.direc, 'recalled.txt')
+        cmd = [sys.executable, '-c',
+               'import sys; open(sys.argv[1], "a").write('
+               '" ".join(sys.argv[2:]) + "\\n")', log]
+        batch_size = io._RECALL_BATCH_SIZE
+        io._RECALL_BATCH_SIZE = 2
+        try:
+            io.recall_files(self.paths, cmd=cmd)
+        finally:
+            io._RECALL_BATCH_SIZE = batch_size
+        with open(log) as f:
+            batches = [line.split() for line in f.read().splitlines()]
+        self.assertEqual(batches, [self.paths[:2], self.paths[2:]])
+
+        # By default, only files in /archive are recalled, via dmget.
+        io.recall_files(self.paths)
+
+    def test_file_exists(self):
+        io.clear_dir_listings()
+        new = os.path.join(self.direc, 'new.nc')
+        self.assertTrue(io.file_exists(self.paths[0]))
+        self.assertFalse(io.file_exists(new))
+        self.assertFalse(io.file_exists(self.direc))
+        self.assertFalse(io.file_exists(os.path.join(self.direc, 'a', 'b')))
+
+        # Files created since the directory was listed are found.
+        open(new, 'w').close()
+        self.assertTrue(io.file_exists(new))
+
+        # The directory's listing is reused until it is cleared, so files
+        # removed since it was made are not noticed.
+        os.remove(self.paths[0])
+        self.assertTrue(io.file_exists(self.paths[0]))
+        io.clear_dir_listings()
+        self.assertFalse(io.file_exists(self.paths[0]))
+
+    def test_file_exists_ttl(self):
+        io.clear_dir_listings()
+        self.assertTrue(io.file_exists(self.paths[0]))
+        os.remove(self.paths[0])
+        ttl = io.DIR_LISTING_TTL
+        io.DIR_LISTING_TTL = 0
+        try:
+            self.assertFalse(io.file_exists(self.paths[0]))
+        finally:
+            io.DIR_LISTING_TTL = ttl
+
+    def test_file_exists_missing_directory(self):
+        io.clear_dir_listings()
+        direc = os.path.join(self.direc, 'new')
+        path = os.path.join(direc, 'new.nc')
+        self.assertFalse(io.file_exists(path))
+        # A directory that could not be listed is not cached as empty.
+        self.assertNotIn(direc, io._DIR_LISTINGS)
+        os.mkdir(direc)
+        open(path, 'w').close()
+        self.assertTrue(io.file_exists(path))
+
+
+class TestOpenDatasetMmap(AospyIOTestCase):
+    def setUp(self):
+        self.direc = tempfile.mkdtemp()
+        self.path = os.path.join(self.direc, 'data.nc')
+        time = pd.date_range('2000-01-01', periods=4)
+        ds = xr.Dataset(
+            {'a': (('time', 'x'), np.random.random((4, 3)), {'units': 'K'}),
+             'b': ('time', np.arange(4)),
+             'c': ('time', [1., 2., 3., np.nan]),
+             'dt': ('time', pd.to_timedelta(np.ones(4), 'D'))},
+            coords={'time': time, 'x': [1., 2., 3.], 'y': ('x', [4., 5., 6.])},
+            attrs={'title': 'test'})
+        ds['a'][0, 0] = np.nan
+        ds['c'].encoding.update(scale_factor=0.5, dtype=np.int16,
+                                _FillValue=-1)
+        ds.to_netcdf(self.path, format='NETCDF3_64BIT')
+
+    def tearDown(self):
+        shutil.rmtree(self.direc)
+
+    def test_open_dataset_mmap(self):
+        ds = io.open_dataset_mmap(self.path)
+        with xr.open_dataset(self.path) as expected:
+            xr.testing.assert_identical(ds, expected)
+            for name in ds.variables:
+                self.assertEqual(ds[name].encoding['dtype'],
+                                 expected[name].encoding['dtype'])
+        # Floats needing no decoding are views onto the file.
+        for name in ['a', 'y']:
+            self.assertFalse(ds[name].values.flags.writeable)
+        for name in ['b', 'c', 'dt', 'time']:
+            self.assertTrue(ds[name].values.flags.writeable)
+
+    def test_release_memory_maps(self):
+        ds = io.open_dataset_mmap(self.path)
+        expected = ds.copy(deep=True)
+        arr = io.release_memory_maps(ds['a'])
+        for values in [arr.values, arr['y'].values]:
+            self.assertTrue(values.flags.writeable)
+            self.assertTrue(values.dtype.isnative)
+        # The DataArray shares its variables with the Dataset.
+        self.assertTrue(ds['y'].values.flags.writeable)
+        xr.testing.assert_identical(io.release_memory_maps(ds), expected)
+
+    def test_open_dataset_mmap_netcdf4(self):
+        path = os.path.join(self.direc, 'data4.nc')
+        xr.Dataset({'a': ('x', [1., 2.])}).to_netcdf(path, format='NETCDF4')
+        with self.assertRaises(TypeError):
+            io.open_dataset_mmap(path)
+
+
 if __name__ == '__main__':
     sys.exit(unittest.main())
@@ -3,7 +3,8 @@ import numpy as np
 import pytest
 import xarray as xr
 
-from aospy.utils.longitude import Longitude, _maybe_cast_to_lon
+from aospy.utils.longitude import (Longitude, LongitudeArray,
+                                   _maybe_cast_to_lon)
 
 
 _good_init_vals_attrs_objs = {
@@ -174,5 +175,54 @@ def test_lon_sub(obj1, obj2, expected_val):
     assert obj1 - obj2 == expected_val
 
 
+_lon_array_vals = [0, 10, 179.5, 180, 190, 359, 360, -10, -180, 540]
+
+
+@pytest.mark.parametrize(
+    'other', [Longitude('0W'), Longitude('0E'), Longitude('180E'),
+              Longitude('180W'), Longitude('10W'), 10, '10w',
+              LongitudeArray(10)])
+@pytest.mark.parametrize('op', ['__eq__', '__ne__', '__lt__', '__gt__',
+                                '__le__', '__ge__'])
+def test_lon_array_compare(op, other):
+    result = getattr(LongitudeArray(_lon_array_vals), op)(other)
+    if isinstance(other, LongitudeArray):
+        other = other.to_pm180()
+    other_lon = _maybe_cast_to_lon(other, strict=True)
+    expected = [getattr(Longitude(val), op)(other_lon)
+                for val in _lon_array_vals]
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_lon_array_compare_dataarray():
+    lon = xr.DataArray(_lon_array_vals, dims=['lon'],
+                       coords={'lon': _lon_array_vals})
+    result = LongitudeArray(lon) < Longitude('10E')
+    expected = xr.DataArray([Longitude(val) < Longitude('10E')
+                             for val in _lon_array_vals],
+                            dims=['lon'], coords={'lon': _lon_array_vals})
+    xr.testing.assert_identical(result, expected)
+
+
+@pytest.mark.parametrize('other', [Longitude(10), Longitude('175W'), 355])
+def test_lon_array_arithmetic(other):
+    lons = LongitudeArray(_lon_array_vals)
+    np.testing.assert_array_equal(
+        (lons + other).to_0360(),
+        [(Longitude(val) + other).to_0360() for val in _lon_array_vals])
+    np.testing.assert_array_equal(
+        (lons - other).to_pm180(),
+        [(Longitude(val) - other).to_pm180() for val in _lon_array_vals])
+
+
+def test_lon_array_conversions():
+    lons = LongitudeArray(_lon_array_vals)
+    np.testing.assert_array_equal(
+        lons.to_0360(), [Longitude(val).to_0360() for val in _lon_array_vals])
+    np.testing.assert_array_equal(
+        lons.to_pm180(),
+        [Longitude(val).to_pm180() for val in _lon_array_vals])
+
+
 if __name__ == '__main__':
     pass
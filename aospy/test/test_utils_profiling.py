@@ -0,0 +1,127 @@
+"""Test suite for aospy.utils.profiling module."""
+import threading
+
+import pytest
+
+from aospy.utils import profiling
+
+
+def test_stage_not_recording():
+    recorder = profiling.Recorder()
+    with profiling.stage('load'):
+        pass
+    assert recorder.records == []
+
+
+def test_stage():
+    recorder = profiling.Recorder()
+    with profiling.recording(recorder):
+        with profiling.stage('compute'):
+            with profiling.stage('load', var='precip'):
+                bytearray(1000)
+    inner, outer = recorder.records
+    assert inner['stage'] == 'load'
+    assert inner['var'] == 'precip'
+    assert inner['depth'] == 1
+    assert outer['stage'] == 'compute'
+    assert outer['depth'] == 0
+    assert outer['start'] <= inner['start']
+    assert outer['duration'] >= inner['duration'] >= 0
+    for key in ['rss', 'peak_rss', 'pid', 'tid']:
+        assert inner[key] is not None
+
+
+def test_stage_exception():
+    recorder = profiling.Recorder()
+    with profiling.recording(recorder):
+        with pytest.raises(ValueError):
+            with profiling.stage('load'):
+                raise ValueError
+        with profiling.stage('reduce'):
+            pass
+    assert [r['stage'] for r in recorder.records] == ['load', 'reduce']
+    assert recorder.records[-1]['depth'] == 0
+
+
+def test_recording_is_thread_local():
+    recorder = profiling.Recorder()
+
+    def run_stage():
+        with profiling.stage('other_thread'):
+            pass
+
+    with profiling.recording(recorder):
+        thread = threading.Thread(target=run_stage)
+        thread.start()
+        thread.join()
+    assert recorder.records == []
+
+
+@pytest.fixture
+def records():
+    common = dict(read_bytes=10, rss=100, peak_rss=200, depth=1, pid=1,
+                  tid=2)
+    return [
+        dict(stage='read', start=0., duration=1., files='a.nc', calc='x',
+             **common),
+        dict(stage='read', start=1., duration=3., files=['b.nc', 'c.nc'],
+             calc='y', **common),
+        dict(stage='grid_data', start=0., duration=0.5, cache_hit=False,
+             calc='x', **common),
+        dict(stage='grid_data', start=1., duration=0., cache_hit=True,
+             calc='y', **common),
+        dict(stage='compute', start=0., duration=2., calc='x',
+             **dict(common, depth=0)),
+        dict(stage='compute', start=1., duration=4., calc='y',
+             **dict(common, depth=0)),
+    ]
+
+
+def test_summarize_stages(records):
+    summary = profiling.summarize_stages(records)
+    assert list(summary.index) == ['compute', 'read', 'grid_data']
+    assert summary.loc['read', 'count'] == 2
+    assert summary.loc['read', 'total'] == 4.
+    assert summary.loc['read', 'max'] == 3.
+    assert summary.loc['read', 'p50'] == 2.
+    assert summary.loc['read', 'read_bytes'] == 20
+
+
+def test_slowest_calcs(records):
+    result = profiling.slowest_calcs(records, n=1)
+    assert list(result['calc']) == ['y']
+
+
+def test_slowest_files(records):
+    result = profiling.slowest_files(records)
+    assert list(result.index) == ['b.nc, c.nc', 'a.nc']
+    assert list(result) == [3., 1.]
+
+
+def test_cache_hit_rates(records):
+    result = profiling.cache_hit_rates(records)
+    assert result.to_dict() == {'grid_data': 0.5}
+
+
+def test_report(records):
+    result = profiling.report(records)
+    for title in ['Time per stage', 'Slowest Calcs', 'Slowest files',
+                  'Cache hit rates']:
+        assert title in result
+    assert '(none)' not in result
+
+
+def test_report_empty():
+    assert profiling.report([]).count('(none)') == 4
+
+
+def test_chrome_trace(records):
+    events = profiling.chrome_trace(records)['traceEvents']
+    assert len(events) == len(records)
+    event = events[1]
+    assert event['name'] == 'read'
+    assert event['ph'] == 'X'
+    assert event['ts'] == 1e6
+    assert event['dur'] == 3e6
+    assert event['args']['calc'] == 'y'
+    assert 'start' not in event['args']
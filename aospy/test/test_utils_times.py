@@ -35,6 +35,12 @@ from aospy.utils.times import (
     ensure_time_as_index,
     sel_time,
     yearly_average,
+    monthly_sums,
+    yearly_average_from_monthly_sums,
+    year_months_within,
+    _time_field,
+    _ordinal_days,
+    _dates_from_ordinal_days,
     infer_year,
     maybe_convert_to_index_date_type
 )
@@ -57,6 +63,66 @@ def test_apply_time_offset():
         assert actual.identical(desired)
 
 
+_CALENDARS = ['noleap', 'all_leap', '360_day', 'julian',
+              'proleptic_gregorian', 'standard']
+
+
+@pytest.mark.parametrize('calendar', _CALENDARS)
+def test_ordinal_days(calendar):
+    start = np.array([1])
+    if calendar == 'standard':
+        # Dates of the standard calendar after the Gregorian reform.
+        start = np.array([1583])
+    days = np.arange(0, 2000 * 366, 7)
+    dates = cftime.num2date(days, 'days since {:04d}-01-01'.format(start[0]),
+                            calendar)
+    if calendar == 'standard':
+        calendar = 'proleptic_gregorian'
+    days = days + _ordinal_days(start, np.array([1]), np.array([1]),
+                                calendar)
+    year, month, day = _dates_from_ordinal_days(days, calendar)
+    np.testing.assert_array_equal(year, [date.year for date in dates])
+    np.testing.assert_array_equal(month, [date.month for date in dates])
+    np.testing.assert_array_equal(day, [date.day for date in dates])
+    np.testing.assert_array_equal(_ordinal_days(year, month, day, calendar),
+                                  days)
+
+
+@pytest.mark.parametrize('calendar', _CALENDARS)
+@pytest.mark.parametrize('field', ['year', 'month', 'day', 'hour'])
+def test_time_field(calendar, field):
+    times = xr.cftime_range('0001-01-01', periods=100, freq='17D',
+                            calendar=calendar)
+    time = xr.DataArray(times, dims=[TIME_STR], coords={TIME_STR: times})
+    xr.testing.assert_identical(_time_field(time, field),
+                                getattr(time.dt, field))
+
+
+@pytest.mark.parametrize('calendar', _CALENDARS + ['gregorian'])
+def test_apply_time_offset_cftime(calendar):
+    # Dates both before and after the Gregorian reform, for the standard
+    # calendar.
+    times = xr.DataArray(np.array(
+        [cftime.datetime(year, 1, 30, 21, calendar=calendar)
+         for year in [1000, 1900, 2000]]))
+    actual = apply_time_offset(times, days=1, hours=3)
+    desired = [date + datetime.timedelta(days=1, hours=3)
+               for date in times.values]
+    assert list(actual) == desired
+
+    # Offsets of months keep the day of the month where possible.
+    actual = apply_time_offset(times, years=1, months=-11)
+    leap_years = {'noleap': [], 'all_leap': [1000, 1900, 2000],
+                  '360_day': [], 'julian': [1000, 1900, 2000],
+                  'proleptic_gregorian': [2000]}.get(calendar, [1000, 2000])
+    for date, year in zip(actual, [1000, 1900, 2000]):
+        day = 30 if calendar == '360_day' else (
+            29 if year in leap_years else 28)
+        assert (date.year, date.month, date.day, date.hour) == (
+            year, 2, day, 21)
+        assert date.calendar == times.values[0].calendar
+
+
 def test_monthly_mean_ts_single_month():
     time = pd.date_range('2000-01-01', freq='6H', periods=4 * 31)
     arr = xr.DataArray(np.random.random(time.shape), dims=[TIME_STR],
@@ -94,6 +160,44 @@ def test_monthly_mean_ts_na():
     assert desired.identical(actual)
 
 
+@pytest.mark.parametrize('calendar', ['noleap', '360_day', 'julian'])
+def test_monthly_mean_ts_cftime(calendar):
+    times = xr.cftime_range('0001-01-01', freq='6H', periods=4 * 400,
+                            calendar=calendar)
+    arr = xr.DataArray(np.random.random((times.size, 2)),
+                       dims=[TIME_STR, 'dim0'], coords={TIME_STR: times})
+    arr[5] = np.nan
+    dt = xr.DataArray(np.random.random(times.size), dims=[TIME_STR],
+                      coords={TIME_STR: times})
+    # Shuffled times are grouped all the same.
+    shuffled = np.random.permutation(times.size)
+    actual = monthly_mean_ts(arr.isel(time=shuffled), dt.isel(time=shuffled))
+
+    month = arr[TIME_STR].dt.year * 12 + arr[TIME_STR].dt.month
+    weights = dt.where(arr.notnull())
+    desired = ((arr * weights).groupby(month).sum(TIME_STR) /
+               weights.groupby(month).sum(TIME_STR))
+    np.testing.assert_allclose(actual, desired)
+    # Means are labeled by the last day of each month.
+    labels = actual.indexes[TIME_STR]
+    assert [date.month for date in labels] == list(range(1, 13)) + [1, 2]
+    assert all(date.day == date.daysinmonth for date in labels)
+
+    result = monthly_mean_at_each_ind(actual, arr)
+    assert result.indexes[TIME_STR].equals(arr.indexes[TIME_STR])
+    np.testing.assert_allclose(result.isel(time=[0, -1]),
+                               actual.isel(time=[0, -1]))
+
+
+def test_monthly_mean_at_each_ind_missing_month():
+    times = pd.to_datetime(['2000-06-01', '2000-07-04', '2000-08-19'])
+    arr = xr.DataArray([1., 2., 3.], dims=[TIME_STR],
+                       coords={TIME_STR: times})
+    means = monthly_mean_ts(arr).isel(time=[2, 0])
+    actual = monthly_mean_at_each_ind(means, arr)
+    np.testing.assert_array_equal(actual, [1., np.nan, 3.])
+
+
 def test_monthly_mean_at_each_ind():
     times_submonthly = pd.to_datetime(['2000-06-01', '2000-06-15',
                                        '2000-07-04', '2000-07-19'])
@@ -539,6 +643,62 @@ def test_yearly_average_masked_data():
     xr.testing.assert_allclose(actual, desired)
 
 
+def test_yearly_average_float32():
+    times = pd.date_range('2000-01-01', '2001-12-31', freq='H')
+    values = 1. + 1e-3 * np.random.random((len(times),))
+    arr = xr.DataArray(values.astype(np.float32), dims=[TIME_STR],
+                       coords={TIME_STR: times})
+    dt = xr.DataArray(np.full(len(times), 1. / 24), dims=[TIME_STR],
+                      coords={TIME_STR: times})
+
+    actual = yearly_average(arr, dt)
+    desired = yearly_average(arr.astype(np.float64), dt)
+    assert actual.dtype == np.float64
+    np.testing.assert_allclose(actual, desired, rtol=1e-7)
+
+
+@pytest.mark.parametrize('months', ['ann', 'djf', 'jja', 3])
+def test_yearly_average_from_monthly_sums(months):
+    times = xr.cftime_range('0001-01-01', '0003-12-31', freq='D',
+                            calendar='noleap')
+    arr = xr.DataArray(np.random.random((len(times), 2)).astype(np.float32),
+                       dims=[TIME_STR, 'x'], coords={TIME_STR: times})
+    # Mask some values, and all of the second point's values in winter 2.
+    arr[40:100, 0] = np.nan
+    winter = arr[TIME_STR].dt.month.isin([12, 1, 2])
+    arr[(winter & (arr[TIME_STR].dt.year == 2)).values, 1] = np.nan
+    dt = xr.DataArray(np.random.random((len(times),)), dims=[TIME_STR],
+                      coords={TIME_STR: times})
+
+    sums, weights = monthly_sums(arr, dt)
+    actual = yearly_average_from_monthly_sums(sums, weights,
+                                              month_indices(months))
+    subset = extract_months(arr[TIME_STR], month_indices(months))
+    desired = yearly_average(arr.sel(time=subset), dt.sel(time=subset))
+    xr.testing.assert_allclose(actual, desired)
+
+
+def test_year_months_within():
+    times = xr.cftime_range('0001-01-01', '0002-12-31', freq='D',
+                            calendar='noleap')
+    time = xr.DataArray(times, dims=[TIME_STR], coords={TIME_STR: times})
+    actual = year_months_within(time, cftime.DatetimeNoLeap(1, 11, 1),
+                                cftime.DatetimeNoLeap(2, 2, 28))
+    np.testing.assert_array_equal(actual, [22, 23, 24, 25])
+    assert year_months_within(time, cftime.DatetimeNoLeap(1, 11, 2),
+                              cftime.DatetimeNoLeap(2, 2, 28)) is None
+
+    sums, weights = monthly_sums(time.dt.dayofyear.astype(float),
+                                 xr.ones_like(time, dtype=float))
+    subset = extract_months(time, month_indices('djf'))
+    subset = subset.sel(time=slice('0001-11-01', '0002-02-28'))
+    actual = yearly_average_from_monthly_sums(
+        sums, weights, month_indices('djf'), year_months=[22, 23, 24, 25])
+    desired = yearly_average(time.dt.dayofyear.astype(float).sel(time=subset),
+                             xr.ones_like(subset, dtype=float))
+    xr.testing.assert_allclose(actual, desired)
+
+
 def test_average_time_bounds(ds_time_encoded_cf):
     ds = ds_time_encoded_cf
     actual = average_time_bounds(ds)[TIME_STR]
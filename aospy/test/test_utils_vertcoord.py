@@ -4,6 +4,7 @@ import sys
 import unittest
 
 import numpy as np
+import xarray as xr
 
 import aospy.utils.vertcoord as vertcoord
 
@@ -38,6 +39,17 @@ class TestUtils(AospyUtilsTestCase):
         np.testing.assert_array_equal(vertcoord.to_pascal(self.p_in_pa),
                                       self.p_in_pa)
 
+    def test_integrate_float32(self):
+        dp = xr.DataArray(np.diff(self.phalf[::-1])[::-1],
+                          dims=['level'])
+        arr = xr.DataArray(1. + 1e-3 * np.random.random((len(dp), 1000)),
+                           dims=['level', 'x'])
+        actual = vertcoord.integrate(arr.astype(np.float32), dp, 'level')
+        desired = vertcoord.integrate(arr.astype(np.float32).astype(
+            np.float64), dp, 'level')
+        self.assertEqual(actual.dtype, np.float64)
+        np.testing.assert_allclose(actual, desired, rtol=1e-6)
+
 
 if __name__ == '__main__':
     sys.exit(unittest.main())
@@ -2,8 +2,10 @@
 from . import io
 from . import longitude
 from .longitude import Longitude
+from . import profiling
 from . import times
 from . import vertcoord
 
 
-__all__ = ['Longitude', 'io', 'longitude', 'times', 'vertcoord']
+__all__ = ['Longitude', 'io', 'longitude', 'profiling', 'times',
+           'vertcoord']
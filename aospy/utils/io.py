@@ -1,8 +1,16 @@
 """Utility functions for data input and output."""
+import glob
 import logging
+import mmap
+import os
 import subprocess
+import threading
+import time
+import warnings
 
 import numpy as np
+import scipy.io
+import xarray as xr
 
 
 def data_in_label(intvl_in, dtype_in_time, dtype_in_vert=False):
@@ -122,16 +130,272 @@ def data_name_gfdl(name, domain, data_type, intvl_type, data_yr,
     return filename
 
 
-def dmget(files_list):
-    """Call GFDL command 'dmget' to access archived files."""
+# Maximum number of paths passed to each call of a recall command, to stay
+# within the system's limit on the length of command lines.
+_RECALL_BATCH_SIZE = 1000
+
+
+def recall_files(files_list, cmd=None):
+    """Recall files from tape storage, waiting until they are online.
+
+    Parameters
+    ----------
+    files_list : str or sequence of str
+        Paths of the files to recall
+    cmd : str or sequence of str, optional
+        The recall command, and any arguments, to which the paths are
+        appended.  By default GFDL's 'dmget', called only with those paths
+        that are in '/archive'.  The command is called with as few batches
+        of paths as possible.
+    """
     if isinstance(files_list, str):
         files_list = [files_list]
+    if cmd is None:
+        cmd = ['dmget']
+        files_list = [f for f in files_list if f.startswith('/archive')]
+    elif isinstance(cmd, str):
+        cmd = [cmd]
+    for i in range(0, len(files_list), _RECALL_BATCH_SIZE):
+        batch = list(files_list[i:i + _RECALL_BATCH_SIZE])
+        try:
+            subprocess.call(list(cmd) + batch)
+        except OSError:
+            logging.debug('{} command not found in this '
+                          'machine'.format(cmd[0]))
+            return
+
+
+def dmget(files_list):
+    """Call GFDL command 'dmget' to access archived files."""
+    recall_files(files_list)
+
+
+def file_is_online(path):
+    """Whether a file's data are on disk, rather than only on tape.
+
+    A hierarchical storage manager (e.g. GFDL's DMF) leaves each file it
+    migrates to tape on disk as a stub occupying fewer blocks than the
+    file's size, so that is taken to mean the file is offline.  Files that
+    do not exist, or whose blocks cannot be determined, count as online.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return True
+    blocks = getattr(stat, 'st_blocks', None)
+    return blocks is None or blocks * 512 >= stat.st_size
 
-    archive_files = []
-    for f in files_list:
-        if f.startswith('/archive'):
-            archive_files.append(f)
+
+# Seconds for which a directory's listing is reused by ``file_exists`` before
+# the directory is listed again.
+DIR_LISTING_TTL = 60
+
+# Cached directory listings, as the time each was made and the names of the
+# files in it, keyed by the directory's absolute path.
+_DIR_LISTINGS = {}
+_DIR_LISTINGS_LOCK = threading.Lock()
+
+
+def _dir_listing(direc):
+    """Names of the files in a directory, listing it at most once per TTL.
+
+    Returns None, without caching anything, if the directory does not exist
+    or cannot be read.
+    """
+    now = time.monotonic()
+    with _DIR_LISTINGS_LOCK:
+        cached = _DIR_LISTINGS.get(direc)
+    if cached is not None and now - cached[0] < DIR_LISTING_TTL:
+        return cached[1]
     try:
-        subprocess.call(['dmget'] + archive_files)
+        names = frozenset(entry.name for entry in os.scandir(direc)
+                          if entry.is_file())
     except OSError:
-        logging.debug('dmget command not found in this machine')
+        return None
+    with _DIR_LISTINGS_LOCK:
+        _DIR_LISTINGS[direc] = (now, names)
+    return names
+
+
+def file_exists(path):
+    """Whether a path is an existing file, via its directory's listing.
+
+    Each directory is listed once and its listing reused for
+    ``DIR_LISTING_TTL`` seconds, which on network file systems is much
+    faster than checking each of its files individually.  Paths not in the
+    listing are checked individually, so that files created since their
+    directory was listed are found.  Files removed since are not noticed
+    until its listing expires, or ``clear_dir_listings`` is called.
+    """
+    direc, name = os.path.split(os.path.abspath(path))
+    names = _dir_listing(direc)
+    if names is not None and name in names:
+        return True
+    return os.path.isfile(path)
+
+
+def clear_dir_listings():
+    """Clear the directory listings cached by ``file_exists``."""
+    with _DIR_LISTINGS_LOCK:
+        _DIR_LISTINGS.clear()
+
+
+def expand_file_set(file_set):
+    """Expand a file set into the list of paths it refers to.
+
+    Parameters
+    ----------
+    file_set : str or sequence of str
+        Either a single path or glob-string, or a sequence of them, as
+        accepted by ``xr.open_mfdataset``
+
+    Returns
+    -------
+    list of str
+        Paths matched by any glob-strings, in sorted order, along with any
+        other paths given.  Paths are not checked for existence, although a
+        glob-string that matches no files is returned as is.
+    """
+    if isinstance(file_set, str):
+        file_set = [file_set]
+    paths = []
+    for path in file_set:
+        if glob.has_magic(path):
+            matched = sorted(glob.glob(path))
+            paths.extend(matched if matched else [path])
+        else:
+            paths.append(path)
+    return paths
+
+
+def file_set_nbytes(file_set):
+    """Total size on disk, in bytes, of the files within a file set.
+
+    Files that do not exist are counted as having zero size.
+    """
+    nbytes = 0
+    for path in expand_file_set(file_set):
+        try:
+            nbytes += os.path.getsize(path)
+        except OSError:
+            pass
+    return nbytes
+
+
+def file_var_nbytes(path):
+    """In-memory sizes, in bytes, of the variables stored in a netCDF file.
+
+    Only the file's metadata is read, not its data.
+    """
+    with xr.open_dataset(path, decode_times=False) as ds:
+        return {name: var.nbytes for name, var in ds.variables.items()}
+
+
+def _decode_attrs(attrs):
+    """Decode the attributes of a netCDF file as read by scipy."""
+    return {key: (value.decode('utf-8', 'replace')
+                  if isinstance(value, bytes) and key != '_FillValue'
+                  else value)
+            for key, value in attrs.items()}
+
+
+def _needs_decoding(var):
+    """Whether a variable's CF decoding is more than a copy of its data.
+
+    That of floats with no scale factor, offset, or fill value other than
+    NaN is not, unless they are e.g. times.
+    """
+    fill_value = var.attrs.get('_FillValue', np.nan)
+    return (var.dtype.kind != 'f' or
+            bool({'scale_factor', 'add_offset', 'missing_value'}.intersection(
+                var.attrs)) or not np.all(np.isnan(fill_value)))
+
+
+def open_dataset_mmap(path):
+    """Open a netCDF file of the classic format, memory-mapping its data.
+
+    Variables whose CF decoding would only copy their data, e.g. the float
+    results saved by aospy, are instead left as read-only views onto the
+    memory-mapped file, in its big-endian byte order.  So their data are
+    only read from disk as they are accessed, and are shared through the
+    operating system's page cache by all processes reading the file, rather
+    than copied into each.  All other variables are decoded as by
+    ``xarray.open_dataset``.
+
+    The file stays mapped for as long as any of these views exist; on
+    Windows, it cannot be replaced or deleted until then (see
+    ``release_memory_maps``).
+
+    Parameters
+    ----------
+    path : str
+        Path to a netCDF file in the classic or 64-bit offset format, e.g.
+        as written by ``Calc``
+
+    Returns
+    -------
+    xarray.Dataset
+
+    Raises
+    ------
+    TypeError
+        If the file is not of the classic or 64-bit offset format
+    """
+    nc = scipy.io.netcdf_file(path, mmap=True)
+    try:
+        raw = xr.Dataset(
+            {name: xr.Variable(var.dimensions, var.data,
+                               _decode_attrs(var._attributes))
+             for name, var in nc.variables.items()},
+            attrs=_decode_attrs(nc._attributes))
+    finally:
+        # Views onto the memory map keep it open until they are deleted;
+        # scipy warns that it cannot be closed until then.
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            nc.close()
+    ds = xr.decode_cf(raw)
+    for name, var in raw.variables.items():
+        decoded = ds.variables[name]
+        if (name not in ds.dims and decoded.dtype.kind == 'f' and
+                not _needs_decoding(var)):
+            decoded.data = var.data
+        # Encode the data as xarray.open_dataset would, e.g. when saved.
+        decoded.encoding.update(source=path, original_shape=var.shape,
+                                dtype=var.dtype.newbyteorder('='))
+    return ds
+
+
+def _is_memory_mapped(values):
+    """Whether a numpy array is a view onto a memory-mapped file."""
+    base = values
+    while isinstance(base, (np.ndarray, memoryview)):
+        base = base.base if isinstance(base, np.ndarray) else base.obj
+    return isinstance(base, mmap.mmap)
+
+
+def release_memory_maps(obj):
+    """Copy any data of an xarray object memory-mapped from a file into memory.
+
+    The data of each variable that is a view onto a memory-mapped file, e.g.
+    as opened by ``open_dataset_mmap``, is replaced, in place, by a writeable
+    copy in native byte order, so that the object no longer keeps the file
+    mapped.
+
+    Parameters
+    ----------
+    obj : xarray.Dataset or xarray.DataArray
+
+    Returns
+    -------
+    obj, with none of its data memory-mapped
+    """
+    if isinstance(obj, xr.DataArray):
+        variables = [obj.variable] + list(obj.coords.variables.values())
+    else:
+        variables = obj.variables.values()
+    for var in variables:
+        data = var._data
+        if isinstance(data, np.ndarray) and _is_memory_mapped(data):
+            var.data = data.astype(data.dtype.newbyteorder('='))
+    return obj
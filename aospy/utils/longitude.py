@@ -249,5 +249,124 @@ class Longitude(object):
         return Longitude(self.to_0360() - other.to_0360())
 
 
+def _like(template, values):
+    """Wrap values in a DataArray like template, or return them as is."""
+    if isinstance(template, xr.DataArray):
+        return xr.DataArray(values, coords=template.coords,
+                            dims=template.dims, name=template.name)
+    return values
+
+
+class LongitudeArray(object):
+    """Array of geographic longitudes, compared without looping in Python.
+
+    The vectorized counterpart of :py:class:`Longitude`: each longitude is
+    stored as its unsigned numerical value in the range 0 to 180, along
+    with whether it is in the Western Hemisphere, as two arrays.  The
+    comparison operators follow the same conventions as those of
+    ``Longitude``, element by element, and return arrays of booleans of the
+    same type (e.g. ``numpy.ndarray`` or ``xarray.DataArray``, with its
+    coordinates) as the values the LongitudeArray was created from.  They
+    accept another LongitudeArray, a Longitude, or anything that either can
+    be created from.
+
+    """
+    def __init__(self, values):
+        """
+        Parameters
+        ----------
+        values : {array-like, xarray.DataArray, Longitude, LongitudeArray}
+            Numerical values are converted to longitudes using the same
+            convention as ``Longitude``: 0-180 corresponds to the Eastern
+            Hemisphere, 180-360 to the Western Hemisphere, and so on.
+        """
+        if isinstance(values, LongitudeArray):
+            self._longitude = values._longitude
+            self._west = values._west
+            self._template = values._template
+            return
+        self._template = values if isinstance(values, xr.DataArray) else None
+        if not isinstance(values, (Longitude, np.ndarray, xr.DataArray)):
+            try:
+                values = np.asarray(values, dtype=float)
+            except (ValueError, TypeError):
+                values = Longitude(values)
+        if isinstance(values, Longitude):
+            self._longitude = np.float64(values.longitude)
+            self._west = np.bool_(values.hemisphere == 'W')
+        else:
+            # Computed on the underlying numpy array, which is much faster
+            # than on a DataArray for the small arrays of grid coordinates.
+            lon0360 = lon_to_0360(np.asarray(values))
+            self._west = lon0360 >= 180
+            self._longitude = np.abs(lon0360 - 360 * self._west)
+
+    @property
+    def longitude(self):
+        """The unsigned numerical values of the longitudes, from 0 to 180."""
+        return _like(self._template, self._longitude)
+
+    @property
+    def west(self):
+        """Whether each longitude is in the Western Hemisphere."""
+        return _like(self._template, self._west)
+
+    def __repr__(self):
+        return 'LongitudeArray({!r})'.format(self.to_pm180())
+
+    def _combine(self, other, func):
+        """Apply func to the longitudes and hemispheres of self and other.
+
+        The result is computed on numpy arrays and wrapped in a DataArray
+        only at the end, unless both are DataArrays, which must then be
+        aligned and broadcast against each other by xarray.
+        """
+        other = LongitudeArray(other)
+        if self._template is not None and other._template is not None:
+            return func(self.longitude, self.west, other.longitude,
+                        other.west)
+        result = func(self._longitude, self._west, other._longitude,
+                      other._west)
+        return _like(self._template if self._template is not None
+                     else other._template, result)
+
+    def __eq__(self, other):
+        return self._combine(other, lambda lon1, west1, lon2, west2: (
+            (west1 == west2) & (lon1 == lon2)))
+
+    def __ne__(self, other):
+        return ~(self == other)
+
+    def __lt__(self, other):
+        return self._combine(other, lambda lon1, west1, lon2, west2: (
+            (west1 & ~west2) | (west1 & west2 & (lon1 > lon2)) |
+            (~west1 & ~west2 & (lon1 < lon2))))
+
+    def __gt__(self, other):
+        return LongitudeArray(other) < self
+
+    def __le__(self, other):
+        return (self < other) | (self == other)
+
+    def __ge__(self, other):
+        return (self > other) | (self == other)
+
+    def to_0360(self):
+        """Convert longitudes to their numerical values within [0, 360]."""
+        return _like(self._template, self._longitude +
+                     self._west * (360 - 2 * self._longitude))
+
+    def to_pm180(self):
+        """Convert longitudes to their numerical values within [-180, 180]."""
+        return _like(self._template,
+                     self._longitude * (1 - 2 * self._west))
+
+    def __add__(self, other):
+        return LongitudeArray(self.to_0360() + LongitudeArray(other).to_0360())
+
+    def __sub__(self, other):
+        return LongitudeArray(self.to_0360() - LongitudeArray(other).to_0360())
+
+
 if __name__ == '__main__':
     pass
@@ -0,0 +1,231 @@
+"""Utility functions for instrumenting and profiling calculations."""
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+import pandas as pd
+import psutil
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows.
+    resource = None
+
+
+# The Recorder that stages are recorded to in each thread, if any.
+_ACTIVE = threading.local()
+
+
+def _read_bytes(process):
+    """Bytes read so far by the given process, or None if unavailable.
+
+    Where possible this counts all bytes read (including those served from
+    the page cache), rather than only those fetched from storage.
+    """
+    try:
+        counters = process.io_counters()
+    except (AttributeError, NotImplementedError, psutil.Error):
+        # ``io_counters`` is not available on e.g. macOS.
+        return None
+    return getattr(counters, 'read_chars', counters.read_bytes)
+
+
+def _peak_rss():
+    """Peak resident set size of this process in bytes, or None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, but in kilobytes elsewhere.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Recorder(object):
+    """Collects a record of each stage run while it is active.
+
+    Each record is a dict with the stage's name ('stage'), its start time in
+    seconds since the epoch ('start'), its wall time in seconds
+    ('duration'), the number of bytes read by the process while it ran
+    ('read_bytes'), the resident set size and peak resident set size of the
+    process in bytes at its end ('rss' and 'peak_rss'), how many stages it
+    is nested within ('depth'), and the process and thread it ran in ('pid'
+    and 'tid'), along with any extra information passed to ``stage``.
+
+    Read bytes and memory are measured for the process as a whole, so
+    include those of any other work running concurrently in it.
+    """
+    def __init__(self):
+        self.records = []
+        self._process = psutil.Process()
+        self._depth = 0
+
+
+@contextlib.contextmanager
+def recording(recorder):
+    """Record stages run by this thread to the given Recorder."""
+    previous = getattr(_ACTIVE, 'recorder', None)
+    _ACTIVE.recorder = recorder
+    try:
+        yield recorder
+    finally:
+        _ACTIVE.recorder = previous
+
+
+@contextlib.contextmanager
+def stage(name, **info):
+    """Record the wall time, bytes read, and memory use of a stage.
+
+    Nothing is recorded unless called within ``recording``.
+
+    Parameters
+    ----------
+    name : str
+        Name of the stage, e.g. 'load'
+    **info
+        Extra JSON-serializable information to include in the record, e.g.
+        the name of the variable being loaded
+    """
+    recorder = getattr(_ACTIVE, 'recorder', None)
+    if recorder is None:
+        yield
+        return
+    depth = recorder._depth
+    recorder._depth += 1
+    read_bytes_start = _read_bytes(recorder._process)
+    start = time.time()
+    timer_start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - timer_start
+        read_bytes_end = _read_bytes(recorder._process)
+        if read_bytes_start is None or read_bytes_end is None:
+            read_bytes = None
+        else:
+            read_bytes = read_bytes_end - read_bytes_start
+        recorder._depth = depth
+        record = dict(stage=name, start=start, duration=duration,
+                      read_bytes=read_bytes,
+                      rss=recorder._process.memory_info().rss,
+                      peak_rss=_peak_rss(), depth=depth, pid=os.getpid(),
+                      tid=threading.current_thread().ident)
+        record.update(info)
+        recorder.records.append(record)
+
+
+def _records_frame(records):
+    """Put stage records into a DataFrame, with numeric columns as floats."""
+    df = pd.DataFrame(list(records))
+    for column in ['duration', 'read_bytes', 'rss', 'peak_rss']:
+        if column in df:
+            df[column] = pd.to_numeric(df[column])
+    return df
+
+
+def summarize_stages(records):
+    """Summarize the wall time and bytes read of each stage.
+
+    Stages nest (e.g. 'read' within 'compute'), so totals across stages
+    overlap.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Indexed by stage name, with the number of times it was run, its
+        total, mean, median, 90th percentile, and maximum wall time in
+        seconds, and total bytes read, ordered from most to least total time.
+    """
+    df = _records_frame(records)
+    columns = ['count', 'total', 'mean', 'p50', 'p90', 'max', 'read_bytes']
+    if 'stage' not in df:
+        return pd.DataFrame(columns=columns)
+    grouped = df.groupby('stage')
+    durations = grouped['duration']
+    summary = pd.DataFrame(
+        {'count': durations.count(), 'total': durations.sum(),
+         'mean': durations.mean(), 'p50': durations.quantile(0.5),
+         'p90': durations.quantile(0.9), 'max': durations.max(),
+         'read_bytes': grouped['read_bytes'].sum()}, columns=columns)
+    return summary.sort_values('total', ascending=False)
+
+
+def slowest_calcs(records, n=10):
+    """The n Calcs with the longest 'compute' stages.
+
+    Records must have a 'calc' entry identifying their Calc.
+    """
+    df = _records_frame(records)
+    columns = ['calc', 'duration', 'read_bytes', 'peak_rss']
+    if 'calc' not in df or 'stage' not in df:
+        return pd.DataFrame(columns=columns)
+    computes = df[df['stage'] == 'compute']
+    return computes.nlargest(n, 'duration')[columns].reset_index(drop=True)
+
+
+def slowest_files(records, n=10):
+    """The n file sets that took the longest to open and read in total."""
+    df = _records_frame(records)
+    if 'files' not in df:
+        return pd.Series(name='duration')
+    df = df[df['stage'].isin(['open', 'read']) & df['files'].notnull()]
+    files = df['files'].map(
+        lambda files: files if isinstance(files, str) else ', '.join(files))
+    totals = df['duration'].groupby(files).sum()
+    return totals.nlargest(n).rename('duration')
+
+
+def cache_hit_rates(records):
+    """Fraction of runs of each stage that hit a cache.
+
+    Only stages whose records have a 'cache_hit' entry are included.
+    """
+    df = _records_frame(records)
+    if 'cache_hit' not in df:
+        return pd.Series(name='cache_hit_rate')
+    df = df[df['cache_hit'].notnull()]
+    hits = df['cache_hit'].astype(bool).groupby(df['stage'])
+    return hits.mean().rename('cache_hit_rate')
+
+
+def report(records, n=10):
+    """Create a plain-text report summarizing the given stage records."""
+    sections = [
+        ('Time per stage (seconds)', summarize_stages(records)),
+        ('Slowest Calcs', slowest_calcs(records, n)),
+        ('Slowest files (seconds opening and reading)',
+         slowest_files(records, n)),
+        ('Cache hit rates', cache_hit_rates(records)),
+    ]
+    lines = []
+    for title, table in sections:
+        lines.extend([title, '-' * len(title)])
+        lines.append(table.to_string() if len(table) else '(none)')
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def chrome_trace(records):
+    """Convert stage records to the Chrome trace event format.
+
+    The result can be viewed with e.g. chrome://tracing or Perfetto, with
+    one track per process and thread.
+    """
+    measures = {'stage', 'start', 'duration', 'pid', 'tid', 'depth'}
+    events = []
+    for record in records:
+        events.append(dict(
+            name=record['stage'], ph='X', ts=record['start'] * 1e6,
+            dur=record['duration'] * 1e6, pid=record['pid'],
+            tid=record['tid'],
+            args={key: value for key, value in record.items()
+                  if key not in measures}))
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def write_chrome_trace(records, path):
+    """Write stage records to a file in the Chrome trace event format."""
+    with open(path, 'w') as f:
+        json.dump(chrome_trace(records), f)
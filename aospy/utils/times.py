@@ -1,4 +1,5 @@
 """Utility functions for handling times, dates, etc."""
+from collections import OrderedDict
 import datetime
 import logging
 import re
@@ -12,9 +13,234 @@ import xarray as xr
 from ..internal_names import (
     BOUNDS_STR, RAW_END_DATE_STR, RAW_START_DATE_STR,
     SUBSET_END_DATE_STR, SUBSET_START_DATE_STR, TIME_BOUNDS_STR, TIME_STR,
-    TIME_WEIGHTS_STR
+    TIME_WEIGHTS_STR, YEAR_STR
 )
 
+# Name of the dimension of sums within each month of each year, whose values
+# are the number of months since the start of year 0.
+_YEAR_MONTH_STR = 'year_month'
+
+# Fields of a date, in the order taken by the constructors of dates.
+_DATE_FIELDS = ('year', 'month', 'day', 'hour', 'minute', 'second',
+                'microsecond')
+
+# Number of days in each month of calendars whose years are all of the same
+# length.
+_FIXED_CALENDAR_MONTH_DAYS = {
+    'noleap': [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31],
+    '365_day': [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31],
+    'all_leap': [31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31],
+    '366_day': [31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31],
+    '360_day': [30] * 12,
+}
+_MONTH_DAYS = np.array([_FIXED_CALENDAR_MONTH_DAYS['noleap'],
+                        _FIXED_CALENDAR_MONTH_DAYS['all_leap']])
+# Number of days before each month, in common and leap years.
+_DAYS_BEFORE_MONTH = np.concatenate(
+    [np.zeros((2, 1), dtype=int), np.cumsum(_MONTH_DAYS, axis=1)], axis=1)
+
+_MICROSECONDS_PER_DAY = 86400 * 10 ** 6
+_GREGORIAN_ORIGIN = np.datetime64('0001-01-01', 'D')
+# Dates in the standard calendar from 15 October 1582 on are in the Gregorian
+# calendar, and earlier ones in the Julian calendar.
+_GREGORIAN_REFORM_DAYS = (np.datetime64('1582-10-15', 'D') -
+                          _GREGORIAN_ORIGIN).astype(np.int64)
+
+
+def _date_fields(values, names=_DATE_FIELDS):
+    """The given fields, e.g. 'year' and 'month', of each of an array of dates.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Array of np.datetime64 or cftime.datetime objects
+    names : sequence of str
+        Names of the fields, from 'year', 'month', 'day', 'hour', 'minute',
+        'second', and 'microsecond'
+
+    Returns
+    -------
+    dict
+        Maps each name to an integer array of that field of each date, of
+        the same shape as ``values``
+    """
+    values = np.asarray(values)
+    flat = values.ravel()
+    if np.issubdtype(values.dtype, np.datetime64):
+        index = pd.DatetimeIndex(flat)
+        fields = {name: np.asarray(getattr(index, name), dtype=np.int64)
+                  for name in names}
+    else:
+        # Reading each field of each date once is much faster than e.g.
+        # xarray's ``dt`` accessor for arrays of cftime.datetime objects.
+        fields = {name: np.array([getattr(date, name) for date in flat],
+                                 dtype=np.int64) for name in names}
+    return {name: field.reshape(values.shape)
+            for name, field in fields.items()}
+
+
+def _time_field(time, name):
+    """The given field of each of a DataArray of times, e.g. its years.
+
+    Equivalent to e.g. ``time.dt.year``, but fast also for times of
+    non-standard calendars, i.e. of cftime.datetime objects.
+    """
+    return xr.DataArray(_date_fields(time.values, [name])[name],
+                        coords=time.coords, dims=time.dims, name=name)
+
+
+def _is_leap_year(year, calendar):
+    """Whether each given year is a leap year in the given calendar."""
+    if calendar == 'julian':
+        return year % 4 == 0
+    return (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+
+
+def _vectorized_calendar(calendar, fields):
+    """The calendar to do vectorized arithmetic on the given dates in.
+
+    Returns None for calendars and dates that arithmetic on arrays of
+    numbers is not implemented for, namely dates before year 1 in the
+    Julian and Gregorian calendars, and dates of the standard calendar
+    before the Gregorian reform.
+    """
+    if calendar in _FIXED_CALENDAR_MONTH_DAYS:
+        return calendar
+    if calendar not in ('julian', 'proleptic_gregorian', 'standard',
+                        'gregorian'):
+        return None
+    year = fields['year']
+    if year.size and year.min() < 1:
+        return None
+    if calendar in ('standard', 'gregorian'):
+        ordinal = _ordinal_days(year, fields['month'], fields['day'],
+                                'proleptic_gregorian')
+        if year.size and ordinal.min() < _GREGORIAN_REFORM_DAYS:
+            return None
+        return 'proleptic_gregorian'
+    return calendar
+
+
+def _days_in_month(year, month, calendar):
+    """Number of days in each given month of the given calendar."""
+    if calendar in _FIXED_CALENDAR_MONTH_DAYS:
+        return np.array(_FIXED_CALENDAR_MONTH_DAYS[calendar])[month - 1]
+    return _MONTH_DAYS[_is_leap_year(year, calendar).astype(int), month - 1]
+
+
+def _ordinal_days(year, month, day, calendar):
+    """Number of days since 1 January of year 1 of each given date.
+
+    Parameters
+    ----------
+    year, month, day : numpy.ndarray
+        Integer fields of the dates
+    calendar : str
+        A calendar supported by ``_vectorized_calendar``
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    if calendar in _FIXED_CALENDAR_MONTH_DAYS:
+        month_days = _FIXED_CALENDAR_MONTH_DAYS[calendar]
+        days_before_month = np.cumsum([0] + month_days)
+        return ((year - 1) * sum(month_days) + days_before_month[month - 1] +
+                day - 1)
+    if calendar == 'julian':
+        leap = _is_leap_year(year, calendar).astype(int)
+        return (365 * (year - 1) + (year - 1) // 4 +
+                _DAYS_BEFORE_MONTH[leap, month - 1] + day - 1)
+    # Numpy's datetimes are in the proleptic Gregorian calendar.
+    dates = ((year - 1970).astype('datetime64[Y]') +
+             (month - 1).astype('timedelta64[M]')).astype('datetime64[D]')
+    dates = dates + (day - 1).astype('timedelta64[D]')
+    return (dates - _GREGORIAN_ORIGIN).astype(np.int64)
+
+
+def _dates_from_ordinal_days(days, calendar):
+    """Year, month, and day of each of numbers of days since 1 January 1.
+
+    The inverse of ``_ordinal_days``.
+    """
+    if calendar in _FIXED_CALENDAR_MONTH_DAYS:
+        month_days = _FIXED_CALENDAR_MONTH_DAYS[calendar]
+        days_before_month = np.cumsum([0] + month_days)
+        year, day_of_year = np.divmod(days, sum(month_days))
+        month = np.searchsorted(days_before_month, day_of_year, side='right')
+        return (year + 1, month,
+                day_of_year - days_before_month[month - 1] + 1)
+    if calendar == 'julian':
+        cycles, day_of_cycle = np.divmod(days, 4 * 365 + 1)
+        year_of_cycle = np.minimum(day_of_cycle // 365, 3)
+        year = 4 * cycles + year_of_cycle + 1
+        day_of_year = day_of_cycle - 365 * year_of_cycle
+        leap = _is_leap_year(year, calendar).astype(int)
+        month = np.where(
+            leap, np.searchsorted(_DAYS_BEFORE_MONTH[1], day_of_year,
+                                  side='right'),
+            np.searchsorted(_DAYS_BEFORE_MONTH[0], day_of_year,
+                            side='right'))
+        return (year, month,
+                day_of_year - _DAYS_BEFORE_MONTH[leap, month - 1] + 1)
+    dates = _GREGORIAN_ORIGIN + days.astype('timedelta64[D]')
+    months = dates.astype('datetime64[M]')
+    year = months.astype('datetime64[Y]').astype(np.int64) + 1970
+    month = months.astype(np.int64) % 12 + 1
+    day = (dates - months.astype('datetime64[D]')).astype(np.int64) + 1
+    return year, month, day
+
+
+def _offset_cftimes(values, years=0, months=0, days=0, hours=0):
+    """Apply an offset to each of an array of cftime.datetime objects.
+
+    Offsets of years and months keep the day of the month, unless beyond
+    the end of the new month, in which case its last day is used, like
+    ``pandas.DateOffset``.  The arithmetic is done on arrays of numbers
+    rather than date by date, for calendars where this is implemented.
+    """
+    flat = np.asarray(values).ravel()
+    if not flat.size:
+        return np.asarray(values)
+    fields = _date_fields(flat)
+    calendar = _vectorized_calendar(flat[0].calendar, fields)
+    delta = datetime.timedelta(days=days, hours=hours)
+    if calendar is None:
+        result = []
+        for date in flat:
+            if years or months:
+                year, month = divmod(12 * (date.year + years) +
+                                     date.month - 1 + months, 12)
+                first = date.replace(year=year, month=month + 1, day=1)
+                date = first.replace(day=min(date.day, first.daysinmonth))
+            result.append(date + delta)
+    else:
+        year, month, day = fields['year'], fields['month'], fields['day']
+        if years or months:
+            year, month = np.divmod(12 * (year + years) + month - 1 + months,
+                                    12)
+            month += 1
+            day = np.minimum(day, _days_in_month(year, month, calendar))
+        time_of_day = (((fields['hour'] * 60 + fields['minute']) * 60 +
+                        fields['second']) * 10 ** 6 + fields['microsecond'])
+        offset = (delta.days * 86400 + delta.seconds) * 10 ** 6
+        microseconds = (_ordinal_days(year, month, day, calendar) *
+                        _MICROSECONDS_PER_DAY + time_of_day + offset)
+        ordinal, time_of_day = np.divmod(microseconds, _MICROSECONDS_PER_DAY)
+        year, month, day = _dates_from_ordinal_days(ordinal, calendar)
+        hour, time_of_day = np.divmod(time_of_day, 3600 * 10 ** 6)
+        minute, time_of_day = np.divmod(time_of_day, 60 * 10 ** 6)
+        second, microsecond = np.divmod(time_of_day, 10 ** 6)
+        # Replacing the fields of a date keeps its calendar.
+        replace = flat[0].replace
+        result = [
+            replace(year=y, month=mo, day=d, hour=h, minute=mi, second=sec,
+                    microsecond=us)
+            for y, mo, d, h, mi, sec, us in zip(
+                year.tolist(), month.tolist(), day.tolist(), hour.tolist(),
+                minute.tolist(), second.tolist(), microsecond.tolist())]
+    return np.array(result).reshape(np.shape(values))
+
 
 def apply_time_offset(time, years=0, months=0, days=0, hours=0):
     """Apply a specified offset to the given time array.
@@ -27,6 +253,10 @@ def apply_time_offset(time, years=0, months=0, days=0, hours=0):
     by month.  It is resolved by manually subtracting off those three hours,
     such that the dates span from 1 Jan 00:00 to 31 Dec 21:00 as desired.
 
+    Times of non-standard calendars, i.e. of cftime.datetime objects, are
+    offset in the same way, as arrays of numbers for the common CF
+    calendars.
+
     Parameters
     ----------
     time : xarray.DataArray representing a timeseries
@@ -36,7 +266,7 @@ def apply_time_offset(time, years=0, months=0, days=0, hours=0):
 
     Returns
     -------
-    pandas.DatetimeIndex
+    pandas.DatetimeIndex, or xarray.CFTimeIndex for cftime.datetime objects
 
     Examples
     --------
@@ -54,6 +284,12 @@ def apply_time_offset(time, years=0, months=0, days=0, hours=0):
     DatetimeIndex(['1900-01-01', '1899-02-01'], dtype='datetime64[ns]',
                   freq=None)
     """
+    values = np.asarray(time.values)
+    if values.dtype == object and values.size and isinstance(
+            values.flat[0], cftime.datetime):
+        offset = _offset_cftimes(values.ravel(), years=years, months=months,
+                                 days=days, hours=hours)
+        return xr.CFTimeIndex(offset)
     return (pd.to_datetime(time.values) +
             pd.tseries.offsets.DateOffset(years=years, months=months,
                                           days=days, hours=hours))
@@ -96,27 +332,126 @@ def average_time_bounds(ds):
     return new_times
 
 
-def monthly_mean_ts(arr):
+def _month_segments(year_month):
+    """Group times by month into contiguous segments.
+
+    Parameters
+    ----------
+    year_month : numpy.ndarray
+        The 'year_month' of each time, e.g. as returned by ``_group_keys``
+
+    Returns
+    -------
+    order : numpy.ndarray or None
+        The order in which to take the times so that those of each month
+        are contiguous, or None if they already are, in chronological order
+    starts : numpy.ndarray
+        The index, in that order, of the first time of each month
+    year_months : numpy.ndarray
+        The 'year_month' of each month, in increasing order
+    """
+    order = None
+    if (np.diff(year_month) < 0).any():
+        order = np.argsort(year_month, kind='mergesort')
+        year_month = year_month[order]
+    starts = np.flatnonzero(np.concatenate(
+        [[True], year_month[1:] != year_month[:-1]]))
+    return order, starts, year_month[starts]
+
+
+def _segment_sums(values, starts, axis):
+    """Sum each contiguous segment of an array along an axis, in float64.
+
+    Summing each segment in turn is faster than ``numpy.add.reduceat``
+    along any but the last axis, and gives the same results as summing the
+    groups of a ``groupby`` or ``resample``.
+    """
+    ends = np.append(starts[1:], values.shape[axis])
+    index = [slice(None)] * values.ndim
+    sums = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        index[axis] = slice(start, end)
+        sums.append(values[tuple(index)].sum(axis=axis, dtype=np.float64))
+    return np.stack(sums, axis=axis)
+
+
+def _month_end_times(year_months, like):
+    """The last day of each given month, of the same type as given times."""
+    year, month = np.divmod(year_months, 12)
+    if np.issubdtype(like.dtype, np.datetime64):
+        months = ((year - 1970).astype('datetime64[Y]') +
+                  month.astype('timedelta64[M]'))
+        ends = (months + 1).astype('datetime64[D]') - np.timedelta64(1, 'D')
+        return ends.astype(like.dtype)
+    first = like.flat[0].replace(day=1, hour=0, minute=0, second=0,
+                                 microsecond=0)
+    ends = []
+    for y, m in zip(year.tolist(), (month + 1).tolist()):
+        start = first.replace(year=y, month=m)
+        ends.append(start.replace(day=start.daysinmonth))
+    return np.array(ends)
+
+
+def monthly_mean_ts(arr, dt=None):
     """Convert a sub-monthly time-series into one of monthly means.
 
-    Also drops any months with no data in the original DataArray.
+    Also drops any months with no data in the original DataArray.  Supports
+    times of any calendar, and loads the data into memory.
 
     Parameters
     ----------
     arr : xarray.DataArray
         Timeseries of sub-monthly temporal resolution data
+    dt : xarray.DataArray, optional
+        Duration of each timestep, by which to weight the means.  By
+        default, each time is weighted equally.
 
     Returns
     -------
     xarray.DataArray
-        Array resampled to comprise monthly means
+        Array resampled to comprise monthly means, labeled by the last day
+        of each month
 
     See Also
     --------
     monthly_mean_at_each_ind : Copy monthly means to each submonthly time
 
     """
-    return arr.resample(**{TIME_STR: '1M'}).mean(TIME_STR).dropna(TIME_STR)
+    time = arr[TIME_STR]
+    axis = arr.get_axis_num(TIME_STR)
+    order, starts, year_months = _month_segments(
+        _group_keys(time, _YEAR_MONTH_STR).values)
+    values = np.asarray(arr.values)
+    if dt is None:
+        weights = np.ones(time.size)
+    else:
+        assert_matching_time_coord(arr, dt)
+        weights = np.asarray(dt.values, dtype=np.float64)
+    if order is not None:
+        values = values.take(order, axis=axis)
+        weights = weights[order]
+    shape = [1] * values.ndim
+    shape[axis] = -1
+    weights = weights.reshape(shape)
+    if dt is not None:
+        values = values * weights
+    valid = ~np.isnan(values)
+    if valid.all():
+        total_weights = _segment_sums(weights, starts, axis)
+    else:
+        values = np.where(valid, values, 0)
+        total_weights = _segment_sums(np.where(valid, weights, 0), starts,
+                                      axis)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = _segment_sums(values, starts, axis) / total_weights
+    if arr.dtype == np.float32:
+        means = means.astype(np.float32)
+
+    coords = OrderedDict((name, coord) for name, coord in arr.coords.items()
+                         if TIME_STR not in coord.dims)
+    coords[TIME_STR] = _month_end_times(year_months, np.asarray(time.values))
+    result = xr.DataArray(means, dims=arr.dims, coords=coords, name=arr.name)
+    return result.dropna(TIME_STR)
 
 
 def monthly_mean_at_each_ind(monthly_means, sub_monthly_timeseries):
@@ -125,25 +460,36 @@ def monthly_mean_at_each_ind(monthly_means, sub_monthly_timeseries):
     Parameters
     ----------
     monthly_means : xarray.DataArray
-        array of monthly means
+        array of monthly means, with one time in each month, e.g. as returned
+        by ``monthly_mean_ts``
     sub_monthly_timeseries : xarray.DataArray
         array of a timeseries at sub-monthly time resolution
 
     Returns
     -------
     xarray.DataArray with eath monthly mean value from `monthly_means` repeated
-    at each time within that month from `sub_monthly_timeseries`
+    at each time within that month from `sub_monthly_timeseries`, or NaN at
+    times in months without a mean
 
     See Also
     --------
     monthly_mean_ts : Create timeseries of monthly mean values
     """
-    time = monthly_means[TIME_STR]
-    start = time.indexes[TIME_STR][0].replace(day=1, hour=0)
-    end = time.indexes[TIME_STR][-1]
-    new_indices = pd.DatetimeIndex(start=start, end=end, freq='MS')
-    arr_new = monthly_means.reindex(time=new_indices, method='backfill')
-    return arr_new.reindex_like(sub_monthly_timeseries, method='pad')
+    order, starts, year_months = _month_segments(
+        _group_keys(monthly_means[TIME_STR], _YEAR_MONTH_STR).values)
+    if order is None:
+        order = np.arange(monthly_means[TIME_STR].size)
+    year_month = _group_keys(sub_monthly_timeseries[TIME_STR],
+                             _YEAR_MONTH_STR).values
+    inds = np.searchsorted(year_months, year_month).clip(
+        max=year_months.size - 1)
+    found = year_months[inds] == year_month
+    result = _without_time_coords(monthly_means).isel(
+        **{TIME_STR: order[starts[inds]]})
+    if not found.all():
+        result = result.where(xr.DataArray(found, dims=[TIME_STR]))
+    return result.assign_coords(
+        **{TIME_STR: sub_monthly_timeseries[TIME_STR].variable})
 
 
 def yearly_average(arr, dt):
@@ -169,11 +515,146 @@ def yearly_average(arr, dt):
 
     """
     assert_matching_time_coord(arr, dt)
-    yr_str = TIME_STR + '.year'
+    year = _group_keys(arr[TIME_STR], YEAR_STR)
+    arr, dt = _without_time_coords(arr), _without_time_coords(dt)
+    # Keep float32 data in float32, rather than promoting it to the dtype of
+    # the weights; the sums are accumulated in float64 regardless.
+    if arr.dtype == np.float32:
+        dt = dt.astype(np.float32)
     # Retain original data's mask.
     dt = dt.where(np.isfinite(arr))
-    return ((arr*dt).groupby(yr_str).sum(TIME_STR) /
-            dt.groupby(yr_str).sum(TIME_STR))
+    return ((arr*dt).groupby(year).sum(TIME_STR, dtype=np.float64) /
+            dt.groupby(year).sum(TIME_STR, dtype=np.float64))
+
+
+def _year_month(time):
+    """Number of months since the start of year 0 of each time."""
+    return xr.DataArray(_group_keys(time, _YEAR_MONTH_STR).values,
+                        coords=time.coords, dims=time.dims,
+                        name=_YEAR_MONTH_STR)
+
+
+def _group_keys(time, name):
+    """Year, or 'year_month', of each time, to group a time-series by.
+
+    Unlike ``_time_field`` and ``_year_month``, the result has no time
+    coordinates, for grouping DataArrays stripped of them by
+    ``_without_time_coords``.
+    """
+    if name == _YEAR_MONTH_STR:
+        fields = _date_fields(time.values, [YEAR_STR, 'month'])
+        keys = 12 * fields[YEAR_STR] + fields['month'] - 1
+    else:
+        keys = _date_fields(time.values, [name])[name]
+    return xr.DataArray(keys, dims=time.dims, name=name)
+
+
+def _without_time_coords(arr):
+    """Drop the coordinates along time of a DataArray.
+
+    Times of cftime.datetime objects are validated one by one whenever
+    xarray builds an index from them, i.e. in every copy of and arithmetic
+    on a DataArray indexed by them, so reductions over time are much faster
+    without them.
+    """
+    return arr.drop([name for name, coord in arr.coords.items()
+                     if TIME_STR in coord.dims])
+
+
+def monthly_sums(arr, dt):
+    """Sum a sub-yearly time-series and its weights within each month.
+
+    Together with ``yearly_average_from_monthly_sums``, this computes the
+    same yearly averages as ``yearly_average``, but for any number of sets
+    of months of the year from a single pass over the time-series.
+
+    Parameters
+    ----------
+    arr : xarray.DataArray
+        The array to be summed
+    dt : xarray.DataArray
+        Array of the duration of each timestep
+
+    Returns
+    -------
+    sums, weights : xarray.DataArray
+        The sums of ``arr`` weighted by ``dt``, and of ``dt`` itself where
+        ``arr`` is valid, within each month of each year in which ``arr`` has
+        data.  The time dimension is replaced by a 'year_month' dimension.
+
+    See also
+    --------
+    yearly_average_from_monthly_sums
+    """
+    assert_matching_time_coord(arr, dt)
+    if arr.dtype == np.float32:
+        dt = dt.astype(np.float32)
+    year_month = _group_keys(arr[TIME_STR], _YEAR_MONTH_STR)
+    arr, dt = _without_time_coords(arr), _without_time_coords(dt)
+    dt = dt.where(np.isfinite(arr))
+    return ((arr*dt).groupby(year_month).sum(TIME_STR, dtype=np.float64),
+            dt.groupby(year_month).sum(TIME_STR, dtype=np.float64))
+
+
+def year_months_within(time, start_date, end_date):
+    """Months of the given times that lie wholly within a date range.
+
+    Parameters
+    ----------
+    time : xarray.DataArray
+        Times of a time-series, indexed by themselves
+    start_date, end_date : datetime-like object or str
+        The (inclusive) date range, as passed to ``sel_time``
+
+    Returns
+    -------
+    numpy.ndarray or None
+        The 'year_month' values, as in the result of ``monthly_sums``, of
+        the months of ``time`` within the date range, or None if the range
+        includes only some of the times within any month, in which case
+        averages over the range cannot be derived from monthly sums.
+    """
+    year_month = _year_month(time)
+    in_range = year_month.sel(**{TIME_STR: slice(start_date, end_date)})
+    within = np.unique(in_range.values)
+    if np.isin(year_month.values, within).sum() != in_range.size:
+        return None
+    return within
+
+
+def yearly_average_from_monthly_sums(sums, weights, months,
+                                     year_months=None):
+    """Average over the given months of each year from monthly sums.
+
+    Parameters
+    ----------
+    sums, weights : xarray.DataArray
+        Monthly sums of a time-series and its weights, as returned by
+        ``monthly_sums``
+    months : sequence of int
+        The months of the year to average over, e.g. as returned by
+        ``month_indices``
+    year_months : array-like, optional
+        If given, only average over these months of the sums, e.g. as
+        returned by ``year_months_within``
+
+    Returns
+    -------
+    xarray.DataArray
+        As returned by ``yearly_average`` for the time-series restricted to
+        the given months, i.e. with one value for each year with data in any
+        of those months
+    """
+    if year_months is not None:
+        sums = sums.sel(**{_YEAR_MONTH_STR: year_months})
+        weights = weights.sel(**{_YEAR_MONTH_STR: year_months})
+    year_month = sums[_YEAR_MONTH_STR]
+    in_months = np.isin(year_month.values % 12 + 1, months)
+    sums = sums.isel(**{_YEAR_MONTH_STR: in_months})
+    weights = weights.isel(**{_YEAR_MONTH_STR: in_months})
+    year = (sums[_YEAR_MONTH_STR] // 12).rename(YEAR_STR)
+    return (sums.groupby(year).sum(_YEAR_MONTH_STR) /
+            weights.groupby(year).sum(_YEAR_MONTH_STR))
 
 
 def ensure_datetime(obj):
@@ -284,10 +765,7 @@ def _month_conditional(time, months):
         months_array = month_indices(months)
     else:
         months_array = months
-    cond = False
-    for month in months_array:
-        cond |= (time['{}.month'.format(TIME_STR)] == month)
-    return cond
+    return _time_field(time, 'month').isin(months_array)
 
 
 def extract_months(time, months):
@@ -137,10 +137,16 @@ def dp_from_ps(bk, pk, ps, pfull_coord):
 
 
 def integrate(arr, ddim, dim=False, is_pressure=False):
-    """Integrate along the given dimension."""
+    """Integrate along the given dimension.
+
+    float32 data is kept in float32, rather than being promoted to the dtype
+    of ``ddim``, but the sum is accumulated in float64.
+    """
     if is_pressure:
         dim = vert_coord_name(ddim)
-    return (arr*ddim).sum(dim=dim)
+    if arr.dtype == np.float32:
+        ddim = ddim.astype(np.float32)
+    return (arr*ddim).sum(dim=dim, dtype=np.float64)
 
 
 def get_dim_name(arr, names):
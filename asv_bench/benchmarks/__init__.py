@@ -0,0 +1,64 @@
+"""Benchmarks of aospy's core operations, run with airspeed velocity (asv).
+
+From the ``asv_bench`` directory, run e.g. ``asv continuous HEAD~1 HEAD``
+to compare the current commit against its parent, or
+``asv run --python=same --quick`` for a quick check in the current
+environment.  The benchmarks run on synthetic data generated on the fly, so
+their results are comparable across commits and machines.
+
+Benchmarks of features that the commit being benchmarked lacks are skipped:
+those of newer modules or functions guard their imports, and raise
+NotImplementedError in ``setup``, asv's convention for skipping a
+benchmark, if these failed; those of newer arguments check for them with
+``require_args``.
+"""
+import inspect
+
+import numpy as np
+import xarray as xr
+
+from aospy.data_loader import _prep_time_data, grid_attrs_to_aospy_names
+from aospy.internal_names import (LAT_STR, LAT_BOUNDS_STR, LON_STR,
+                                  LON_BOUNDS_STR)
+
+from .synthetic import synthetic_dataset
+
+# Resolutions, as (number of latitudes, number of longitudes), at which
+# benchmarks are run: roughly 2.8 and 1 degree grids.
+RESOLUTIONS = [(64, 128), (180, 360)]
+
+
+def require_args(func, *names):
+    """Skip the benchmark if func does not take the named arguments.
+
+    Raises
+    ------
+    NotImplementedError
+        If any of the arguments are missing, i.e. the commit being
+        benchmarked predates them
+    """
+    params = inspect.signature(func).parameters
+    missing = [name for name in names if name not in params]
+    if missing:
+        raise NotImplementedError('{0} takes no arguments {1}'.format(
+            func.__qualname__, missing))
+
+
+def prepared_dataset(*args, **kwargs):
+    """Create a synthetic Dataset, prepared as aospy does when loading it.
+
+    Takes the same arguments as ``synthetic_dataset``, and returns the
+    Dataset with aospy's internal names and times decoded, as used
+    downstream of ``DataLoader.load_variable``.
+    """
+    ds = grid_attrs_to_aospy_names(synthetic_dataset(*args, **kwargs))
+    return _prep_time_data(ds)
+
+
+def sfc_area(ds):
+    """Approximate surface area of each cell of a Dataset's grid."""
+    dlon = np.deg2rad(np.diff(ds[LON_BOUNDS_STR].values))
+    dsinlat = np.diff(np.sin(np.deg2rad(ds[LAT_BOUNDS_STR].values)))
+    area = np.outer(dsinlat, dlon) * 6.371e6 ** 2
+    return xr.DataArray(area, dims=[LAT_STR, LON_STR],
+                        coords={LAT_STR: ds[LAT_STR], LON_STR: ds[LON_STR]})
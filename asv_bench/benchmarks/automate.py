@@ -0,0 +1,43 @@
+"""Benchmarks of creating Calcs from a CalcSuite."""
+import sys
+
+from aospy import Model, Proj, Region, Run, Var
+from aospy.automate import CalcSuite
+from aospy.data_loader import DictDataLoader
+
+# CalcSuites look up objects by name in a library of them, i.e. a module
+# with lists of projects, variables, and regions; this module serves as
+# that library.
+run = Run(name='synthetic_run',
+          data_loader=DictDataLoader({'monthly': 'synthetic.nc'}))
+model = Model(name='synthetic_model', runs=[run])
+proj = Proj('synthetic_proj', direc_out='.', models=[model])
+projects = [proj]
+variables = [Var(name='var{}'.format(i), def_time=True) for i in range(100)]
+regions = [Region(name='globe', west_bound=0, east_bound=360,
+                  south_bound=-90, north_bound=90, do_land_mask=False)]
+
+
+class CreateCalcs(object):
+    """Create 100 variables x 10 date ranges x 10 output intervals."""
+    def setup(self):
+        self.calc_suite = CalcSuite(dict(
+            library=sys.modules[__name__],
+            projects=[proj],
+            models=[model],
+            runs=[run],
+            variables=variables,
+            regions=regions,
+            date_ranges=[('{:04d}'.format(year), '{:04d}'.format(year + 9))
+                         for year in range(1, 101, 10)],
+            output_time_intervals=['ann'] + list(range(1, 10)),
+            output_time_regional_reductions=['av', 'reg.av'],
+            output_vertical_reductions=[None],
+            input_time_intervals=['monthly'],
+            input_time_datatypes=['ts'],
+            input_time_offsets=[None],
+            input_vertical_datatypes=[False],
+        ))
+
+    def time_create_calcs(self):
+        self.calc_suite.create_calcs()
@@ -0,0 +1,198 @@
+"""Benchmarks of computing and saving Calcs."""
+import shutil
+import tempfile
+
+from cftime import DatetimeNoLeap
+
+from aospy import Model, Proj, Region, Run, Var
+from aospy.automate import _exec_calcs
+from aospy.calc import Calc
+from aospy.data_loader import DictDataLoader
+
+from . import RESOLUTIONS, prepared_dataset, require_args
+from .synthetic import write_file_map
+
+_N_YEARS = 5
+_DTYPES_OUT_TIME = ['av', 'std', 'ts', 'reg.av', 'reg.ts']
+_REGIONS = [
+    Region(name='globe', west_bound=0, east_bound=360, south_bound=-90,
+           north_bound=90, do_land_mask=False),
+    Region(name='wraparound', west_bound=340, east_bound=40, south_bound=10,
+           north_bound=20, do_land_mask=False),
+]
+
+
+def _make_calcs(direc, resolution, intvls_out, date_ranges=None):
+    """Create a Calc of synthetic data for each output interval and date
+    range, writing their input data to direc."""
+    if date_ranges is None:
+        date_ranges = [(DatetimeNoLeap(1, 1, 1),
+                        DatetimeNoLeap(_N_YEARS, 12, 31))]
+    n_lat, n_lon = resolution
+    file_map = write_file_map(direc, n_lat=n_lat, n_lon=n_lon,
+                              n_years=_N_YEARS)
+    run = Run(name='synthetic_run', data_loader=DictDataLoader(file_map))
+    model = Model(name='synthetic_model',
+                  grid_file_paths=file_map['monthly'][:1], runs=[run])
+    proj = Proj('synthetic_proj', direc_out=direc, models=[model])
+    var = Var(name='precip', def_time=True)
+    return [Calc(proj=proj, model=model, run=run, var=var,
+                 date_range=date_range, region=_REGIONS, intvl_in='monthly',
+                 intvl_out=intvl_out, dtype_in_time='ts', dtype_in_vert=None,
+                 dtype_out_time=_DTYPES_OUT_TIME, dtype_out_vert=None)
+            for date_range in date_ranges for intvl_out in intvls_out]
+
+
+def _make_calc(direc, resolution):
+    """Create an annual-mean Calc of synthetic data, writing its input data
+    to direc."""
+    return _make_calcs(direc, resolution, ['ann'])[0]
+
+
+class Compute(object):
+    params = [RESOLUTIONS]
+    param_names = ['resolution']
+
+    def setup(self, resolution):
+        self.direc = tempfile.mkdtemp()
+        self.calc = _make_calc(self.direc, resolution)
+
+    def teardown(self, resolution):
+        shutil.rmtree(self.direc)
+
+    def time_compute(self, resolution):
+        self.calc.compute(write_to_tar=False)
+
+
+class SaveFiles(object):
+    params = [RESOLUTIONS, _DTYPES_OUT_TIME]
+    param_names = ['resolution', 'dtype_out_time']
+
+    def setup(self, resolution, dtype_out_time):
+        self.direc = tempfile.mkdtemp()
+        self.calc = _make_calc(self.direc, resolution)
+        self.calc.compute(write_to_tar=False)
+
+    def teardown(self, resolution, dtype_out_time):
+        shutil.rmtree(self.direc)
+
+    def time_save_files(self, resolution, dtype_out_time):
+        self.calc._save_files(self.calc.data_out[dtype_out_time],
+                              dtype_out_time)
+
+
+class LoadResults(object):
+    """Load a Calc's saved results, and take a mean over them."""
+    params = [RESOLUTIONS, ['av', 'ts'], [False, True]]
+    param_names = ['resolution', 'dtype_out_time', 'mmap']
+
+    def setup(self, resolution, dtype_out_time, mmap):
+        # Only pass the newer arguments when they are used, so that the
+        # default is benchmarked on commits predating them too.
+        self.kwargs = dict(mmap=True) if mmap else {}
+        require_args(Calc.load, *self.kwargs)
+        self.direc = tempfile.mkdtemp()
+        self.calc = _make_calc(self.direc, resolution)
+        self.calc.compute(write_to_tar=False)
+
+    def teardown(self, resolution, dtype_out_time, mmap):
+        shutil.rmtree(self.direc)
+
+    def time_load(self, resolution, dtype_out_time, mmap):
+        self.calc.data_out.pop(dtype_out_time, None)
+        self.calc.load(dtype_out_time, **self.kwargs).mean().values
+
+
+class ComputeIntervals(object):
+    """Compute the annual, seasonal, and monthly means of a variable."""
+    params = [RESOLUTIONS, [False, True]]
+    param_names = ['resolution', 'share_loads']
+
+    def setup(self, resolution, share_loads):
+        self.kwargs = dict(share_loads=True) if share_loads else {}
+        require_args(_exec_calcs, *self.kwargs)
+        self.direc = tempfile.mkdtemp()
+        self.calcs = _make_calcs(self.direc, resolution,
+                                 ['ann', 'djf', 'mam', 'jja', 'son'] +
+                                 list(range(1, 13)))
+
+    def teardown(self, resolution, share_loads):
+        shutil.rmtree(self.direc)
+
+    def time_exec_calcs(self, resolution, share_loads):
+        _exec_calcs(self.calcs, write_to_tar=False, **self.kwargs)
+
+
+class ComputeRollingDateRanges(object):
+    """Compute the annual means of a variable over rolling 2-year windows."""
+    params = [RESOLUTIONS, [False, True]]
+    param_names = ['resolution', 'merge_date_ranges']
+
+    def setup(self, resolution, merge_date_ranges):
+        self.kwargs = dict(share_loads=True)
+        if merge_date_ranges:
+            self.kwargs['merge_date_ranges'] = True
+        require_args(_exec_calcs, *self.kwargs)
+        self.direc = tempfile.mkdtemp()
+        date_ranges = [(DatetimeNoLeap(year, 1, 1),
+                        DatetimeNoLeap(year + 1, 12, 31))
+                       for year in range(1, _N_YEARS)]
+        self.calcs = _make_calcs(self.direc, resolution, ['ann'],
+                                 date_ranges)
+
+    def teardown(self, resolution, merge_date_ranges):
+        shutil.rmtree(self.direc)
+
+    def time_exec_calcs(self, resolution, merge_date_ranges):
+        _exec_calcs(self.calcs, write_to_tar=False, **self.kwargs)
+
+
+class ComputeEnsemble(object):
+    """Compute the same Calc for each of an ensemble of 10 Runs."""
+    params = [RESOLUTIONS, [False, True]]
+    param_names = ['resolution', 'ensemble']
+
+    def setup(self, resolution, ensemble):
+        self.kwargs = dict(ensemble=True) if ensemble else {}
+        require_args(_exec_calcs, *self.kwargs)
+        self.direc = tempfile.mkdtemp()
+        calc = _make_calc(self.direc, resolution)
+        runs = [Run(name='member{}'.format(i),
+                    data_loader=calc.run.data_loader) for i in range(10)]
+        model = Model(name='synthetic_model',
+                      grid_file_paths=calc.model.grid_file_paths, runs=runs)
+        self.calcs = [
+            Calc(proj=calc.proj, model=model, run=run, var=calc.var,
+                 date_range=(calc.start_date, calc.end_date),
+                 region=calc.region, intvl_in=calc.intvl_in,
+                 intvl_out=calc.intvl_out, dtype_in_time=calc.dtype_in_time,
+                 dtype_in_vert=calc.dtype_in_vert,
+                 dtype_out_time=calc.dtype_out_time,
+                 dtype_out_vert=calc.dtype_out_vert)
+            for run in runs]
+
+    def teardown(self, resolution, ensemble):
+        shutil.rmtree(self.direc)
+
+    def time_exec_calcs(self, resolution, ensemble):
+        _exec_calcs(self.calcs, write_to_tar=False, **self.kwargs)
+
+
+class AddGridAttributes(object):
+    """Add the Model's grid attributes to a lazily loaded Dataset."""
+    params = [RESOLUTIONS]
+    param_names = ['resolution']
+
+    def setup(self, resolution):
+        self.direc = tempfile.mkdtemp()
+        self.calc = _make_calc(self.direc, resolution)
+        self.calc.model.set_grid_data()
+        n_lat, n_lon = resolution
+        self.ds = prepared_dataset(n_lat=n_lat, n_lon=n_lon,
+                                   n_years=_N_YEARS).chunk()
+
+    def teardown(self, resolution):
+        shutil.rmtree(self.direc)
+
+    def time_add_grid_attributes(self, resolution):
+        self.calc._add_grid_attributes(self.ds)
@@ -0,0 +1,158 @@
+"""Benchmarks of loading data via DataLoaders."""
+import shutil
+import tempfile
+
+from cftime import DatetimeNoLeap
+
+from aospy import Var
+from aospy.data_loader import DictDataLoader
+
+from . import RESOLUTIONS
+from .synthetic import write_file_map, write_gfdl_tree
+
+
+class LoadVariable(object):
+    params = [RESOLUTIONS, [1, 10], ['dict', 'gfdl']]
+    param_names = ['resolution', 'n_years', 'data_loader']
+
+    def setup(self, resolution, n_years, data_loader):
+        self.direc = tempfile.mkdtemp()
+        n_lat, n_lon = resolution
+        if data_loader == 'dict':
+            self.data_loader = DictDataLoader(write_file_map(
+                self.direc, n_lat=n_lat, n_lon=n_lon, n_years=n_years))
+        else:
+            self.data_loader = write_gfdl_tree(
+                self.direc, n_lat=n_lat, n_lon=n_lon, n_years=n_years)
+        self.var = Var(name='precip', def_time=True)
+        self.start_date = DatetimeNoLeap(1, 1, 1)
+        self.end_date = DatetimeNoLeap(n_years, 12, 31)
+
+    def teardown(self, resolution, n_years, data_loader):
+        shutil.rmtree(self.direc)
+
+    def time_load_variable(self, resolution, n_years, data_loader):
+        self.data_loader.load_variable(
+            self.var, self.start_date, self.end_date, domain='atmos',
+            intvl_in='monthly', dtype_in_vert=None, dtype_in_time='ts',
+            intvl_out='ann')
+
+
+class LoadVariableFromManyVariables(object):
+    """Load one variable from files containing many variables."""
+    params = [[1, 100]]
+    param_names = ['n_vars']
+
+    def setup(self, n_vars):
+        self.direc = tempfile.mkdtemp()
+        var_names = ['var{}'.format(i) for i in range(n_vars)]
+        self.data_loader = DictDataLoader(write_file_map(
+            self.direc, var_names, n_lat=16, n_lon=32, years_per_file=1,
+            n_years=10))
+        self.var = Var(name='var0', def_time=True)
+        self.start_date = DatetimeNoLeap(1, 1, 1)
+        self.end_date = DatetimeNoLeap(10, 12, 31)
+
+    def teardown(self, n_vars):
+        shutil.rmtree(self.direc)
+
+    def time_load_variable(self, n_vars):
+        self.data_loader.load_variable(self.var, self.start_date,
+                                       self.end_date, intvl_in='monthly')
+
+
+class LoadVariables(object):
+    """Load several variables stored in the same files."""
+    params = [[1, 30], ['separately', 'together']]
+    param_names = ['n_vars', 'method']
+
+    def setup(self, n_vars, method):
+        if method == 'together' and not hasattr(DictDataLoader,
+                                                'load_variables'):
+            raise NotImplementedError('DataLoader.load_variables is not '
+                                      'available')
+        self.direc = tempfile.mkdtemp()
+        var_names = ['var{}'.format(i) for i in range(n_vars)]
+        self.data_loader = DictDataLoader(write_file_map(
+            self.direc, var_names, n_lat=16, n_lon=32, years_per_file=1,
+            n_years=10))
+        self.variables = [Var(name=name, def_time=True)
+                          for name in var_names]
+        self.kwargs = dict(start_date=DatetimeNoLeap(1, 1, 1),
+                           end_date=DatetimeNoLeap(10, 12, 31),
+                           intvl_in='monthly')
+
+    def teardown(self, n_vars, method):
+        shutil.rmtree(self.direc)
+
+    def time_load_variables(self, n_vars, method):
+        if method == 'together':
+            self.data_loader.load_variables(self.variables, **self.kwargs)
+        else:
+            for var in self.variables:
+                self.data_loader.load_variable(var, **self.kwargs)
+
+
+class GenerateFileSet(object):
+    """Locate the files of many variables following GFDL conventions."""
+    def setup(self):
+        self.direc = tempfile.mkdtemp()
+        var_names = ['var{}'.format(i) for i in range(100)]
+        self.data_loader = write_gfdl_tree(self.direc, var_names, n_lat=2,
+                                           n_lon=4, n_years=10)
+        self.variables = [Var(name=name, alt_names=('alt_' + name,),
+                              def_time=True) for name in var_names]
+
+    def teardown(self):
+        shutil.rmtree(self.direc)
+
+    def time_generate_file_set(self):
+        for _ in range(10):
+            for var in self.variables:
+                self.data_loader._generate_file_set(
+                    var, DatetimeNoLeap(1, 1, 1), DatetimeNoLeap(10, 12, 31),
+                    domain='atmos', intvl_in='monthly', dtype_in_vert=None,
+                    dtype_in_time='ts', intvl_out='ann')
+
+
+class LoadVariableRepeatedly(object):
+    """Load variables sharing the same sub-daily, non-standard times."""
+    params = [['noleap', 'julian']]
+    param_names = ['calendar']
+
+    def setup(self, calendar):
+        self.direc = tempfile.mkdtemp()
+        self.data_loader = DictDataLoader(write_file_map(
+            self.direc, ['precip', 'evap'], intvl_in='3hr', n_lat=2,
+            n_lon=4, years_per_file=5, n_years=20, calendar=calendar))
+        self.variables = [Var(name=name, def_time=True)
+                          for name in ['precip', 'evap'] * 5]
+        self.kwargs = dict(start_date=DatetimeNoLeap(1, 1, 1),
+                           end_date=DatetimeNoLeap(20, 12, 31),
+                           intvl_in='3hr')
+
+    def teardown(self, calendar):
+        shutil.rmtree(self.direc)
+
+    def time_load_variable(self, calendar):
+        for var in self.variables:
+            self.data_loader.load_variable(var, **self.kwargs)
+
+
+class LoadVariableFromManyFiles(object):
+    """Load each year of a variable stored in many small files."""
+    def setup(self):
+        self.direc = tempfile.mkdtemp()
+        self.data_loader = DictDataLoader(write_file_map(
+            self.direc, ['precip', 'evap', 'temp'], n_lat=2, n_lon=4,
+            years_per_file=1, n_years=50))
+        self.var = Var(name='precip', def_time=True)
+
+    def teardown(self):
+        shutil.rmtree(self.direc)
+
+    def time_load_variable(self):
+        for year in range(1, 51, 10):
+            self.data_loader.load_variable(
+                self.var, DatetimeNoLeap(year, 1, 1),
+                DatetimeNoLeap(year + 9, 12, 31), intvl_in='monthly')
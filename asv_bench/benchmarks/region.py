@@ -0,0 +1,47 @@
+"""Benchmarks of regional averaging."""
+from aospy import Region
+from aospy.internal_names import SFC_AREA_STR, TIME_WEIGHTS_STR
+from aospy.utils import times
+
+from . import RESOLUTIONS, prepared_dataset, sfc_area
+
+_REGIONS = {
+    'globe': Region(name='globe', west_bound=0, east_bound=360,
+                    south_bound=-90, north_bound=90, do_land_mask=False),
+    'wraparound': Region(name='wraparound', west_bound=340, east_bound=40,
+                         south_bound=10, north_bound=20, do_land_mask=False),
+}
+
+
+class RegionReductions(object):
+    params = [RESOLUTIONS, list(_REGIONS)]
+    param_names = ['resolution', 'region']
+
+    def setup(self, resolution, region):
+        n_lat, n_lon = resolution
+        ds = prepared_dataset(n_lat=n_lat, n_lon=n_lon, n_years=10)
+        ds.coords[SFC_AREA_STR] = sfc_area(ds)
+        self.arr = times.yearly_average(ds['precip'], ds[TIME_WEIGHTS_STR])
+        self.region = _REGIONS[region]
+
+    def time_ts(self, resolution, region):
+        self.region.ts(self.arr)
+
+    def time_av(self, resolution, region):
+        self.region.av(self.arr)
+
+    def time_std(self, resolution, region):
+        self.region.std(self.arr)
+
+
+class MakeMask(object):
+    params = [RESOLUTIONS + [(720, 1440)], list(_REGIONS)]
+    param_names = ['resolution', 'region']
+
+    def setup(self, resolution, region):
+        n_lat, n_lon = resolution
+        self.ds = prepared_dataset(n_lat=n_lat, n_lon=n_lon, n_years=1)
+        self.region = _REGIONS[region]
+
+    def time_make_mask(self, resolution, region):
+        self.region._make_mask(self.ds)
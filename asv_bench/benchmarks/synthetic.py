@@ -0,0 +1,301 @@
+"""Generate synthetic model output of arbitrary size for benchmarking aospy.
+
+Data is written following the conventions of GFDL post-processed model
+output, either into the directory tree expected by
+:py:class:`aospy.data_loader.GFDLDataLoader`, or into a flat directory of
+files for use with :py:class:`aospy.data_loader.DictDataLoader`.  Values
+are random, but reproducible, so the generated data is suited to measuring
+how aospy scales with the size of its input rather than to checking
+numerical results.
+
+This is a copy of ``aospy.test.data.synthetic``, kept with the benchmarks
+so that they can be run against commits of aospy that predate it.
+"""
+import os
+
+import cftime
+import numpy as np
+import xarray as xr
+
+from aospy.data_loader import GFDLDataLoader
+from aospy.internal_names import ETA_STR
+
+_TIME_UNITS = 'days since 0001-01-01 00:00:00'
+_DATE_TYPES = {
+    'noleap': cftime.DatetimeNoLeap,
+    '365_day': cftime.DatetimeNoLeap,
+    'all_leap': cftime.DatetimeAllLeap,
+    '366_day': cftime.DatetimeAllLeap,
+    '360_day': cftime.Datetime360Day,
+    'julian': cftime.DatetimeJulian,
+    'gregorian': cftime.DatetimeGregorian,
+    'standard': cftime.DatetimeGregorian,
+    'proleptic_gregorian': cftime.DatetimeProlepticGregorian,
+}
+_STEPS_PER_DAY = {'daily': 1, '6hr': 4, '3hr': 8}
+_PRESSURE_LEVELS = [1000., 925., 850., 700., 600., 500., 400., 300., 250.,
+                    200., 150., 100., 70., 50., 30., 20., 10.]
+_REF_PRESSURE = 1e5
+_PS_STR = 'ps'
+
+
+def _edges(n, start, stop):
+    """Evenly spaced cell edges and centers spanning [start, stop]."""
+    edges = np.linspace(start, stop, n + 1)
+    return edges, 0.5 * (edges[:-1] + edges[1:])
+
+
+def _time_bounds(intvl_in, calendar, start_year, n_years):
+    """Bounds of each time step, in days since 0001-01-01."""
+    try:
+        date_type = _DATE_TYPES[calendar]
+    except KeyError:
+        raise ValueError("Unsupported calendar: '{}'.  Must be one of "
+                         "{}".format(calendar, sorted(_DATE_TYPES)))
+    end_year = start_year + n_years
+    if intvl_in == 'annual':
+        edges = [date_type(year, 1, 1)
+                 for year in range(start_year, end_year + 1)]
+    elif intvl_in == 'monthly':
+        edges = [date_type(year, month, 1)
+                 for year in range(start_year, end_year)
+                 for month in range(1, 13)]
+        edges.append(date_type(end_year, 1, 1))
+    elif intvl_in in _STEPS_PER_DAY:
+        edges = [date_type(start_year, 1, 1), date_type(end_year, 1, 1)]
+    else:
+        raise ValueError("Unsupported intvl_in: '{}'.  Must be one of "
+                         "'annual', 'monthly', or {}".format(
+                             intvl_in, sorted(_STEPS_PER_DAY)))
+    edges = np.asarray(cftime.date2num(edges, _TIME_UNITS, calendar),
+                       dtype=np.float64)
+    if intvl_in in _STEPS_PER_DAY:
+        steps_per_day = _STEPS_PER_DAY[intvl_in]
+        n_steps = int(round((edges[-1] - edges[0]) * steps_per_day))
+        edges = edges[0] + np.arange(n_steps + 1) / steps_per_day
+    return np.stack([edges[:-1], edges[1:]], axis=-1)
+
+
+def _sigma_coefficients(n_levels):
+    """Hybrid sigma-pressure coefficients pk (in Pa) and bk.
+
+    Levels are evenly spaced in pressure for a surface pressure of 1000 hPa,
+    and transition from pure pressure levels aloft to pure sigma levels at
+    the surface.
+    """
+    eta = np.linspace(0., 1., n_levels + 1)
+    bk = eta ** 2
+    pk = _REF_PRESSURE * (eta - bk)
+    return pk, bk
+
+
+def synthetic_dataset(var_names=('precip',), n_lat=64, n_lon=128,
+                      intvl_in='monthly', calendar='noleap', start_year=1,
+                      n_years=1, dtype_in_vert=None, n_levels=None,
+                      seed=0):
+    """Create a Dataset of synthetic model output.
+
+    The Dataset follows the conventions of GFDL post-processed output:
+    times are encoded in the given calendar, with time bounds ('time_bounds')
+    and the length of each averaging period ('average_DT'), and the grid is
+    described by cell centers ('lat' and 'lon') and edges ('latb' and
+    'lonb').
+
+    Parameters
+    ----------
+    var_names : sequence of str
+        Names of the data variables to create.  Surface pressure ('ps') is
+        always two dimensional, with values in Pa.
+    n_lat, n_lon : int
+        Number of latitudes and longitudes of the grid
+    intvl_in : {'annual', 'monthly', 'daily', '6hr', '3hr'}
+        Time resolution of the data
+    calendar : str
+        CF calendar of the time coordinate, e.g. 'noleap' or '360_day'
+    start_year, n_years : int
+        First year and number of years of data
+    dtype_in_vert : {None, 'pressure', 'sigma'}
+        Vertical coordinate of the data.  If None, the data is two
+        dimensional.  If 'pressure', the data is on pressure levels ('level',
+        in hPa).  If 'sigma', the data is on the full levels ('pfull') of a
+        hybrid sigma-pressure coordinate, defined by the coefficients 'pk' and
+        'bk' on its half levels ('phalf'); include 'ps' in ``var_names`` to
+        also create the surface pressure needed to compute pressure from
+        them.
+    n_levels : int, optional
+        Number of vertical levels.  Defaults to 17 standard pressure levels
+        for pressure data, or 30 levels for sigma data.
+    seed : int
+        Seed of the random number generator
+
+    Returns
+    -------
+    xarray.Dataset
+    """
+    latb, lat = _edges(n_lat, -90., 90.)
+    lonb, lon = _edges(n_lon, 0., 360.)
+    time_bounds = _time_bounds(intvl_in, calendar, start_year, n_years)
+    coords = {
+        'time': ('time', time_bounds.mean(axis=-1),
+                 {'units': _TIME_UNITS, 'calendar': calendar}),
+        'lat': ('lat', lat, {'units': 'degrees_N'}),
+        'lon': ('lon', lon, {'units': 'degrees_E'}),
+        'latb': ('latb', latb, {'units': 'degrees_N'}),
+        'lonb': ('lonb', lonb, {'units': 'degrees_E'}),
+        'nv': ('nv', [1., 2.]),
+    }
+    data_vars = {
+        'time_bounds': (('time', 'nv'), time_bounds,
+                        {'units': _TIME_UNITS, 'calendar': calendar}),
+        'average_DT': ('time', np.diff(time_bounds, axis=-1)[:, 0],
+                       {'units': 'days'}),
+    }
+
+    horiz_dims = ['time', 'lat', 'lon']
+    dims = list(horiz_dims)
+    if dtype_in_vert == 'pressure':
+        levels = (_PRESSURE_LEVELS if n_levels is None else
+                  np.linspace(1000., 10., n_levels))
+        coords['level'] = ('level', np.asarray(levels, dtype=np.float64),
+                           {'units': 'hPa'})
+        dims.insert(1, 'level')
+    elif dtype_in_vert == ETA_STR:
+        pk, bk = _sigma_coefficients(30 if n_levels is None else n_levels)
+        phalf = 0.01 * (pk + bk * _REF_PRESSURE)
+        coords['phalf'] = ('phalf', phalf, {'units': 'mb'})
+        coords['pfull'] = ('pfull', 0.5 * (phalf[:-1] + phalf[1:]),
+                           {'units': 'mb'})
+        data_vars['pk'] = ('phalf', pk.astype(np.float32), {'units': 'Pa'})
+        data_vars['bk'] = ('phalf', bk.astype(np.float32), {'units': ''})
+        dims.insert(1, 'pfull')
+    elif dtype_in_vert is not None:
+        raise ValueError("Unsupported dtype_in_vert: '{}'.  Must be None, "
+                         "'pressure', or 'sigma'".format(dtype_in_vert))
+
+    rng = np.random.RandomState(seed)
+    for name in var_names:
+        if name == _PS_STR:
+            shape = [coords[dim][1].size for dim in horiz_dims]
+            values = 9.5e4 + 1e4 * rng.random_sample(shape)
+            data_vars[name] = (horiz_dims, values.astype(np.float32),
+                               {'units': 'Pa'})
+        else:
+            shape = [coords[dim][1].size for dim in dims]
+            data_vars[name] = (dims,
+                               rng.random_sample(shape).astype(np.float32),
+                               {'units': '', 'cell_methods': 'time: mean'})
+    return xr.Dataset(data_vars, coords=coords)
+
+
+def _chunk_years(start_year, n_years, years_per_file):
+    """The first year and number of years of each file."""
+    end_year = start_year + n_years
+    return [(year, min(years_per_file, end_year - year))
+            for year in range(start_year, end_year, years_per_file)]
+
+
+def write_gfdl_tree(data_direc, var_names=('precip',), domain='atmos',
+                    intvl_in='monthly', dtype_in_time='ts', data_dur=1,
+                    start_year=1, n_years=1, dtype_in_vert=None, **kwargs):
+    """Write synthetic data into a GFDL post-processing directory tree.
+
+    Each variable is written to its own files, each spanning ``data_dur``
+    years, at the paths where a :py:class:`aospy.data_loader.GFDLDataLoader`
+    looks for them, e.g. 'atmos/ts/monthly/1yr/atmos.000101-000112.precip.nc'
+    within ``data_direc``.  For data on sigma levels, variables are written
+    to the '_level' variant of the domain, and surface pressure ('ps') to the
+    domain itself.
+
+    Parameters
+    ----------
+    data_direc : str
+        Root directory of the tree
+    var_names : sequence of str
+        Names of the variables to write
+    domain : str
+        Model domain of the data, e.g. 'atmos'
+    intvl_in : {'annual', 'monthly', 'daily', '6hr', '3hr'}
+        Time resolution of the data
+    dtype_in_time : {'ts', 'inst'}
+        What the time axis of the data represents
+    data_dur : int
+        Number of years per file
+    start_year, n_years : int
+        First year and number of years of data
+    dtype_in_vert : {None, 'pressure', 'sigma'}
+        Vertical coordinate of the data
+    **kwargs
+        Further arguments passed to ``synthetic_dataset``, e.g. ``n_lat``,
+        ``n_lon``, or ``calendar``
+
+    Returns
+    -------
+    GFDLDataLoader
+        A DataLoader for the data written
+    """
+    if dtype_in_time not in ('ts', 'inst'):
+        raise ValueError("Only time series data can be written, i.e. "
+                         "dtype_in_time of 'ts' or 'inst'; got "
+                         "'{}'".format(dtype_in_time))
+    calendar = kwargs.get('calendar', 'noleap')
+    date_type = _DATE_TYPES.get(calendar, cftime.DatetimeNoLeap)
+    data_loader = GFDLDataLoader(
+        data_direc=data_direc, data_dur=data_dur,
+        data_start_date=date_type(start_year, 1, 1),
+        data_end_date=date_type(start_year + n_years - 1, 12,
+                                30 if calendar == '360_day' else 31))
+    if dtype_in_vert == ETA_STR and _PS_STR not in var_names:
+        var_names = list(var_names) + [_PS_STR]
+    for name in var_names:
+        for year, years in _chunk_years(start_year, n_years, data_dur):
+            ds = synthetic_dataset(
+                [name], intvl_in=intvl_in, start_year=year, n_years=years,
+                dtype_in_vert=None if name == _PS_STR else dtype_in_vert,
+                seed=year, **kwargs)
+            path, = data_loader._input_data_paths_gfdl(
+                name, date_type(year, 1, 1), date_type(year, 1, 1), domain,
+                intvl_in, dtype_in_vert, dtype_in_time, None)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            ds.to_netcdf(path)
+    return data_loader
+
+
+def write_file_map(direc, var_names=('precip',), intvl_in='monthly',
+                   years_per_file=1, start_year=1, n_years=1, **kwargs):
+    """Write synthetic data to a flat directory of files.
+
+    All variables are written to the same files, each spanning
+    ``years_per_file`` years, named e.g. '00010101.monthly.nc'.
+
+    Parameters
+    ----------
+    direc : str
+        Directory to write the files to
+    var_names : sequence of str
+        Names of the variables to write
+    intvl_in : {'annual', 'monthly', 'daily', '6hr', '3hr'}
+        Time resolution of the data
+    years_per_file : int
+        Number of years per file
+    start_year, n_years : int
+        First year and number of years of data
+    **kwargs
+        Further arguments passed to ``synthetic_dataset``, e.g. ``n_lat``,
+        ``n_lon``, ``calendar``, or ``dtype_in_vert``
+
+    Returns
+    -------
+    dict
+        File map for a :py:class:`aospy.data_loader.DictDataLoader`, mapping
+        ``intvl_in`` to the paths of the files written, in chronological
+        order
+    """
+    os.makedirs(direc, exist_ok=True)
+    paths = []
+    for year, years in _chunk_years(start_year, n_years, years_per_file):
+        ds = synthetic_dataset(var_names, intvl_in=intvl_in, start_year=year,
+                               n_years=years, seed=year, **kwargs)
+        path = os.path.join(direc, '{:04d}0101.{}.nc'.format(year, intvl_in))
+        ds.to_netcdf(path)
+        paths.append(path)
+    return {intvl_in: paths}
@@ -0,0 +1,59 @@
+"""Benchmarks of time-handling utilities."""
+from aospy.internal_names import TIME_STR, TIME_WEIGHTS_STR
+from aospy.utils import times
+
+from . import RESOLUTIONS, prepared_dataset
+
+
+class YearlyAverage(object):
+    params = [RESOLUTIONS, [10, 50]]
+    param_names = ['resolution', 'n_years']
+
+    def setup(self, resolution, n_years):
+        n_lat, n_lon = resolution
+        ds = prepared_dataset(n_lat=n_lat, n_lon=n_lon, n_years=n_years)
+        self.arr = ds['precip']
+        self.dt = ds[TIME_WEIGHTS_STR]
+
+    def time_yearly_average(self, resolution, n_years):
+        times.yearly_average(self.arr, self.dt)
+
+
+class SubDailyCalendarArithmetic(object):
+    """Group and offset a century of 3-hourly times of a given calendar."""
+    params = [['noleap', 'julian']]
+    param_names = ['calendar']
+
+    def setup(self, calendar):
+        ds = prepared_dataset(n_lat=2, n_lon=4, intvl_in='3hr',
+                              calendar=calendar, n_years=100)
+        self.arr = ds['precip']
+        self.dt = ds[TIME_WEIGHTS_STR]
+
+    def time_yearly_average(self, calendar):
+        times.yearly_average(self.arr, self.dt)
+
+    def time_extract_months(self, calendar):
+        times.extract_months(self.arr[TIME_STR], 'djf')
+
+    def time_apply_time_offset(self, calendar):
+        times.apply_time_offset(self.arr[TIME_STR], hours=-3)
+
+
+class MonthlyAnomalies(object):
+    """Subtract monthly means from 6-hourly data, as for eddy fluxes."""
+    params = [['standard', 'noleap']]
+    param_names = ['calendar']
+
+    def setup(self, calendar):
+        ds = prepared_dataset(n_lat=16, n_lon=32, intvl_in='6hr',
+                              calendar=calendar, start_year=2001,
+                              n_years=10)
+        self.arr = ds['precip']
+        self.means = times.monthly_mean_ts(self.arr)
+
+    def time_monthly_mean_ts(self, calendar):
+        times.monthly_mean_ts(self.arr)
+
+    def time_monthly_mean_at_each_ind(self, calendar):
+        times.monthly_mean_at_each_ind(self.means, self.arr)
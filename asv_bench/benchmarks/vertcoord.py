@@ -0,0 +1,25 @@
+"""Benchmarks of vertical coordinate utilities."""
+from aospy.internal_names import PLEVEL_STR
+from aospy.utils import vertcoord
+
+from . import RESOLUTIONS, prepared_dataset
+
+
+class VerticalIntegration(object):
+    params = [RESOLUTIONS]
+    param_names = ['resolution']
+
+    def setup(self, resolution):
+        n_lat, n_lon = resolution
+        ds = prepared_dataset(['temp', 'ps'], n_lat=n_lat, n_lon=n_lon,
+                              dtype_in_vert='pressure')
+        self.arr = ds['temp']
+        self.p = ds[PLEVEL_STR]
+        self.ps = ds['ps']
+        self.dp = vertcoord.dp_from_p(self.p, self.ps)
+
+    def time_dp_from_p(self, resolution):
+        vertcoord.dp_from_p(self.p, self.ps)
+
+    def time_int_dp_g(self, resolution):
+        vertcoord.int_dp_g(self.arr, self.dp)
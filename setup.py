@@ -37,6 +37,7 @@ setuptools.setup(
                       'distributed >= 1.17.1',
                       'xarray >= 0.10.6',
                       'cloudpickle >= 0.2.1',
+                      'psutil',
                       'cftime >= 1.0.0'],
     tests_require=['pytest >= 3.3'],
     package_data={'aospy': ['test/data/netcdf/*.nc']},